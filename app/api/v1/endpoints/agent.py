@@ -1,7 +1,13 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import AnswerCache
 from app.services.agent_service import AgentService
-from app.schema.agent_schema import AgentRequest, AgentResponse
+from app.schema.agent_schema import AgentRequest, AgentResponse, AgentCacheStats, ChartFastPathStats
 from app.core.container import Container
+from app.util.chart_inference import chart_stats
+from app.util.sse import sse_stream
 from dependency_injector.wiring import inject, Provide
 
 router = APIRouter(
@@ -20,13 +26,50 @@ async def analyze_data(
         if mock:
             result = service.mock_analyze(request.prompt, request.dataset_id)
         else:
-            result = service.analyze(request.prompt, request.dataset_id)
+            result = await service.aanalyze(request.prompt, request.dataset_id)
             
         return AgentResponse(
             chart_config=result.get("chart_config"),
             explanation=result.get("explanation"),
             sql_query=result.get("sql_query"),
-            query_result=result.get("query_result")
+            query_result=result.get("query_result"),
+            cached=result.get("cached", False)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/analyze/stream")
+@inject
+async def analyze_data_stream(
+    request: AgentRequest,
+    service: AgentService = Depends(Provide[Container.agent_service]),
+):
+    return StreamingResponse(
+        sse_stream(service.astream_analyze(request.prompt, request.dataset_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/cache/stats", response_model=AgentCacheStats)
+@inject
+async def get_cache_stats(
+    cache: AnswerCache = Depends(Provide[Container.answer_cache]),
+):
+    return await run_in_threadpool(cache.stats)
+
+@router.get("/chart/stats", response_model=ChartFastPathStats)
+async def get_chart_stats():
+    return chart_stats.snapshot()
+
+@router.delete("/cache")
+@inject
+async def invalidate_cache(
+    dataset_id: Optional[int] = None,
+    cache: AnswerCache = Depends(Provide[Container.answer_cache]),
+):
+    # the sql backend does blocking database work
+    if dataset_id is None:
+        removed = await run_in_threadpool(cache.clear)
+    else:
+        removed = await run_in_threadpool(cache.invalidate_dataset, dataset_id)
+    return {"message": "Answer cache invalidated", "removed": removed}
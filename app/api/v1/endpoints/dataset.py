@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
 from app.services.dataset_service import DatasetService
-from app.schema.dataset_schema import DatasetResponse, FindDataset
-from app.schema.base_schema import FindResult
+from app.services.ingestion_service import IngestionService
+from app.schema.dataset_schema import DatasetResponse, DatasetPatch, FindDataset, DatasetColumnProfileResponse, IngestionJobResponse
+from app.schema.base_schema import BulkResult, FindResult
+from app.core.config import configs
 from app.core.container import Container
+from app.util.http_cache import conditional
+from app.util.ingestion import spool_upload
 from dependency_injector.wiring import inject, Provide
 
 router = APIRouter(
@@ -13,30 +20,81 @@ router = APIRouter(
 @router.get("/", response_model=FindResult)
 @inject
 async def get_datasets(
+    request: Request,
+    response: Response,
     find_query: FindDataset = Depends(),
     service: DatasetService = Depends(Provide[Container.dataset_service]),
 ):
-    return service.get_list(find_query)
+    not_modified = conditional(request, response, configs.HTTP_CACHE_CONTROL, *await service.aget_version())
+    if not_modified:
+        return not_modified
+    return await service.aget_list(find_query)
 
-@router.post("/upload", response_model=DatasetResponse)
+@router.patch("/batch", response_model=BulkResult)
+@inject
+async def update_datasets(
+    schemas: list[DatasetPatch],
+    service: DatasetService = Depends(Provide[Container.dataset_service]),
+):
+    return await service.abulk_patch(schemas)
+
+@router.post("/upload", response_model=IngestionJobResponse, status_code=202)
 @inject
 async def upload_dataset(
     file: UploadFile = File(...),
-    service: DatasetService = Depends(Provide[Container.dataset_service]),
+    split_sheets: bool = False,
+    engine: Optional[str] = None,
+    service: IngestionService = Depends(Provide[Container.ingestion_service]),
 ):
-    content = await file.read()
+    # spool to disk instead of reading the whole upload into memory; a worker ingests it in the background
+    path = await run_in_threadpool(spool_upload, file.file, os.path.splitext(file.filename)[1], configs.UPLOAD_SPOOL_DIR)
     try:
-        return service.upload_dataset(content, file.filename)
+        return await run_in_threadpool(service.submit, path, file.filename, split_sheets, engine)
     except Exception as e:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+@inject
+async def get_ingestion_job(
+    job_id: int,
+    service: IngestionService = Depends(Provide[Container.ingestion_service]),
+):
+    return await run_in_threadpool(service.get_job, job_id)
+
+@router.get("/{dataset_id}/profile", response_model=list[DatasetColumnProfileResponse])
+@inject
+async def get_dataset_profile(
+    dataset_id: int,
+    service: DatasetService = Depends(Provide[Container.dataset_service]),
+):
+    return await service.aget_profile(dataset_id)
+
+@router.put("/{dataset_id}/engine", response_model=DatasetResponse)
+@inject
+async def set_dataset_engine(
+    dataset_id: int,
+    engine: str,
+    service: DatasetService = Depends(Provide[Container.dataset_service]),
+):
+    try:
+        return await run_in_threadpool(service.set_engine, dataset_id, engine)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{dataset_id}/preview")
 @inject
 async def get_dataset_preview(
     dataset_id: int,
+    request: Request,
+    response: Response,
     service: DatasetService = Depends(Provide[Container.dataset_service]),
 ):
     try:
-        return service.get_preview(dataset_id)
+        version = await service.aget_preview_version(dataset_id)
+        not_modified = conditional(request, response, configs.HTTP_CACHE_CONTROL_PREVIEW, *version)
+        if not_modified:
+            return not_modified
+        return await service.aget_preview(dataset_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
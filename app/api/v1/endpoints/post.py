@@ -1,3 +1,5 @@
+from typing import List
+
 from dependency_injector.wiring import Provide
 from fastapi import APIRouter, Depends
 
@@ -5,8 +7,15 @@ from app.core.container import Container
 from app.core.dependencies import get_current_active_user
 from app.core.middleware import inject
 from app.model.user import User
-from app.schema.base_schema import Blank
-from app.schema.post_tag_schema import FindPost, FindPostWithTagsResult, PostWithTags, UpsertPostWithTags
+from app.schema.base_schema import Blank, BulkDelete, BulkDeleteResult, BulkResult
+from app.schema.post_tag_schema import (
+    FindPost,
+    FindPostWithTagsResult,
+    PatchPost,
+    PostWithTags,
+    UpsertPost,
+    UpsertPostWithTags,
+)
 from app.services.post_service import PostService
 
 router = APIRouter(
@@ -24,6 +33,39 @@ def get_post_list(
     return service.get_list(find_query)
 
 
+# tag links are not set through the batch endpoints; use the single-post endpoints for tag_ids
+@router.post("/batch", response_model=BulkResult)
+@inject
+def create_posts(
+    posts: List[UpsertPost],
+    service: PostService = Depends(Provide[Container.post_service]),
+    current_user: User = Depends(get_current_active_user),
+):
+    for post in posts:
+        post.user_token = current_user.user_token
+    return service.bulk_add(posts)
+
+
+@router.patch("/batch", response_model=BulkResult)
+@inject
+def update_posts(
+    posts: List[PatchPost],
+    service: PostService = Depends(Provide[Container.post_service]),
+    current_user: User = Depends(get_current_active_user),
+):
+    return service.bulk_patch(posts)
+
+
+@router.post("/batch/delete", response_model=BulkDeleteResult)
+@inject
+def delete_posts(
+    schema: BulkDelete,
+    service: PostService = Depends(Provide[Container.post_service]),
+    current_user: User = Depends(get_current_active_user),
+):
+    return service.bulk_remove(schema.ids)
+
+
 @router.get("/{post_id}", response_model=PostWithTags)
 @inject
 def get_post(
@@ -1,3 +1,5 @@
+from typing import List
+
 from dependency_injector.wiring import Provide
 from fastapi import APIRouter, Depends
 
@@ -5,8 +7,8 @@ from app.core.container import Container
 from app.core.dependencies import get_current_active_user
 from app.core.middleware import inject
 from app.model.user import User
-from app.schema.base_schema import Blank
-from app.schema.post_tag_schema import FindTag, FindTagResult, Tag, UpsertTag
+from app.schema.base_schema import Blank, BulkDelete, BulkDeleteResult, BulkResult
+from app.schema.post_tag_schema import FindTag, FindTagResult, PatchTag, Tag, UpsertTag
 from app.services.tag_service import TagService
 
 router = APIRouter(
@@ -24,6 +26,36 @@ def get_tag_list(
     return service.get_list(find_query)
 
 
+@router.post("/batch", response_model=BulkResult)
+@inject
+def create_tags(
+    tags: List[UpsertTag],
+    service: TagService = Depends(Provide[Container.tag_service]),
+    current_user: User = Depends(get_current_active_user),
+):
+    return service.bulk_add(tags)
+
+
+@router.patch("/batch", response_model=BulkResult)
+@inject
+def update_tags(
+    tags: List[PatchTag],
+    service: TagService = Depends(Provide[Container.tag_service]),
+    current_user: User = Depends(get_current_active_user),
+):
+    return service.bulk_patch(tags)
+
+
+@router.post("/batch/delete", response_model=BulkDeleteResult)
+@inject
+def delete_tags(
+    schema: BulkDelete,
+    service: TagService = Depends(Provide[Container.tag_service]),
+    current_user: User = Depends(get_current_active_user),
+):
+    return service.bulk_remove(schema.ids)
+
+
 @router.get("/{tag_id}", response_model=Tag)
 @inject
 def get_tag(
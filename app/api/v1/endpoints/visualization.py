@@ -1,8 +1,14 @@
 from dependency_injector.wiring import inject, Provide
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.config import configs
 from app.core.container import Container
-from app.schema.visualization_schema import VisualizationCreate, VisualizationRead
+from app.schema.base_schema import BulkDelete, BulkDeleteResult, BulkResult
+from app.core.exceptions import ValidationError
+from app.schema.visualization_schema import VisualizationCreate, VisualizationListItem, VisualizationPatch, VisualizationRead
 from app.services.visualization_service import VisualizationService
+from app.util.http_cache import conditional
+from app.util.ndjson import NDJSON_MEDIA_TYPE, ndjson_stream, wants_ndjson
 
 router = APIRouter(
     prefix="/visualizations",
@@ -11,39 +17,102 @@ router = APIRouter(
 
 @router.post("/", response_model=VisualizationRead)
 @inject
-def create_visualization(
+async def create_visualization(
     schema: VisualizationCreate,
     service: VisualizationService = Depends(Provide[Container.visualization_service]),
 ):
-    return service.create_visualization(schema)
+    return await service.create_visualization(schema)
 
-@router.get("/dataset/{dataset_id}", response_model=list[VisualizationRead])
+@router.post("/batch", response_model=BulkResult)
 @inject
-def get_dataset_visualizations(
+async def create_visualizations(
+    schemas: list[VisualizationCreate],
+    service: VisualizationService = Depends(Provide[Container.visualization_service]),
+):
+    return await service.create_visualizations(schemas)
+
+@router.patch("/batch", response_model=BulkResult)
+@inject
+async def update_visualizations(
+    schemas: list[VisualizationPatch],
+    service: VisualizationService = Depends(Provide[Container.visualization_service]),
+):
+    return await service.update_visualizations(schemas)
+
+@router.post("/batch/delete", response_model=BulkDeleteResult)
+@inject
+async def delete_visualizations(
+    schema: BulkDelete,
+    service: VisualizationService = Depends(Provide[Container.visualization_service]),
+):
+    return await service.delete_visualizations(schema.ids)
+
+# fields: comma-separated columns to return (id is always included); summary: every column but
+# chart_config, sql_query and explanation
+@router.get("/dataset/{dataset_id}", response_model=list[VisualizationListItem], response_model_exclude_unset=True)
+@inject
+async def get_dataset_visualizations(
     dataset_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = None,
+    summary: bool = False,
     service: VisualizationService = Depends(Provide[Container.visualization_service]),
 ):
-    return service.list_visualizations(dataset_id)
+    version = await service.get_version(dataset_id)
+    not_modified = conditional(request, response, configs.HTTP_CACHE_CONTROL, *version)
+    if not_modified:
+        return not_modified
+    return await service.list_visualizations(dataset_id, fields, summary)
 
-@router.get("/", response_model=list[VisualizationRead])
+# with `Accept: application/x-ndjson` rows are streamed one JSON object per line, in id order, as they are read
+@router.get("/", response_model=list[VisualizationListItem], response_model_exclude_unset=True)
 @inject
-def get_visualizations(
+async def get_visualizations(
+    request: Request,
+    response: Response,
+    fields: str | None = None,
+    summary: bool = False,
+    ids: str | None = Query(None, description="comma-separated visualization ids"),
+    prompt__search: str | None = Query(None, description="case-insensitive substring of the prompt"),
+    prompt__prefix: str | None = Query(None, description="case-insensitive start of the prompt"),
     service: VisualizationService = Depends(Provide[Container.visualization_service]),
 ):
-    return service.get_all_visualizations()
+    try:
+        id_list = [int(id) for id in ids.split(",") if id.strip()] if ids else None
+    except ValueError:
+        raise ValidationError(detail="ids must be comma-separated integers")
+    filters = {"prompt__search": prompt__search, "prompt__prefix": prompt__prefix}
+    filters = {key: value for key, value in filters.items() if value is not None}
+    not_modified = conditional(request, response, configs.HTTP_CACHE_CONTROL, *await service.get_version())
+    if not_modified:
+        return not_modified
+    if wants_ndjson(request.headers.get("accept")):
+        return StreamingResponse(
+            ndjson_stream(service.stream_visualizations(fields, summary, id_list, filters)),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=dict(response.headers),
+        )
+    return await service.get_all_visualizations(fields, summary, id_list, filters)
 
 @router.get("/{dataset_id}", response_model=VisualizationRead | None)
 @inject
-def get_visualization(
+async def get_visualization(
     dataset_id: int,
+    request: Request,
+    response: Response,
     service: VisualizationService = Depends(Provide[Container.visualization_service]),
 ):
-    return service.get_visualization(dataset_id)
+    version = await service.get_version(dataset_id)
+    not_modified = conditional(request, response, configs.HTTP_CACHE_CONTROL, *version)
+    if not_modified:
+        return not_modified
+    return await service.get_visualization(dataset_id)
 
 @router.delete("/")
 @inject
-def delete_all_visualizations(
+async def delete_all_visualizations(
     service: VisualizationService = Depends(Provide[Container.visualization_service]),
 ):
-    service.delete_all_visualizations()
+    await service.delete_all_visualizations()
     return {"message": "All visualizations deleted"}
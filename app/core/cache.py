@@ -0,0 +1,199 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from app.repository.answer_cache_repository import AnswerCacheRepository
+
+
+def normalize_prompt(prompt: str) -> str:
+    prompt = re.sub(r"\s+", " ", prompt.strip().lower())
+    return prompt.rstrip(" ?!.")
+
+
+def make_cache_key(dataset_id: int, prompt: str, model: str, prompt_version: str) -> str:
+    raw = json.dumps([dataset_id, normalize_prompt(prompt), model, prompt_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Base answer cache: keeps the hit/miss counters, backends implement storage."""
+
+    backend = "none"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "latency_saved_seconds": 0.0,
+        }
+
+    def get(self, key: str, dataset_version: str) -> Optional[Dict[str, Any]]:
+        found = self._get(key, dataset_version)
+        if found is None:
+            self._count("misses")
+            return None
+        value, compute_seconds = found
+        self._count("hits")
+        self._count("latency_saved_seconds", compute_seconds)
+        return value
+
+    def set(self, key: str, dataset_id: int, dataset_version: str, value: Dict[str, Any], compute_seconds: float):
+        self._set(key, dataset_id, dataset_version, value, compute_seconds)
+        self._count("stores")
+
+    def invalidate_dataset(self, dataset_id: int) -> int:
+        removed = self._invalidate_dataset(dataset_id)
+        self._count("invalidations", removed)
+        return removed
+
+    def clear(self) -> int:
+        removed = self._clear()
+        self._count("invalidations", removed)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["backend"] = self.backend
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def _count(self, name: str, amount: float = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _get(self, key: str, dataset_version: str):
+        return None
+
+    def _set(self, key: str, dataset_id: int, dataset_version: str, value: Dict[str, Any], compute_seconds: float):
+        pass
+
+    def _invalidate_dataset(self, dataset_id: int) -> int:
+        return 0
+
+    def _clear(self) -> int:
+        return 0
+
+
+class MemoryAnswerCache(AnswerCache):
+    """In-process LRU cache with optional TTL."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 0) -> None:
+        super().__init__(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key: str, dataset_version: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, dataset_id, version, expires_at, compute_seconds = entry
+            if version != dataset_version or (expires_at and expires_at <= time.time()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, compute_seconds
+
+    def _set(self, key: str, dataset_id: int, dataset_version: str, value: Dict[str, Any], compute_seconds: float):
+        with self._lock:
+            self._entries[key] = (value, dataset_id, dataset_version, self._expires_at(), compute_seconds)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _invalidate_dataset(self, dataset_id: int) -> int:
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] == dataset_id]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def _clear(self) -> int:
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLAnswerCache(AnswerCache):
+    """Answer cache persisted in the application database so it survives restarts."""
+
+    backend = "sql"
+
+    def __init__(self, repository: AnswerCacheRepository, max_entries: int = 1024, ttl_seconds: float = 0) -> None:
+        super().__init__(max_entries, ttl_seconds)
+        self._repository = repository
+
+    def _get(self, key: str, dataset_version: str):
+        entry = self._repository.get_by_key(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if entry.dataset_version != dataset_version or (entry.expires_at and entry.expires_at <= now):
+            self._repository.delete_by_key(key)
+            return None
+        self._repository.touch(key, now)
+        return json.loads(entry.payload), entry.compute_seconds
+
+    def _set(self, key: str, dataset_id: int, dataset_version: str, value: Dict[str, Any], compute_seconds: float):
+        now = time.time()
+        self._repository.upsert(
+            key,
+            {
+                "dataset_id": dataset_id,
+                "dataset_version": dataset_version,
+                "payload": json.dumps(value, default=str),
+                "compute_seconds": compute_seconds,
+                "expires_at": self._expires_at(),
+                "last_accessed_at": now,
+            },
+        )
+        evicted = self._repository.delete_expired(now) + self._repository.evict_lru(self.max_entries)
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _invalidate_dataset(self, dataset_id: int) -> int:
+        return self._repository.delete_by_dataset_id(dataset_id)
+
+    def _clear(self) -> int:
+        return self._repository.delete_all()
+
+
+def build_answer_cache(
+    backend: str, max_entries: int, ttl_seconds: float, repository: Optional[AnswerCacheRepository] = None
+) -> AnswerCache:
+    if backend == "memory":
+        return MemoryAnswerCache(max_entries, ttl_seconds)
+    if backend == "sql":
+        return SQLAnswerCache(repository, max_entries, ttl_seconds)
+    if backend not in ("none", "off"):
+        logger.warning(f"Unknown answer cache backend '{backend}', caching disabled")
+    return AnswerCache(max_entries, ttl_seconds)
@@ -1,5 +1,5 @@
 import os
-from typing import List, ClassVar
+from typing import List, ClassVar, Optional
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -27,6 +27,7 @@ class Configs(BaseSettings):
         "postgresql": "postgresql+psycopg",
         "postgres": "postgresql+psycopg",
         "mysql": "mysql+pymysql",
+        "sqlite": "sqlite",
     }
 
     PROJECT_ROOT: str = os.path.dirname(
@@ -46,6 +47,13 @@ class Configs(BaseSettings):
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
     DB_HOST: str = os.getenv("DB_HOST", "")
     DB_PORT: str = os.getenv("DB_PORT", "5432")
+    DB_SSLMODE: str = os.getenv("DB_SSLMODE", "require")
+    # DB=sqlite: embedded database file for single-node and test deployments, one file per ENV by default
+    SQLITE_PATH: Optional[str] = os.getenv("SQLITE_PATH") or None
+    # read replicas, comma-separated database URLs: repository reads and agent SQL are spread over them round-robin,
+    # a replica that fails its connection check is skipped for DB_REPLICA_RETRY_SECONDS
+    DATABASE_REPLICA_URIS: List[str] = [uri.strip() for uri in os.getenv("DB_REPLICA_URIS", "").split(",") if uri.strip()]
+    DB_REPLICA_RETRY_SECONDS: float = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
 
     @property
     def DB_ENGINE(self) -> str:
@@ -57,18 +65,109 @@ class Configs(BaseSettings):
 
     @property
     def DATABASE_URI(self) -> str:
-        return (
+        if self.DB_ENGINE == "sqlite":
+            path = self.SQLITE_PATH or os.path.join(
+                self.PROJECT_ROOT, "data", f"{self.ENV_DATABASE_MAPPER[self.ENV]}.sqlite3"
+            )
+            return f"sqlite:///{path}"
+        uri = (
             f"{self.DB_ENGINE}://"
             f"{self.DB_USER}:{self.DB_PASSWORD}"
             f"@{self.DB_HOST}:{self.DB_PORT}"
             f"/{self.DATABASE_NAME}"
-            f"?sslmode=require"
         )
+        # sslmode is a libpq option; pymysql rejects it
+        return f"{uri}?sslmode={self.DB_SSLMODE}" if self.DB_ENGINE.startswith("postgresql") else uri
 
     # ========= PAGINATION =========
     PAGE: int = 1
     PAGE_SIZE: int = 20
     ORDERING: str = "-id"
+    # total_count of list endpoints: exact | estimate (planner statistics) | cached (exact, reused for the TTL) | none
+    COUNT_MODE: str = os.getenv("COUNT_MODE", "exact")
+    COUNT_CACHE_TTL_SECONDS: float = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+
+    # rows fetched per round trip from the server-side cursor of `Accept: application/x-ndjson` listings
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+    # largest batch the bulk create/patch/delete endpoints accept in one request
+    BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+
+    # ========= HTTP CACHE =========
+    # dataset and visualization reads carry an ETag; clients revalidate with If-None-Match and get a 304 when unchanged
+    HTTP_CACHE_CONTROL: str = os.getenv("HTTP_CACHE_CONTROL", "private, no-cache")
+    # a dataset's preview only changes if the dataset is replaced, so browsers may reuse it for a while unchecked
+    HTTP_CACHE_CONTROL_PREVIEW: str = os.getenv("HTTP_CACHE_CONTROL_PREVIEW", "private, max-age=60")
+
+    # ========= COMPRESSION =========
+    # response encodings offered, preferred first when the client weighs them equally; empty disables compression
+    COMPRESSION_ENCODINGS: str = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    # levels for bodies compressed per response, and for ETag'd bodies compressed once and cached (benchmarks.compression)
+    COMPRESSION_LEVELS: str = os.getenv("COMPRESSION_LEVELS", "zstd:3,br:4,gzip:6")
+    COMPRESSION_CACHED_LEVELS: str = os.getenv("COMPRESSION_CACHED_LEVELS", "zstd:12,br:6,gzip:9")
+    COMPRESSION_CACHE_BYTES: int = int(os.getenv("COMPRESSION_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+    # ========= UPLOAD =========
+    # uploads are spooled to disk and parsed/loaded this many rows at a time, bounding peak memory
+    UPLOAD_CHUNK_ROWS: int = int(os.getenv("UPLOAD_CHUNK_ROWS", "100000"))
+    UPLOAD_SPOOL_DIR: Optional[str] = os.getenv("UPLOAD_SPOOL_DIR") or None
+    # uploads are ingested as background jobs on this many worker threads; SQLite has a single writer, so one
+    UPLOAD_WORKERS: int = int(os.getenv("UPLOAD_WORKERS", "1" if os.getenv("DB") == "sqlite" else "2"))
+    # CSVs of at least UPLOAD_PARALLEL_MIN_BYTES are split into byte ranges parsed by UPLOAD_PARSE_WORKERS processes;
+    # workbooks split into datasets parse their sheets on the same pool. 1 disables the pool.
+    UPLOAD_PARSE_WORKERS: int = int(os.getenv("UPLOAD_PARSE_WORKERS", str(os.cpu_count() or 1)))
+    UPLOAD_PARSE_RANGE_BYTES: int = int(os.getenv("UPLOAD_PARSE_RANGE_BYTES", str(32 * 1024 * 1024)))
+    UPLOAD_PARALLEL_MIN_BYTES: int = int(os.getenv("UPLOAD_PARALLEL_MIN_BYTES", str(64 * 1024 * 1024)))
+    UPLOAD_MAX_ATTEMPTS: int = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "3"))
+    # a running job writes its progress and a heartbeat to its row this often; on startup, a job of another host is
+    # only requeued once its heartbeat is UPLOAD_STALE_SECONDS old. SQLite has a single writer, held by the load, so
+    # there progress reaches the row per finished sheet/job and only jobs of this host's dead processes are requeued.
+    UPLOAD_HEARTBEAT_SECONDS: float = float(os.getenv("UPLOAD_HEARTBEAT_SECONDS", "5"))
+    UPLOAD_STALE_SECONDS: float = float(os.getenv("UPLOAD_STALE_SECONDS", "120"))
+
+    # ========= DATASET ENGINE =========
+    # sql: agent SQL runs on the dataset table; duckdb: datasets are also written as Parquet and agent SQL runs
+    # on DuckDB over those files. Default for new uploads, each dataset can be switched on its own.
+    DATASET_ENGINE: str = os.getenv("DATASET_ENGINE", "sql")
+    DATASET_PARQUET_DIR: str = os.getenv("DATASET_PARQUET_DIR", os.path.join(PROJECT_ROOT, "data", "parquet"))
+    DUCKDB_THREADS: int = int(os.getenv("DUCKDB_THREADS", "0"))
+
+    # ========= CHART STORAGE =========
+    # json: Visualization.chart_config is stored as is; zstd: its "data" traces are stored zstd-compressed with the
+    # newest dictionary in CHART_CONFIG_DICT_DIR (python -m app.util.chart_storage train). Reads handle both.
+    CHART_CONFIG_STORAGE: str = os.getenv("CHART_CONFIG_STORAGE", "json")
+    CHART_CONFIG_DICT_DIR: str = os.getenv("CHART_CONFIG_DICT_DIR", os.path.join(PROJECT_ROOT, "data", "chart_dicts"))
+    CHART_CONFIG_COMPRESS_MIN_BYTES: int = int(os.getenv("CHART_CONFIG_COMPRESS_MIN_BYTES", "2048"))
+    CHART_CONFIG_ZSTD_LEVEL: int = int(os.getenv("CHART_CONFIG_ZSTD_LEVEL", "3"))
+
+    # ========= AGENT =========
+    AGENT_MODEL: str = os.getenv("AGENT_MODEL", "gpt-4o")
+    AGENT_LLM_BASE_URL: str = os.getenv("AGENT_LLM_BASE_URL", "https://openrouter.ai/api/v1")
+    # one keep-alive connection pool is shared by every request to the LLM provider
+    AGENT_LLM_MAX_CONNECTIONS: int = int(os.getenv("AGENT_LLM_MAX_CONNECTIONS", "20"))
+    AGENT_LLM_MAX_KEEPALIVE: int = int(os.getenv("AGENT_LLM_MAX_KEEPALIVE", "10"))
+    AGENT_LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("AGENT_LLM_KEEPALIVE_EXPIRY", "60"))
+    AGENT_LLM_TIMEOUT_SECONDS: float = float(os.getenv("AGENT_LLM_TIMEOUT_SECONDS", "120"))
+    # memory | sql | none
+    AGENT_CACHE_BACKEND: str = os.getenv("AGENT_CACHE_BACKEND", "memory")
+    AGENT_CACHE_MAX_ENTRIES: int = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "1024"))
+    AGENT_CACHE_TTL_SECONDS: int = int(os.getenv("AGENT_CACHE_TTL_SECONDS", str(60 * 60 * 24)))
+    # threads available to the async agent path for blocking DB work
+    AGENT_DB_MAX_WORKERS: int = int(os.getenv("AGENT_DB_MAX_WORKERS", "8"))
+    # rows sent in the "rows" event of /agent/analyze/stream
+    AGENT_STREAM_PREVIEW_ROWS: int = int(os.getenv("AGENT_STREAM_PREVIEW_ROWS", "10"))
+    # rule-based chart builder: off | fallback (only when the LLM config is unusable) | prefer (LLM only if ambiguous)
+    AGENT_CHART_FAST_PATH: str = os.getenv("AGENT_CHART_FAST_PATH", "prefer")
+    # agent SQL is fetched in batches from a server-side cursor and stops at the row cap; each batch becomes numpy
+    # columns as it arrives, so memory is about 8 bytes per numeric cell (text cells stay Python strings) plus one batch
+    AGENT_SQL_MAX_ROWS: int = int(os.getenv("AGENT_SQL_MAX_ROWS", "100000"))
+    AGENT_SQL_BATCH_SIZE: int = int(os.getenv("AGENT_SQL_BATCH_SIZE", "5000"))
+    # result reduction between execute_sql and generate_visualization
+    AGENT_TOP_K_CATEGORIES: int = int(os.getenv("AGENT_TOP_K_CATEGORIES", "20"))
+    AGENT_CHART_MAX_POINTS: int = int(os.getenv("AGENT_CHART_MAX_POINTS", "500"))
+    AGENT_PROMPT_MAX_ROWS: int = int(os.getenv("AGENT_PROMPT_MAX_ROWS", "50"))
+    AGENT_PROMPT_TOKEN_BUDGET: int = int(os.getenv("AGENT_PROMPT_TOKEN_BUDGET", "2000"))
 
     class Config:
         case_sensitive = True
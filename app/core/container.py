@@ -1,9 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from dependency_injector import containers, providers
 
+from app.core.cache import build_answer_cache
 from app.core.config import configs
-from app.core.database import Database
+from app.core.database import AsyncDatabase, Database
+from app.core.llm import create_chat_model
 from app.repository import *
 from app.services import *
+from app.services.agent_service import build_agent_workflow
 
 
 class Container(containers.DeclarativeContainer):
@@ -21,19 +26,102 @@ class Container(containers.DeclarativeContainer):
         ]
     )
 
-    db = providers.Singleton(Database, db_url=configs.DATABASE_URI)
+    db = providers.Singleton(
+        Database,
+        db_url=configs.DATABASE_URI,
+        replica_urls=configs.DATABASE_REPLICA_URIS,
+        replica_retry_seconds=configs.DB_REPLICA_RETRY_SECONDS,
+    )
+    async_db = providers.Singleton(
+        AsyncDatabase,
+        db_url=configs.DATABASE_URI,
+        replica_urls=configs.DATABASE_REPLICA_URIS,
+        replica_retry_seconds=configs.DB_REPLICA_RETRY_SECONDS,
+    )
 
-    post_repository = providers.Factory(PostRepository, session_factory=db.provided.session)
-    tag_repository = providers.Factory(TagRepository, session_factory=db.provided.session)
+    # reads of these repositories go to a read replica when DB_REPLICA_URIS is set; users, auth,
+    # the answer cache and ingestion job state are always read from the primary
+    post_repository = providers.Factory(
+        PostRepository, session_factory=db.provided.session, read_session_factory=db.provided.read_session
+    )
+    tag_repository = providers.Factory(
+        TagRepository, session_factory=db.provided.session, read_session_factory=db.provided.read_session
+    )
     user_repository = providers.Factory(UserRepository, session_factory=db.provided.session)
 
-    dataset_repository = providers.Factory(DatasetRepository, session_factory=db.provided.session)
-    visualization_repository = providers.Factory(VisualizationRepository, session_factory=db.provided.session)
+    dataset_repository = providers.Factory(
+        DatasetRepository, session_factory=db.provided.session, read_session_factory=db.provided.read_session
+    )
+    visualization_repository = providers.Factory(
+        VisualizationRepository, session_factory=db.provided.session, read_session_factory=db.provided.read_session
+    )
+    answer_cache_repository = providers.Factory(AnswerCacheRepository, session_factory=db.provided.session)
+    dataset_profile_repository = providers.Factory(
+        DatasetProfileRepository, session_factory=db.provided.session, read_session_factory=db.provided.read_session
+    )
+    ingestion_job_repository = providers.Factory(
+        IngestionJobRepository,
+        session_factory=db.provided.session,
+        heartbeat_session_factory=db.provided.separate_session,
+    )
+
+    # asyncio repositories for the dataset, visualization and agent endpoints
+    async_dataset_repository = providers.Factory(
+        AsyncDatasetRepository,
+        session_factory=async_db.provided.session,
+        read_session_factory=async_db.provided.read_session,
+    )
+    async_visualization_repository = providers.Factory(
+        AsyncVisualizationRepository,
+        session_factory=async_db.provided.session,
+        read_session_factory=async_db.provided.read_session,
+    )
+    async_dataset_profile_repository = providers.Factory(
+        AsyncDatasetProfileRepository,
+        session_factory=async_db.provided.session,
+        read_session_factory=async_db.provided.read_session,
+    )
+
+    answer_cache = providers.Singleton(
+        build_answer_cache,
+        backend=configs.AGENT_CACHE_BACKEND,
+        max_entries=configs.AGENT_CACHE_MAX_ENTRIES,
+        ttl_seconds=configs.AGENT_CACHE_TTL_SECONDS,
+        repository=answer_cache_repository,
+    )
+
+    # one pooled LLM client and one compiled graph per process; AgentService is a per-request shim around them
+    llm = providers.Singleton(create_chat_model)
+    agent_workflow = providers.Singleton(build_agent_workflow)
 
     auth_service = providers.Factory(AuthService, user_repository=user_repository)
     post_service = providers.Factory(PostService, post_repository=post_repository, tag_repository=tag_repository)
     tag_service = providers.Factory(TagService, tag_repository=tag_repository)
     user_service = providers.Factory(UserService, user_repository=user_repository)
-    dataset_service = providers.Factory(DatasetService, repository=dataset_repository)
-    agent_service = providers.Factory(AgentService, repository=dataset_repository)
-    visualization_service = providers.Factory(VisualizationService, repository=visualization_repository)
+    dataset_service = providers.Factory(
+        DatasetService,
+        repository=dataset_repository,
+        profile_repository=dataset_profile_repository,
+        async_repository=async_dataset_repository,
+        async_profile_repository=async_dataset_profile_repository,
+    )
+    ingestion_executor = providers.Singleton(
+        ThreadPoolExecutor, max_workers=configs.UPLOAD_WORKERS, thread_name_prefix="ingestion"
+    )
+    ingestion_service = providers.Factory(
+        IngestionService,
+        repository=ingestion_job_repository,
+        dataset_service=dataset_service,
+        executor=ingestion_executor,
+    )
+    agent_service = providers.Factory(
+        AgentService,
+        repository=dataset_repository,
+        llm=llm,
+        workflow=agent_workflow,
+        cache=answer_cache,
+        profile_repository=dataset_profile_repository,
+        async_repository=async_dataset_repository,
+        async_profile_repository=async_dataset_profile_repository,
+    )
+    visualization_service = providers.Factory(VisualizationService, repository=async_visualization_repository)
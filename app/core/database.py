@@ -1,12 +1,23 @@
-from contextlib import AbstractContextManager, contextmanager
-from typing import Any, Generator
+import itertools
+import os
+import threading
+import time
+from contextlib import AbstractContextManager, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Generator, List, Optional
 
 
-from sqlalchemy import create_engine, orm
+from loguru import logger
+from sqlalchemy import create_engine, event, orm
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy.orm import Session
 from sqlmodel import SQLModel
 
+from app.util.search import create_search_indexes
+
 
 @as_declarative()
 class BaseModel:
@@ -18,31 +29,173 @@ class BaseModel:
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
 
+# Applied to every new SQLite connection: WAL lets readers run alongside the single writer,
+# and waiting writers retry for busy_timeout ms instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 30000,
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": -64 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+
+def connect_args(db_url: str) -> Dict[str, Any]:
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite":
+        # sessions are used from the threadpool and the ingestion workers
+        return {"check_same_thread": False}
+    if url.get_driver_name() == "psycopg":
+        # server-side prepared statements break behind transaction-mode poolers (pgbouncer, Supabase)
+        return {"prepare_threshold": 0}
+    return {}
+
+
+# sync driver -> asyncio driver of the same backend; psycopg 3 serves both
+ASYNC_DRIVERS = {"pysqlite": "aiosqlite", "pymysql": "aiomysql"}
+
+
+def async_url(db_url: str) -> URL:
+    url = make_url(db_url)
+    driver = ASYNC_DRIVERS.get(url.get_driver_name())
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}") if driver else url
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+# Read-your-writes scope: once a request (or background job) has written through the primary,
+# its later reads stay on the primary instead of a replica that may not have the write yet.
+_primary_writes: ContextVar[Optional[dict]] = ContextVar("primary_writes", default=None)
+
+
+@contextmanager
+def read_your_writes():
+    token = _primary_writes.set({"written": False})
+    try:
+        yield
+    finally:
+        _primary_writes.reset(token)
+
+
+def reads_pinned_to_primary() -> bool:
+    scope = _primary_writes.get()
+    return scope is not None and scope["written"]
+
+
+def _mark_written():
+    scope = _primary_writes.get()
+    if scope is not None:
+        scope["written"] = True
+
+
+class PrimarySession(Session):
+    """Session on the primary; flushes and DML statements pin the current read-your-writes scope to it."""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _after_flush(session, flush_context):
+    _mark_written()
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _after_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written()
+
+
+class ReplicaSet:
+    """Round-robin over read replica engines; a replica whose connection fails is skipped for `retry_seconds`."""
+
+    def __init__(self, engines: List[Any], retry_seconds: float) -> None:
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        """Healthy replicas, starting from the next one in round-robin order."""
+        if not self.engines:
+            return []
+        start, now = next(self._counter), time.monotonic()
+        with self._lock:
+            down = {index for index, until in self._down_until.items() if until > now}
+        order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+        return [(index, self.engines[index]) for index in order if index not in down]
+
+    def mark_down(self, index: int, error: Exception):
+        logger.warning(f"read replica {index} is unavailable, retrying in {self.retry_seconds}s: {error}")
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def connect(self):
+        """Connection to a healthy replica (pool_pre_ping checks it), or None to read from the primary."""
+        for index, engine in self.candidates():
+            try:
+                return engine.connect()
+            except DBAPIError as e:
+                self.mark_down(index, e)
+        return None
+
+    async def aconnect(self):
+        for index, engine in self.candidates():
+            try:
+                return await engine.connect()
+            except DBAPIError as e:
+                self.mark_down(index, e)
+        return None
+
+
+def _engine_options(db_url: str) -> Dict[str, Any]:
+    return {
+        "echo": True,
+        "pool_pre_ping": True,
+        "execution_options": {
+            "compiled_cache": None,
+        },
+        "connect_args": connect_args(db_url),
+    }
+
+
 class Database:
-    def __init__(self, db_url: str) -> None:
-        self._engine = create_engine(
-            db_url,
-            echo=True,
-            pool_pre_ping=True,
-            execution_options={
-                "compiled_cache": None,
-            },
-            connect_args={
-                "sslmode": "require",
-                "prepare_threshold": 0,
-            },
-        )
+    def __init__(self, db_url: str, replica_urls: Optional[List[str]] = None, replica_retry_seconds: float = 30) -> None:
+        url = make_url(db_url)
+        if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+            os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+        self._engine = create_engine(db_url, **_engine_options(db_url))
+        if url.get_backend_name() == "sqlite":
+            event.listen(self._engine, "connect", set_sqlite_pragmas)
 
         self._session_factory = orm.scoped_session(
             orm.sessionmaker(
+                class_=PrimarySession,
                 autocommit=False,
                 autoflush=False,
                 bind=self._engine,
             ),
         )
+        # not scoped: a session of its own even on a thread whose scoped session has a transaction open
+        self._separate_session_factory = orm.sessionmaker(class_=PrimarySession, autoflush=False, bind=self._engine)
+        self._replicas = ReplicaSet(
+            [create_engine(replica_url, **_engine_options(replica_url)) for replica_url in replica_urls or []],
+            replica_retry_seconds,
+        )
 
     def create_database(self) -> None:
         SQLModel.metadata.create_all(self._engine)
+        # tables created here (visualization) have no migration to add their search indexes
+        try:
+            with self._engine.begin() as connection:
+                create_search_indexes(connection)
+        except DBAPIError as e:
+            logger.warning(f"search indexes not created, __search/__prefix filters will scan: {e}")
 
     @contextmanager
     def session(self):
@@ -56,4 +209,86 @@ class Database:
         finally:
             session.close()
 
+    @contextmanager
+    def separate_session(self):
+        """Session on a connection of its own, for writes that must commit while this thread's `session` is still in
+        a transaction (e.g. ingestion heartbeats during a table load)."""
+        session = self._separate_session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @contextmanager
+    def read_session(self):
+        """Session for reads: a replica when there are healthy ones and the current scope has not written yet."""
+        connection = None if reads_pinned_to_primary() else self._replicas.connect()
+        if connection is None:
+            with self.session() as session:
+                yield session
+            return
+        session = Session(bind=connection, autoflush=False)
+        try:
+            yield session
+        finally:
+            session.close()
+            connection.close()
+
+
+class AsyncDatabase:
+    """asyncio counterpart of Database: awaiting the database frees the event loop instead of a threadpool worker."""
+
+    def __init__(self, db_url: str, replica_urls: Optional[List[str]] = None, replica_retry_seconds: float = 30) -> None:
+        url = async_url(db_url)
+        if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+            os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+        self._engine = create_async_engine(url, **_engine_options(db_url))
+        if url.get_backend_name() == "sqlite":
+            event.listen(self._engine.sync_engine, "connect", set_sqlite_pragmas)
+
+        # objects stay readable after commit; sessions are per call, so there is nothing to refresh them from
+        self._session_factory = async_sessionmaker(
+            bind=self._engine,
+            sync_session_class=PrimarySession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        self._replicas = ReplicaSet(
+            [create_async_engine(async_url(replica_url), **_engine_options(replica_url)) for replica_url in replica_urls or []],
+            replica_retry_seconds,
+        )
+
+    @asynccontextmanager
+    async def session(self):
+        session = self._session_factory()
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    @asynccontextmanager
+    async def read_session(self):
+        connection = None if reads_pinned_to_primary() else await self._replicas.aconnect()
+        if connection is None:
+            async with self.session() as session:
+                yield session
+            return
+        session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+        try:
+            yield session
+        finally:
+            await session.close()
+            await connection.close()
 
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+        for engine in self._replicas.engines:
+            await engine.dispose()
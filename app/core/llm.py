@@ -0,0 +1,33 @@
+from functools import lru_cache
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from app.core.config import configs
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=configs.AGENT_LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=configs.AGENT_LLM_MAX_KEEPALIVE,
+        keepalive_expiry=configs.AGENT_LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def create_chat_model(model: str = None, base_url: str = None) -> ChatOpenAI:
+    """ChatOpenAI backed by keep-alive httpx pools, meant to be created once per process."""
+    timeout = httpx.Timeout(configs.AGENT_LLM_TIMEOUT_SECONDS, connect=10.0)
+    return ChatOpenAI(
+        base_url=base_url or configs.AGENT_LLM_BASE_URL,
+        model=model or configs.AGENT_MODEL,
+        temperature=0,
+        timeout=configs.AGENT_LLM_TIMEOUT_SECONDS,
+        http_client=httpx.Client(limits=_limits(), timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=_limits(), timeout=timeout),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_chat_model() -> ChatOpenAI:
+    """Process-wide client for callers that are not wired through the container."""
+    return create_chat_model()
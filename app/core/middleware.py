@@ -1,9 +1,17 @@
 from functools import wraps
+from typing import Dict, List, Optional
 
 from dependency_injector.wiring import inject as di_inject
 from loguru import logger
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
 
+from app.core.database import read_your_writes
 from app.services.base_service import BaseService
+from app.util.compression import CompressedCache, StreamCompressor, body_digest, compress, is_compressible, negotiate
+
+# bodies larger than this are compressed on the threadpool instead of the event loop
+THREADPOOL_COMPRESS_BYTES = 256 * 1024
 
 
 def inject(func):
@@ -23,3 +31,118 @@ def inject(func):
         return result
 
     return wrapper
+
+
+class ReadYourWritesMiddleware:
+    """Gives each request a read-your-writes scope: after the request writes, its reads leave the replicas."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with read_your_writes():
+            await self.app(scope, receive, send)
+
+
+class CompressionMiddleware:
+    """Compresses responses with the encoding the client prefers among `encodings` (Accept-Encoding).
+
+    Bodies sent in one piece are compressed whole when they reach `minimum_size`. Those with an ETag are usually sent
+    again unchanged, so they are compressed once at `cached_levels` and reused from `cache`, found by their bytes.
+    Streamed bodies (NDJSON, SSE) are compressed chunk by chunk and flushed after each one, so clients still get every
+    chunk at once.
+    """
+
+    def __init__(
+        self,
+        app,
+        encodings: List[str],
+        levels: Dict[str, int],
+        cached_levels: Dict[str, int],
+        minimum_size: int = 1024,
+        cache_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.app = app
+        self.encodings = encodings
+        self.levels = levels
+        self.cached_levels = cached_levels
+        self.minimum_size = minimum_size
+        self.cache = CompressedCache(cache_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        stream = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if stream is not None:
+                chunk = stream.compress(body) + (b"" if more_body else stream.finish())
+                return await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if not self._compressible(start["status"], headers):
+                passthrough = True
+                await send(start)
+                return await send(message)
+            vary = headers.get("vary", "")
+            if "accept-encoding" not in vary.lower():
+                headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+            if not more_body and len(body) < self.minimum_size:
+                passthrough = True
+                await send({**start, "headers": headers.raw})
+                return await send(message)
+
+            headers["Content-Encoding"] = encoding
+            if more_body:
+                del headers["content-length"]
+                stream = StreamCompressor(encoding, self.levels[encoding])
+                await send({**start, "headers": headers.raw})
+                return await send({"type": "http.response.body", "body": stream.compress(body), "more_body": True})
+
+            body = await self._compress_whole(encoding, body, headers.get("etag"))
+            headers["Content-Length"] = str(len(body))
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(status: int, headers: MutableHeaders) -> bool:
+        return (
+            status >= 200
+            and status not in (204, 304)
+            and "content-encoding" not in headers
+            and is_compressible(headers.get("content-type", ""))
+        )
+
+    async def _compress_whole(self, encoding: str, body: bytes, etag: Optional[str]) -> bytes:
+        if not etag:
+            return await self._offload(len(body), compress, encoding, body, self.levels[encoding])
+        # keyed by the bytes themselves, not the ETag: a stale ETag must never serve a stale body
+        key = (await self._offload(len(body), body_digest, body), encoding)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        compressed = await self._offload(len(body), compress, encoding, body, self.cached_levels[encoding])
+        self.cache.set(key, compressed)
+        return compressed
+
+    @staticmethod
+    async def _offload(size: int, func, *args):
+        # work on large bodies goes to the threadpool instead of blocking the event loop
+        return await run_in_threadpool(func, *args) if size > THREADPOOL_COMPRESS_BYTES else func(*args)
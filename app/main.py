@@ -1,13 +1,20 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1.routes import routers as v1_routers
 from app.api.v2.routes import routers as v2_routers
 from app.core.config import configs
 from app.core.container import Container
+from app.core.middleware import CompressionMiddleware, ReadYourWritesMiddleware
+from app.util.chart_storage import chart_codec
 from app.util.class_object import singleton
+from app.util.compression import available_encodings, parse_levels
 from app.model.dataset import Dataset
 from app.model.visualization import Visualization
+from app.model.answer_cache import AnswerCacheEntry
+from app.model.dataset_profile import DatasetColumnProfile
+from app.model.ingestion_job import IngestionJob
 
 
 @singleton
@@ -18,6 +25,14 @@ class AppCreator:
             title=configs.PROJECT_NAME,
             openapi_url=f"{configs.API}/openapi.json",
             version="0.0.1",
+            default_response_class=ORJSONResponse,
+        )
+
+        chart_codec.configure(
+            configs.CHART_CONFIG_STORAGE,
+            configs.CHART_CONFIG_DICT_DIR,
+            configs.CHART_CONFIG_COMPRESS_MIN_BYTES,
+            configs.CHART_CONFIG_ZSTD_LEVEL,
         )
 
         # set db and container
@@ -25,6 +40,24 @@ class AppCreator:
         self.db = self.container.db()
         self.db.create_database()
 
+        # resume or fail uploads a previous process left unfinished
+        self.container.ingestion_service().recover_jobs()
+
+        self.app.add_event_handler("shutdown", self.container.async_db().dispose)
+
+        self.app.add_middleware(ReadYourWritesMiddleware)
+
+        encodings = available_encodings([name.strip() for name in configs.COMPRESSION_ENCODINGS.split(",") if name.strip()])
+        if encodings:
+            self.app.add_middleware(
+                CompressionMiddleware,
+                encodings=encodings,
+                levels=parse_levels(configs.COMPRESSION_LEVELS),
+                cached_levels=parse_levels(configs.COMPRESSION_CACHED_LEVELS),
+                minimum_size=configs.COMPRESSION_MIN_BYTES,
+                cache_bytes=configs.COMPRESSION_CACHE_BYTES,
+            )
+
         # set cors
         if configs.BACKEND_CORS_ORIGINS:
             self.app.add_middleware(
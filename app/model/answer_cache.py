@@ -0,0 +1,14 @@
+from sqlmodel import Field
+
+from app.model.base_model import BaseModel
+
+
+class AnswerCacheEntry(BaseModel, table=True):
+    __tablename__ = "agent_answer_cache"
+    cache_key: str = Field(unique=True, index=True)
+    dataset_id: int = Field(index=True)
+    dataset_version: str = Field()
+    payload: str = Field(description="JSON string of the cached agent answer")
+    compute_seconds: float = Field(default=0.0)
+    expires_at: float = Field(default=0.0, description="Unix timestamp, 0 means no expiry")
+    last_accessed_at: float = Field(default=0.0, index=True, description="Unix timestamp used for LRU eviction")
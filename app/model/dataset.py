@@ -1,11 +1,15 @@
 from sqlmodel import Field, Relationship
-from typing import Optional, List
+from typing import ClassVar, List, Optional, Tuple
 from app.model.base_model import BaseModel
 from app.model.visualization import Visualization
 
 class Dataset(BaseModel, table=True):
+    # left out of summary listings (?summary=true)
+    summary_excludes: ClassVar[Tuple[str, ...]] = ("columns_metadata",)
+
     filename: str = Field(index=True)
     table_name: str = Field(unique=True, index=True)
     columns_metadata: str = Field(default="{}", description="JSON string of column metadata")
+    engine: str = Field(default="sql", description="Where agent SQL runs: sql (dataset table) | duckdb (Parquet files)")
     
     visualizations: List["Visualization"] = Relationship(back_populates="dataset")
@@ -0,0 +1,19 @@
+from typing import Optional
+
+from sqlmodel import Field
+
+from app.model.base_model import BaseModel
+
+
+class DatasetColumnProfile(BaseModel, table=True):
+    __tablename__ = "dataset_column_profile"
+    dataset_id: int = Field(foreign_key="dataset.id", index=True, nullable=False)
+    column_name: str = Field()
+    dtype: str = Field()
+    null_ratio: float = Field(default=0.0)
+    distinct_count: int = Field(default=0)
+    distinct_is_estimate: bool = Field(default=False)
+    min_value: Optional[str] = Field(default=None, nullable=True)
+    max_value: Optional[str] = Field(default=None, nullable=True)
+    top_values: str = Field(default="[]", description="JSON list of [value, count] pairs")
+    sample_values: str = Field(default="[]", description="JSON list of sample values")
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from sqlmodel import BigInteger, Field
+
+from app.model.base_model import BaseModel
+
+
+class IngestionJob(BaseModel, table=True):
+    __tablename__ = "dataset_ingestion_job"
+    filename: str = Field()
+    file_path: Optional[str] = Field(default=None, nullable=True, description="Spooled upload, removed when the job ends")
+    status: str = Field(default="queued", index=True, description="queued | running | completed | failed")
+    rows_ingested: int = Field(default=0, sa_type=BigInteger)
+    bytes_total: int = Field(default=0, sa_type=BigInteger)
+    bytes_processed: int = Field(default=0, sa_type=BigInteger)
+    attempts: int = Field(default=0)
+    split_sheets: bool = Field(default=False, description="Ingest every worksheet as its own dataset")
+    engine: str = Field(default="sql", description="Engine of the datasets the job creates")
+    dataset_id: Optional[int] = Field(default=None, foreign_key="dataset.id", nullable=True)
+    dataset_ids: str = Field(default="[]", description="JSON list of the datasets the job created")
+    error: Optional[str] = Field(default=None, nullable=True)
+    started_at: Optional[float] = Field(default=None, nullable=True, description="Unix timestamp of the current attempt")
+    worker_id: Optional[str] = Field(default=None, nullable=True, description="host:pid:token of the process owning the job")
+    heartbeat_at: Optional[float] = Field(default=None, nullable=True, description="Unix timestamp the owner last reported")
+    finished_at: Optional[float] = Field(default=None, nullable=True, description="Unix timestamp")
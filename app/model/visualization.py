@@ -1,12 +1,16 @@
 from sqlmodel import Field, Relationship
-from typing import Optional, Dict, Any
+from typing import Any, ClassVar, Dict, Optional, Tuple
 from app.model.base_model import BaseModel
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column
+from app.util.chart_storage import ChartConfigJSON
 
 class Visualization(BaseModel, table=True):
+    # left out of summary listings (?summary=true)
+    summary_excludes: ClassVar[Tuple[str, ...]] = ("chart_config", "sql_query", "explanation")
+
     dataset_id: int = Field(foreign_key="dataset.id", index=True, nullable=False)
     prompt: str = Field(nullable=False)
-    chart_config: Dict[str, Any] = Field(sa_column=Column(JSON), default={})
+    chart_config: Dict[str, Any] = Field(sa_column=Column(ChartConfigJSON()), default={})
     explanation: Optional[str] = Field(default=None)
     sql_query: Optional[str] = Field(default=None)
 
@@ -1,5 +1,8 @@
 from app.repository.post_repository import PostRepository
 from app.repository.tag_repository import TagRepository
 from app.repository.user_repository import UserRepository
-from app.repository.dataset_repository import DatasetRepository
-from app.repository.visualization_repository import VisualizationRepository
+from app.repository.dataset_repository import AsyncDatasetRepository, DatasetRepository
+from app.repository.visualization_repository import AsyncVisualizationRepository, VisualizationRepository
+from app.repository.answer_cache_repository import AnswerCacheRepository
+from app.repository.dataset_profile_repository import AsyncDatasetProfileRepository, DatasetProfileRepository
+from app.repository.ingestion_job_repository import IngestionJobRepository
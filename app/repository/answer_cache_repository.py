@@ -0,0 +1,76 @@
+from contextlib import AbstractContextManager
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.model.answer_cache import AnswerCacheEntry
+from app.repository.base_repository import BaseRepository
+
+
+class AnswerCacheRepository(BaseRepository):
+    def __init__(self, session_factory: Callable[..., AbstractContextManager[Session]]):
+        super().__init__(session_factory, AnswerCacheEntry)
+
+    def get_by_key(self, cache_key: str) -> Optional[AnswerCacheEntry]:
+        with self.session_factory() as session:
+            entry = session.query(self.model).filter(self.model.cache_key == cache_key).first()
+            if entry:
+                session.expunge(entry)
+            return entry
+
+    def upsert(self, cache_key: str, values: dict):
+        with self.session_factory() as session:
+            entry = session.query(self.model).filter(self.model.cache_key == cache_key).first()
+            if entry:
+                for column, value in values.items():
+                    setattr(entry, column, value)
+            else:
+                session.add(self.model(cache_key=cache_key, **values))
+            session.commit()
+
+    def touch(self, cache_key: str, accessed_at: float):
+        with self.session_factory() as session:
+            session.query(self.model).filter(self.model.cache_key == cache_key).update(
+                {"last_accessed_at": accessed_at}
+            )
+            session.commit()
+
+    def delete_by_key(self, cache_key: str):
+        with self.session_factory() as session:
+            session.query(self.model).filter(self.model.cache_key == cache_key).delete()
+            session.commit()
+
+    def delete_by_dataset_id(self, dataset_id: int) -> int:
+        with self.session_factory() as session:
+            deleted = session.query(self.model).filter(self.model.dataset_id == dataset_id).delete()
+            session.commit()
+            return deleted
+
+    def delete_expired(self, now: float) -> int:
+        with self.session_factory() as session:
+            deleted = (
+                session.query(self.model)
+                .filter(self.model.expires_at > 0, self.model.expires_at <= now)
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+            return deleted
+
+    def evict_lru(self, max_entries: int) -> int:
+        with self.session_factory() as session:
+            overflow = session.query(self.model).count() - max_entries
+            if overflow <= 0:
+                return 0
+            stale_ids = [
+                row.id
+                for row in session.query(self.model.id).order_by(self.model.last_accessed_at.asc()).limit(overflow)
+            ]
+            deleted = session.query(self.model).filter(self.model.id.in_(stale_ids)).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+
+    def delete_all(self) -> int:
+        with self.session_factory() as session:
+            deleted = session.query(self.model).delete()
+            session.commit()
+            return deleted
@@ -0,0 +1,163 @@
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable, Generic, List, Optional, Type, TypeVar
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.config import configs
+from app.core.exceptions import DuplicatedError, NotFoundError, ValidationError
+from app.model.base_model import BaseModel
+from app.repository.base_repository import (
+    bulk_create_rows,
+    bulk_delete_rows,
+    bulk_update_rows,
+    page_options,
+    search_options,
+    update_row,
+)
+from app.util.projection import load_only_option, project, projected_columns, select_columns
+from app.util.pagination import acount_rows, order_by_clauses, seek_condition, split_page
+from app.util.query_builder import dict_to_sqlalchemy_filter_options
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class AsyncBaseRepository(Generic[T]):
+    """BaseRepository on an AsyncSession: same methods and results, awaited."""
+
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]],
+        model: Type[T],
+        read_session_factory: Optional[Callable[..., AbstractAsyncContextManager[AsyncSession]]] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
+        self.model = model
+
+    async def read_by_options(self, schema: T, eager: bool = False) -> dict:
+        async with self.read_session_factory() as session:
+            options = page_options(schema)
+            order_column, descending, order_by = order_by_clauses(self.model, options["ordering"])
+            filter_options = dict_to_sqlalchemy_filter_options(self.model, schema.dict(exclude_none=True))
+            statement = select(self.model)
+            if eager:
+                for eager in getattr(self.model, "eagers", []):
+                    statement = statement.options(joinedload(getattr(self.model, eager)))
+            filtered_statement = statement.where(filter_options)
+            statement = filtered_statement.order_by(*order_by)
+            try:
+                columns = projected_columns(self.model, options["fields"], options["summary"])
+            except ValueError as e:
+                raise ValidationError(detail=str(e))
+            if columns:
+                statement = statement.options(load_only_option(self.model, columns, order_column))
+            page_size, next_cursor = options["page_size"], None
+            if page_size != "all":
+                if options["cursor"]:
+                    try:
+                        seek = seek_condition(
+                            self.model,
+                            order_column,
+                            descending,
+                            options["ordering"],
+                            options["cursor"],
+                            session.get_bind().dialect.name,
+                        )
+                    except ValueError as e:
+                        raise ValidationError(detail=str(e))
+                    statement = statement.where(seek)
+                else:
+                    statement = statement.offset((options["page"] - 1) * page_size)
+                statement = statement.limit(page_size + 1)
+            founds = list((await session.execute(statement)).unique().scalars().all())
+            if page_size != "all":
+                founds, next_cursor = split_page(founds, page_size, options["ordering"], order_column)
+
+            if page_size == "all" and options["count"] != "none":
+                total_count = len(founds)
+            else:
+                total_count = await acount_rows(
+                    session, filtered_statement, options["count"], configs.COUNT_CACHE_TTL_SECONDS
+                )
+            if columns:
+                founds = project(founds, columns)
+            return {"founds": founds, "search_options": search_options(options, total_count, next_cursor)}
+
+    async def read_list(self, columns: Optional[List[str]] = None) -> list:
+        async with self.read_session_factory() as session:
+            if columns:
+                return [dict(row) for row in (await session.execute(select_columns(self.model, columns))).mappings()]
+            return list((await session.execute(select(self.model))).scalars().all())
+
+    async def read_version(self, condition=None) -> tuple:
+        """(row count, max(updated_at)) of the table, or of the rows matching `condition`: a change marker for ETags.
+        Inserts and updates move max(updated_at), deletes the count."""
+        async with self.read_session_factory() as session:
+            statement = select(func.count(), func.max(self.model.updated_at)).select_from(self.model)
+            if condition is not None:
+                statement = statement.where(condition)
+            return tuple((await session.execute(statement)).one())
+
+    async def read_by_id(self, id: int, eager: bool = False):
+        async with self.read_session_factory() as session:
+            statement = select(self.model).where(self.model.id == id)
+            if eager:
+                for eager in getattr(self.model, "eagers", []):
+                    statement = statement.options(joinedload(getattr(self.model, eager)))
+            query = (await session.execute(statement)).unique().scalars().first()
+            if not query:
+                raise NotFoundError(detail=f"not found id : {id}")
+            return query
+
+    async def create(self, schema: T):
+        async with self.session_factory() as session:
+            query = self.model(**schema.dict())
+            try:
+                session.add(query)
+                await session.commit()
+                await session.refresh(query)
+            except IntegrityError as e:
+                raise DuplicatedError(detail=str(e.orig))
+            return query
+
+    async def update(self, id: int, schema: T, eager: bool = False):
+        return await self._update(id, schema.dict(exclude_none=True), eager)
+
+    async def update_attr(self, id: int, column: str, value: Any, eager: bool = False):
+        return await self._update(id, {column: value}, eager)
+
+    async def whole_update(self, id: int, schema: T, eager: bool = False):
+        return await self._update(id, schema.dict(), eager)
+
+    async def _update(self, id: int, values: dict, eager: bool = False):
+        async with self.session_factory() as session:
+            query = await session.run_sync(update_row, self.model, id, values, eager)
+            await session.commit()
+            return query
+
+    async def bulk_create(self, schemas: List[T]) -> dict:
+        async with self.session_factory() as session:
+            return await session.run_sync(bulk_create_rows, self.model, schemas)
+
+    async def bulk_update(self, schemas: List[T]) -> dict:
+        async with self.session_factory() as session:
+            return await session.run_sync(bulk_update_rows, self.model, schemas)
+
+    async def bulk_delete(self, ids: List[int]) -> dict:
+        async with self.session_factory() as session:
+            return await session.run_sync(bulk_delete_rows, self.model, ids)
+
+    async def delete_by_id(self, id: int):
+        async with self.session_factory() as session:
+            query = (await session.execute(select(self.model).where(self.model.id == id))).scalars().first()
+            if not query:
+                raise NotFoundError(detail=f"not found id : {id}")
+            await session.delete(query)
+            await session.commit()
+
+    async def close_scoped_session(self):
+        # sessions are opened and closed per call; there is no scoped session to release
+        return None
@@ -1,73 +1,226 @@
 from contextlib import AbstractContextManager
-from typing import Any, Callable, Type, TypeVar, Generic
+from typing import Any, Callable, List, Optional, Tuple, Type, TypeVar, Generic
 
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.core.config import configs
-from app.core.exceptions import DuplicatedError, NotFoundError
+from app.core.exceptions import DuplicatedError, NotFoundError, ValidationError
 from app.model.base_model import BaseModel
+from app.util.projection import load_only_option, project, projected_columns, select_columns
+from app.util.pagination import count_rows, order_by_clauses, seek_condition, split_page
 from app.util.query_builder import dict_to_sqlalchemy_filter_options
 
 T = TypeVar("T", bound=BaseModel)
 
 
+def page_options(schema: Any) -> dict:
+    schema_as_dict: dict = schema.dict(exclude_none=True)
+    page_size = schema_as_dict.get("page_size", configs.PAGE_SIZE)
+    if page_size != "all":
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            page_size = configs.PAGE_SIZE # Fallback if invalid string
+    return {
+        "ordering": schema_as_dict.get("ordering", configs.ORDERING),
+        "page": schema_as_dict.get("page", configs.PAGE),
+        "page_size": page_size,
+        "cursor": schema_as_dict.get("cursor"),
+        "count": schema_as_dict.get("count", configs.COUNT_MODE),
+        "fields": schema_as_dict.get("fields"),
+        "summary": schema_as_dict.get("summary", False),
+    }
+
+
+def search_options(options: dict, total_count, next_cursor) -> dict:
+    return {
+        "page": None if options["cursor"] else options["page"],
+        "page_size": options["page_size"],
+        "ordering": options["ordering"],
+        "cursor": options["cursor"],
+        "count": options["count"],
+        "total_count": total_count,
+        "next_cursor": next_cursor,
+    }
+
+
+def update_row(session: Session, model, id: int, values: dict, eager: bool = False):
+    """UPDATE one row by id and return it: a single UPDATE ... RETURNING where the dialect has it (PostgreSQL,
+    SQLite, MariaDB), otherwise the UPDATE and a SELECT on the same connection. Raises NotFoundError."""
+    loaders = [selectinload(getattr(model, name)) for name in getattr(model, "eagers", [])] if eager else []
+    statement = update(model).where(model.id == id).values(**values)
+    if session.get_bind().dialect.update_returning:
+        found = session.scalars(statement.returning(model).options(*loaders)).first()
+    else:
+        session.execute(statement)
+        found = session.scalars(select(model).where(model.id == id).options(*loaders)).first()
+    if found is None:
+        raise NotFoundError(detail=f"not found id : {id}")
+    # detach before the commit so the returned row is not expired and reloaded
+    session.expunge_all()
+    return found
+
+
+def _in_savepoints(session: Session, items: List[Tuple[int, Any]], run: Callable[[List[Tuple[int, Any]]], list]):
+    """Run `run` on all items in one savepoint; if the database rejects the batch, split it in halves and retry
+    each, so only the failing items are reported and everything else is still written in the same transaction."""
+    try:
+        with session.begin_nested():
+            return run(items), []
+    except DBAPIError as e:
+        if len(items) == 1:
+            index, item = items[0]
+            return [], [{"index": index, "id": item.get("id") if isinstance(item, dict) else None, "detail": str(e.orig)}]
+    middle = len(items) // 2
+    first, first_errors = _in_savepoints(session, items[:middle], run)
+    second, second_errors = _in_savepoints(session, items[middle:], run)
+    return first + second, first_errors + second_errors
+
+
+def bulk_create_rows(session: Session, model, schemas: List[Any]) -> dict:
+    rows = []
+    for schema in schemas:
+        instance = model(**schema.dict())
+        # unset columns are left to their server defaults (id, created_at, ...)
+        rows.append({column.key: getattr(instance, column.key) for column in model.__table__.columns
+                     if getattr(instance, column.key, None) is not None})
+    returning = session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order
+
+    def insert_rows(batch):
+        if returning:
+            # one executemany INSERT ... RETURNING, rows come back in input order
+            statement = insert(model).returning(model, sort_by_parameter_order=True)
+            return list(session.scalars(statement, [row for _, row in batch]))
+        instances = [model(**row) for _, row in batch]
+        session.add_all(instances)
+        session.flush()
+        return instances
+
+    founds, errors = _in_savepoints(session, list(enumerate(rows)), insert_rows)
+    for found in founds:
+        session.expunge(found)
+    session.commit()
+    return {"founds": founds, "errors": errors}
+
+
+def bulk_update_rows(session: Session, model, schemas: List[Any]) -> dict:
+    rows = [schema.dict(exclude_none=True) for schema in schemas]
+    ids = [row.get("id") for row in rows]
+    existing = set(session.scalars(select(model.id).where(model.id.in_([id for id in ids if id is not None]))))
+    errors = [{"index": index, "id": id, "detail": f"not found id : {id}"} for index, id in enumerate(ids) if id not in existing]
+    valid = [(index, row) for index, row in enumerate(rows) if row.get("id") in existing]
+
+    def update_rows(batch):
+        changed = [row for _, row in batch if len(row) > 1]
+        if changed:
+            # ORM bulk UPDATE by primary key: one executemany per set of changed columns
+            session.execute(update(model), changed)
+        return [row["id"] for _, row in batch]
+
+    updated_ids, failed = _in_savepoints(session, valid, update_rows)
+    founds = {found.id: found for found in session.scalars(select(model).where(model.id.in_(updated_ids)))}
+    for found in founds.values():
+        session.expunge(found)
+    session.commit()
+    return {"founds": [founds[id] for id in updated_ids], "errors": sorted(errors + failed, key=lambda e: e["index"])}
+
+
+def bulk_delete_rows(session: Session, model, ids: List[int]) -> dict:
+    instances = {instance.id: instance for instance in session.scalars(select(model).where(model.id.in_(ids)))}
+    errors = [{"index": index, "id": id, "detail": f"not found id : {id}"} for index, id in enumerate(ids) if id not in instances]
+    valid = [(index, {"id": id}) for index, id in enumerate(ids) if id in instances]
+
+    def delete_rows(batch):
+        # ORM deletes keep relationship cascades and are flushed as one executemany DELETE by primary key
+        for _, row in batch:
+            session.delete(instances[row["id"]])
+        session.flush()
+        return [row["id"] for _, row in batch]
+
+    deleted_ids, failed = _in_savepoints(session, valid, delete_rows)
+    session.commit()
+    return {"founds": deleted_ids, "errors": sorted(errors + failed, key=lambda e: e["index"])}
+
+
 class BaseRepository(Generic[T]):
-    def __init__(self, session_factory: Callable[..., AbstractContextManager[Session]], model: Type[T]) -> None:
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        model: Type[T],
+        read_session_factory: Optional[Callable[..., AbstractContextManager[Session]]] = None,
+    ) -> None:
         self.session_factory = session_factory
+        # read_* may be served by a replica (Database.read_session); writes always use session_factory
+        self.read_session_factory = read_session_factory or session_factory
         self.model = model
 
     def read_by_options(self, schema: T, eager: bool = False) -> dict:
-        with self.session_factory() as session:
-            schema_as_dict: dict = schema.dict(exclude_none=True)
-            ordering: str = schema_as_dict.get("ordering", configs.ORDERING)
-            order_query = (
-                getattr(self.model, ordering[1:]).desc()
-                if ordering.startswith("-")
-                else getattr(self.model, ordering).asc()
-            )
-            page = schema_as_dict.get("page", configs.PAGE)
-            page_size = schema_as_dict.get("page_size", configs.PAGE_SIZE)
+        with self.read_session_factory() as session:
+            options = page_options(schema)
+            order_column, descending, order_by = order_by_clauses(self.model, options["ordering"])
             filter_options = dict_to_sqlalchemy_filter_options(self.model, schema.dict(exclude_none=True))
             query = session.query(self.model)
             if eager:
                 for eager in getattr(self.model, "eagers", []):
                     query = query.options(joinedload(getattr(self.model, eager)))
             filtered_query = query.filter(filter_options)
-            query = filtered_query.order_by(order_query)
+            query = filtered_query.order_by(*order_by)
+            columns = self._projection(options)
+            if columns:
+                query = query.options(load_only_option(self.model, columns, order_column))
+            page_size, next_cursor = options["page_size"], None
             if page_size == "all":
                 query = query.all()
             else:
-                try:
-                    page_size = int(page_size)
-                except ValueError:
-                    page_size = configs.PAGE_SIZE # Fallback if invalid string
-                
-                query = query.limit(page_size).offset((page - 1) * page_size).all()
-            
+                if options["cursor"]:
+                    # keyset: seek past the last row of the previous page instead of scanning `offset` rows
+                    query = query.filter(self._seek(order_column, descending, options, session.get_bind().dialect.name))
+                else:
+                    query = query.offset((options["page"] - 1) * page_size)
+                query, next_cursor = split_page(
+                    query.limit(page_size + 1).all(), page_size, options["ordering"], order_column
+                )
+
             for obj in query:
                 session.expunge(obj)
-                
-            total_count = filtered_query.count()
-            return {
-                "founds": query,
-                "search_options": {
-                    "page": page,
-                    "page_size": page_size,
-                    "ordering": ordering,
-                    "total_count": total_count,
-                },
-            }
-
-    def read_list(self) -> list[T]:
-        with self.session_factory() as session:
+
+            if page_size == "all" and options["count"] != "none":
+                total_count = len(query)
+            else:
+                total_count = count_rows(
+                    session, filtered_query.statement, options["count"], configs.COUNT_CACHE_TTL_SECONDS
+                )
+            founds = project(query, columns) if columns else query
+            return {"founds": founds, "search_options": search_options(options, total_count, next_cursor)}
+
+    def _seek(self, order_column, descending: bool, options: dict, dialect: str):
+        try:
+            return seek_condition(
+                self.model, order_column, descending, options["ordering"], options["cursor"], dialect
+            )
+        except ValueError as e:
+            raise ValidationError(detail=str(e))
+
+    def _projection(self, options: dict) -> Optional[List[str]]:
+        try:
+            return projected_columns(self.model, options["fields"], options["summary"])
+        except ValueError as e:
+            raise ValidationError(detail=str(e))
+
+    def read_list(self, columns: Optional[List[str]] = None) -> list:
+        """Every row; with `columns`, only those columns of every row, as dicts."""
+        with self.read_session_factory() as session:
+            if columns:
+                return [dict(row) for row in session.execute(select_columns(self.model, columns)).mappings()]
             items = session.query(self.model).all()
             for item in items:
                 session.expunge(item)
             return items
 
     def read_by_id(self, id: int, eager: bool = False):
-        with self.session_factory() as session:
+        with self.read_session_factory() as session:
             query = session.query(self.model)
             if eager:
                 for eager in getattr(self.model, "eagers", []):
@@ -90,29 +243,32 @@ class BaseRepository(Generic[T]):
             session.expunge(query)
             return query
 
-    def update(self, id: int, schema: T):
+    def update(self, id: int, schema: T, eager: bool = False):
+        return self._update(id, schema.dict(exclude_none=True), eager)
+
+    def update_attr(self, id: int, column: str, value: Any, eager: bool = False):
+        return self._update(id, {column: value}, eager)
+
+    def whole_update(self, id: int, schema: T, eager: bool = False):
+        return self._update(id, schema.dict(), eager)
+
+    def _update(self, id: int, values: dict, eager: bool = False):
         with self.session_factory() as session:
-            session.query(self.model).filter(self.model.id == id).update(schema.dict(exclude_none=True))
+            query = update_row(session, self.model, id, values, eager)
             session.commit()
-            instance = self.read_by_id(id)
-            session.expunge(instance)
-            return instance
+            return query
 
-    def update_attr(self, id: int, column: str, value: Any):
+    def bulk_create(self, schemas: List[T]) -> dict:
         with self.session_factory() as session:
-            session.query(self.model).filter(self.model.id == id).update({column: value})
-            session.commit()
-            instance = self.read_by_id(id)
-            session.expunge(instance)
-            return instance
+            return bulk_create_rows(session, self.model, schemas)
 
-    def whole_update(self, id: int, schema: T):
+    def bulk_update(self, schemas: List[T]) -> dict:
         with self.session_factory() as session:
-            session.query(self.model).filter(self.model.id == id).update(schema.dict())
-            session.commit()
-            instance = self.read_by_id(id)
-            session.expunge(instance)
-            return instance
+            return bulk_update_rows(session, self.model, schemas)
+
+    def bulk_delete(self, ids: List[int]) -> dict:
+        with self.session_factory() as session:
+            return bulk_delete_rows(session, self.model, ids)
 
     def delete_by_id(self, id: int):
         with self.session_factory() as session:
@@ -0,0 +1,51 @@
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import Callable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.model.dataset_profile import DatasetColumnProfile
+from app.repository.async_base_repository import AsyncBaseRepository
+from app.repository.base_repository import BaseRepository
+
+
+class DatasetProfileRepository(BaseRepository):
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        read_session_factory: Optional[Callable[..., AbstractContextManager[Session]]] = None,
+    ):
+        super().__init__(session_factory, DatasetColumnProfile, read_session_factory)
+
+    def replace_for_dataset(self, dataset_id: int, profiles: List[dict]):
+        with self.session_factory() as session:
+            session.query(self.model).filter(self.model.dataset_id == dataset_id).delete()
+            session.add_all([self.model(dataset_id=dataset_id, **profile) for profile in profiles])
+            session.commit()
+
+    def get_by_dataset_id(self, dataset_id: int) -> List[DatasetColumnProfile]:
+        with self.read_session_factory() as session:
+            items = (
+                session.query(self.model)
+                .filter(self.model.dataset_id == dataset_id)
+                .order_by(self.model.id.asc())
+                .all()
+            )
+            for item in items:
+                session.expunge(item)
+            return items
+
+
+class AsyncDatasetProfileRepository(AsyncBaseRepository):
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]],
+        read_session_factory: Optional[Callable[..., AbstractAsyncContextManager[AsyncSession]]] = None,
+    ):
+        super().__init__(session_factory, DatasetColumnProfile, read_session_factory)
+
+    async def get_by_dataset_id(self, dataset_id: int) -> List[DatasetColumnProfile]:
+        async with self.read_session_factory() as session:
+            statement = select(self.model).where(self.model.dataset_id == dataset_id).order_by(self.model.id.asc())
+            return list((await session.execute(statement)).scalars().all())
@@ -1,22 +1,47 @@
-from contextlib import AbstractContextManager
-from typing import Callable
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.model.dataset import Dataset
+from app.repository.async_base_repository import AsyncBaseRepository
 from app.repository.base_repository import BaseRepository
+from app.util.ingestion import ChunkedTableWriter, quote_identifier
 import pandas as pd
 
 class DatasetRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[..., AbstractContextManager[Session]]):
-        super().__init__(session_factory, Dataset)
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        read_session_factory: Optional[Callable[..., AbstractContextManager[Session]]] = None,
+    ):
+        super().__init__(session_factory, Dataset, read_session_factory)
 
     def create_table_from_df(self, df: pd.DataFrame, table_name: str):
+        return self.create_table_from_chunks([df], table_name)
+
+    def create_table_from_chunks(self, chunks: Iterable[pd.DataFrame], table_name: str) -> Dict[str, str]:
+        # DDL from the first chunk's dtypes, then COPY FROM STDIN on PostgreSQL / batched executemany elsewhere;
+        # each chunk is loaded as soon as it is parsed. Returns the reconciled dtype of every column.
         with self.session_factory() as session:
-            engine = session.get_bind()
-            df.to_sql(table_name, con=engine, if_exists='fail', index=False)
+            writer = ChunkedTableWriter(session.connection(), table_name)
+            for df in chunks:
+                writer.write(df)
+            if not writer.kinds:
+                raise ValueError("File contains no data")
+            return writer.dtype_names()
 
-    def get_preview(self, table_name: str, limit: int = 20):
+    def iter_table_chunks(self, table_name: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
         from sqlalchemy import text
         with self.session_factory() as session:
+            connection = session.connection()
+            statement = text(f"SELECT * FROM {quote_identifier(table_name, connection.dialect.name)}")
+            yield from pd.read_sql(statement, connection, chunksize=chunk_rows)
+
+    def get_preview(self, table_name: str, limit: int = 20):
+        from sqlalchemy import text
+        with self.read_session_factory() as session:
             try:
                 # Safe parameterized query? Table names can't be parameterized in standard SQL easily without risk,
                 # but these table names are generated by us (sanitized).
@@ -27,3 +52,23 @@ class DatasetRepository(BaseRepository):
             except Exception as e:
                 print(f"Error getting preview: {e}")
                 return []
+
+
+class AsyncDatasetRepository(AsyncBaseRepository):
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]],
+        read_session_factory: Optional[Callable[..., AbstractAsyncContextManager[AsyncSession]]] = None,
+    ):
+        super().__init__(session_factory, Dataset, read_session_factory)
+
+    async def get_preview(self, table_name: str, limit: int = 20):
+        async with self.read_session_factory() as session:
+            try:
+                # table names are generated by us (sanitized), see DatasetRepository.get_preview
+                result = await session.execute(text(f"SELECT * FROM {table_name} LIMIT :limit"), {"limit": limit})
+                keys = result.keys()
+                return [dict(zip(keys, row)) for row in result.fetchall()]
+            except Exception:
+                logger.exception(f"Error getting preview of {table_name}")
+                return []
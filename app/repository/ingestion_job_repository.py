@@ -0,0 +1,102 @@
+import time
+from contextlib import AbstractContextManager
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.model.ingestion_job import IngestionJob
+from app.repository.base_repository import BaseRepository
+
+UNFINISHED = ("queued", "running")
+
+
+class IngestionJobRepository(BaseRepository):
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        heartbeat_session_factory: Optional[Callable[..., AbstractContextManager[Session]]] = None,
+    ):
+        super().__init__(session_factory, IngestionJob)
+        # the load of a job runs in session_factory's (thread-scoped) session; heartbeats must not commit it
+        self.heartbeat_session_factory = heartbeat_session_factory or session_factory
+
+    def create_job(
+        self,
+        filename: str,
+        file_path: str,
+        bytes_total: int,
+        split_sheets: bool = False,
+        engine: str = "sql",
+        worker_id: Optional[str] = None,
+    ) -> IngestionJob:
+        with self.session_factory() as session:
+            job = self.model(
+                filename=filename,
+                file_path=file_path,
+                bytes_total=bytes_total,
+                split_sheets=split_sheets,
+                engine=engine,
+                worker_id=worker_id,
+                heartbeat_at=time.time(),
+            )
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            session.expunge(job)
+            return job
+
+    def update_fields(self, job_id: int, **values):
+        with self.session_factory() as session:
+            session.query(self.model).filter(self.model.id == job_id).update(values)
+            session.commit()
+
+    def heartbeat(self, job_id: int, **values):
+        """update_fields on a session of its own, while the job's load transaction is still open."""
+        with self.heartbeat_session_factory() as session:
+            session.query(self.model).filter(self.model.id == job_id).update(values)
+            session.commit()
+
+    def claim(self, job_id: int, started_at: float, worker_id: Optional[str] = None) -> bool:
+        """Move a queued job to running; False when another worker already took it."""
+        with self.session_factory() as session:
+            claimed = (
+                session.query(self.model)
+                .filter(self.model.id == job_id, self.model.status == "queued")
+                .update(
+                    {
+                        "status": "running",
+                        "started_at": started_at,
+                        "worker_id": worker_id,
+                        "heartbeat_at": started_at,
+                        "attempts": self.model.attempts + 1,
+                        "rows_ingested": 0,
+                        "bytes_processed": 0,
+                    }
+                )
+            )
+            session.commit()
+            return claimed == 1
+
+    def requeue(self, job: IngestionJob, worker_id: Optional[str]) -> bool:
+        """Hand an unfinished job to `worker_id`; False when its owner changed since `job` was read."""
+        with self.session_factory() as session:
+            owner = self.model.worker_id.is_(None) if job.worker_id is None else self.model.worker_id == job.worker_id
+            requeued = (
+                session.query(self.model)
+                .filter(self.model.id == job.id, self.model.status == job.status, owner)
+                .update({"status": "queued", "worker_id": worker_id, "heartbeat_at": time.time()})
+            )
+            session.commit()
+            return requeued == 1
+
+    def read_unfinished(self) -> List[IngestionJob]:
+        with self.session_factory() as session:
+            items = (
+                session.query(self.model)
+                .filter(self.model.status.in_(UNFINISHED))
+                .order_by(self.model.id.asc())
+                .all()
+            )
+            for item in items:
+                session.expunge(item)
+            return items
@@ -1,17 +1,21 @@
 from contextlib import AbstractContextManager
-from typing import Callable
+from typing import Callable, Optional
 
 from sqlalchemy.orm import Session
 
 from app.model.post import Post
-from app.repository.base_repository import BaseRepository
+from app.repository.base_repository import BaseRepository, update_row
 from app.schema.post_tag_schema import UpsertPostWithTags
 
 
 class PostRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[..., AbstractContextManager[Session]]):
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        read_session_factory: Optional[Callable[..., AbstractContextManager[Session]]] = None,
+    ):
         self.session_factory = session_factory
-        super().__init__(session_factory, Post)
+        super().__init__(session_factory, Post, read_session_factory)
 
     def create_with_tags(self, schema: UpsertPostWithTags, tags):
         with self.session_factory() as session:
@@ -25,14 +29,7 @@ class PostRepository(BaseRepository):
 
     def update_with_tags(self, id: int, schema: UpsertPostWithTags, tags):
         with self.session_factory() as session:
-            session.query(self.model).filter(self.model.id == id).update(schema.dict(exclude_none=True))
-            query = session.query(self.model).filter(self.model.id == id).first()
-            if tags:
-                query.tags = []
-                session.flush()
-                query.tags = tags
-            else:
-                query.tags = []
+            query = update_row(session, self.model, id, schema.dict(exclude_none=True))
+            query.tags = tags or []
             session.commit()
-            session.refresh(query)
-            return self.read_by_id(id)
+            return query
@@ -1,5 +1,5 @@
 from contextlib import AbstractContextManager
-from typing import Callable
+from typing import Callable, Optional
 
 from sqlalchemy.orm import Session
 
@@ -8,6 +8,10 @@ from app.repository.base_repository import BaseRepository
 
 
 class TagRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[..., AbstractContextManager[Session]]):
+    def __init__(
+        self,
+        session_factory: Callable[..., AbstractContextManager[Session]],
+        read_session_factory: Optional[Callable[..., AbstractContextManager[Session]]] = None,
+    ):
         self.session_factory = session_factory
-        super().__init__(session_factory, Tag)
+        super().__init__(session_factory, Tag, read_session_factory)
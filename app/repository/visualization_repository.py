@@ -1,16 +1,26 @@
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import delete, select, true
+
+from app.repository.async_base_repository import AsyncBaseRepository
 from app.repository.base_repository import BaseRepository
 from app.model.visualization import Visualization
+from app.util.projection import select_columns
+from app.util.query_builder import dict_to_sqlalchemy_filter_options
 
 class VisualizationRepository(BaseRepository[Visualization]):
-    def __init__(self, session_factory):
-        super().__init__(session_factory, Visualization)
+    def __init__(self, session_factory, read_session_factory=None):
+        super().__init__(session_factory, Visualization, read_session_factory)
 
     def get_by_dataset_id(self, dataset_id: int) -> Visualization | None:
-        with self.session_factory() as session:
+        with self.read_session_factory() as session:
             return session.query(self.model).filter(self.model.dataset_id == dataset_id).first()
 
-    def get_all_by_dataset_id(self, dataset_id: int) -> list[Visualization]:
-        with self.session_factory() as session:
+    def get_all_by_dataset_id(self, dataset_id: int, columns: Optional[List[str]] = None) -> list:
+        with self.read_session_factory() as session:
+            if columns:
+                statement = select_columns(self.model, columns).where(self.model.dataset_id == dataset_id)
+                return [dict(row) for row in session.execute(statement).mappings()]
             items = session.query(self.model).filter(self.model.dataset_id == dataset_id).all()
             for item in items:
                 session.expunge(item)
@@ -20,3 +30,60 @@ class VisualizationRepository(BaseRepository[Visualization]):
         with self.session_factory() as session:
             session.query(self.model).delete()
             session.commit()
+
+
+class AsyncVisualizationRepository(AsyncBaseRepository[Visualization]):
+    def __init__(self, session_factory, read_session_factory=None):
+        super().__init__(session_factory, Visualization, read_session_factory)
+
+    async def get_by_dataset_id(self, dataset_id: int) -> Visualization | None:
+        async with self.read_session_factory() as session:
+            statement = select(self.model).where(self.model.dataset_id == dataset_id)
+            return (await session.execute(statement)).scalars().first()
+
+    async def read_dataset_version(self, dataset_id: int) -> tuple:
+        return await self.read_version(self.model.dataset_id == dataset_id)
+
+    async def get_all_by_dataset_id(self, dataset_id: int, columns: Optional[List[str]] = None) -> list:
+        return await self._list(self.model.dataset_id == dataset_id, columns)
+
+    async def get_by_ids(self, ids: List[int], columns: Optional[List[str]] = None) -> list:
+        return await self._list(self.model.id.in_(ids), columns)
+
+    async def search(self, filters: dict, columns: Optional[List[str]] = None) -> list:
+        """Rows matching query_builder filters, e.g. {"prompt__search": "sales"}."""
+        return await self._list(dict_to_sqlalchemy_filter_options(self.model, filters), columns)
+
+    async def stream(
+        self,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 500,
+        ids: Optional[List[int]] = None,
+        filters: Optional[dict] = None,
+    ) -> AsyncIterator[List[dict]]:
+        """Rows as dicts, `batch_size` at a time from a server-side cursor, so the whole listing is never in memory."""
+        condition = true()
+        if ids is not None:
+            condition = self.model.id.in_(ids)
+        elif filters:
+            condition = dict_to_sqlalchemy_filter_options(self.model, filters)
+        columns = columns or [column.key for column in self.model.__table__.columns]
+        statement = select_columns(self.model, columns).where(condition).order_by(self.model.id)
+        async with self.read_session_factory() as session:
+            result = await session.stream(statement.execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+
+    async def _list(self, condition, columns: Optional[List[str]]) -> list:
+        """Rows matching `condition`; with `columns`, a column select returning dicts instead of whole rows."""
+        async with self.read_session_factory() as session:
+            if columns:
+                result = await session.execute(select_columns(self.model, columns).where(condition))
+                return [dict(row) for row in result.mappings()]
+            result = await session.execute(select(self.model).where(condition))
+            return list(result.scalars().all())
+
+    async def delete_all(self):
+        async with self.session_factory() as session:
+            await session.execute(delete(self.model))
+            await session.commit()
@@ -18,6 +18,7 @@ class AgentResponse(BaseModel):
     explanation: str
     sql_query: Optional[str] = None
     query_result: Optional[str] = None
+    cached: bool = False
 
     class Config:
         schema_extra = {
@@ -29,6 +30,27 @@ class AgentResponse(BaseModel):
                     "layout": {"title": "Survival Rate by Class", "xaxis": {"title": "Class"}, "yaxis": {"title": "Rate"}}
                 },
                 "explanation": "The chart shows that 1st class passengers had the highest survival rate (63%), followed by 2nd class (47%) and 3rd class (24%).",
-                "sql_query": "SELECT Pclass, AVG(Survived) FROM dataset_123456_titanic GROUP BY Pclass"
+                "sql_query": "SELECT Pclass, AVG(Survived) FROM dataset_123456_titanic GROUP BY Pclass",
+                "cached": False
             }
         }
+
+
+class AgentCacheStats(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    invalidations: int
+    hit_ratio: float
+    latency_saved_seconds: float
+    max_entries: int
+    ttl_seconds: float
+
+
+class ChartFastPathStats(BaseModel):
+    fast_path: int
+    llm: int
+    fallback_rescues: int
+    fast_path_ratio: float
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 
 from pydantic import BaseModel
 
@@ -14,10 +14,18 @@ class FindBase(BaseModel):
     ordering: Optional[str] = None
     page: Optional[int] = None
     page_size: Optional[Union[int, str]] = None
+    # keyset pagination: pass the previous page's next_cursor instead of page
+    cursor: Optional[str] = None
+    count: Optional[Literal["exact", "estimate", "cached", "none"]] = None
+    # projection: comma-separated columns to return (id is always included), or summary=true for all but the
+    # model's large columns
+    fields: Optional[str] = None
+    summary: Optional[bool] = None
 
 
 class SearchOptions(FindBase):
     total_count: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class FindResult(BaseModel):
@@ -32,5 +40,26 @@ class FindDateRange(BaseModel):
     created_at__gte: str
 
 
+class BulkError(BaseModel):
+    index: int
+    id: Optional[int] = None
+    detail: str
+
+
+class BulkResult(BaseModel):
+    # items written, in input order; items that failed are listed in errors by their input index
+    founds: Optional[List]
+    errors: List[BulkError] = []
+
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+
+class BulkDeleteResult(BaseModel):
+    founds: List[int]
+    errors: List[BulkError] = []
+
+
 class Blank(BaseModel):
     pass
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from app.schema.base_schema import ModelBaseInfo, FindBase
 
@@ -6,15 +6,59 @@ class DatasetBase(BaseModel):
     filename: str
     table_name: str
     columns_metadata: Optional[str] = None
+    engine: str = "sql"
 
 class DatasetCreate(BaseModel):
     filename: str
     table_name: str
     columns_metadata: Optional[str] = "{}"
+    engine: str = "sql"
+
+class DatasetPatch(BaseModel):
+    # only descriptive metadata; the table and engine are changed through their own endpoints
+    id: int
+    filename: Optional[str] = None
 
 class FindDataset(FindBase):
     filename: Optional[str] = None
     table_name: Optional[str] = None
+    # case-insensitive substring / prefix match, index-backed on PostgreSQL
+    filename__search: Optional[str] = None
+    filename__prefix: Optional[str] = None
+
+class DatasetColumnProfileResponse(BaseModel):
+    column_name: str
+    dtype: str
+    null_ratio: float
+    distinct_count: int
+    distinct_is_estimate: bool
+    min_value: Optional[str] = None
+    max_value: Optional[str] = None
+    top_values: str
+    sample_values: str
+
+    class Config:
+        from_attributes = True
+
+class IngestionJobResponse(ModelBaseInfo):
+    filename: str
+    status: str
+    rows_ingested: int
+    bytes_total: int
+    bytes_processed: int
+    attempts: int
+    split_sheets: bool = False
+    engine: str = "sql"
+    dataset_id: Optional[int] = None
+    dataset_ids: List[int] = []
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    elapsed_seconds: float
+    rows_per_second: float
+    bytes_per_second: float
+    progress: float
+    eta_seconds: Optional[float] = None
 
 class DatasetResponse(ModelBaseInfo, DatasetBase):
     class Config:
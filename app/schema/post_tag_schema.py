@@ -20,12 +20,18 @@ class BasePost(BaseModel):
 class Post(ModelBaseInfo, BasePost, metaclass=AllOptional): ...
 
 
-class FindPost(FindBase, BasePost, metaclass=AllOptional): ...
+class FindPost(FindBase, BasePost, metaclass=AllOptional):
+    title__search: str
+    title__prefix: str
 
 
 class UpsertPost(BasePost, metaclass=AllOptional): ...
 
 
+class PatchPost(BasePost, metaclass=AllOptional):
+    id: int
+
+
 class FindPostResult(BaseModel):
     founds: Optional[List[Post]]
     search_options: Optional[SearchOptions]
@@ -45,11 +51,17 @@ class Tag(ModelBaseInfo, BaseTag, metaclass=AllOptional): ...
 
 class FindTag(FindBase, BaseTag, metaclass=AllOptional):
     id__in: str
+    name__search: str
+    name__prefix: str
 
 
 class UpsertTag(BaseTag, metaclass=AllOptional): ...
 
 
+class PatchTag(BaseTag, metaclass=AllOptional):
+    id: int
+
+
 class FindTagResult(BaseModel):
     founds: Optional[List[Tag]]
     search_options: Optional[SearchOptions]
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
@@ -13,3 +14,21 @@ class VisualizationCreate(VisualizationBase):
 
 class VisualizationRead(VisualizationBase):
     id: int
+
+class VisualizationListItem(BaseModel):
+    # listings may be projected (?fields=, ?summary=true): columns that were not loaded are left out of the response
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    dataset_id: Optional[int] = None
+    prompt: Optional[str] = None
+    chart_config: Optional[Dict[str, Any]] = None
+    explanation: Optional[str] = None
+    sql_query: Optional[str] = None
+
+class VisualizationPatch(BaseModel):
+    id: int
+    prompt: Optional[str] = None
+    chart_config: Optional[Dict[str, Any]] = None
+    explanation: Optional[str] = None
+    sql_query: Optional[str] = None
@@ -5,3 +5,4 @@ from app.services.user_service import UserService
 from app.services.dataset_service import DatasetService
 from app.services.agent_service import AgentService
 from app.services.visualization_service import VisualizationService
+from app.services.ingestion_service import IngestionService
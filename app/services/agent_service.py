@@ -1,77 +1,287 @@
 from typing import TypedDict, Annotated, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 from langchain_core.messages import HumanMessage, SystemMessage
-from app.repository.dataset_repository import DatasetRepository
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from app.core.cache import AnswerCache, make_cache_key
+from app.core.config import configs
+from app.core.llm import get_chat_model
+from app.repository.dataset_repository import AsyncDatasetRepository, DatasetRepository
+from app.repository.dataset_profile_repository import AsyncDatasetProfileRepository, DatasetProfileRepository
+from app.util.chart_inference import chart_stats, infer_chart
+from app.util.columnar import ColumnarResult
+from app.util.duckdb_engine import execute_duckdb
+from app.util.profiling import format_profiles_for_prompt
+from app.util.result_reduction import bind_column_refs, reduce_result
+from loguru import logger
 from sqlalchemy import text
+import asyncio
 import json
+import time
+import pandas as pd
+
+# Bump whenever the generate_sql / generate_visualization prompts change so cached answers are not reused.
+PROMPT_VERSION = "5"
 
 class AgentState(TypedDict):
     question: str
     dataset_id: int
     table_name: str
+    engine: str
     columns_metadata: str
+    column_profiles: str
     sql_query: str
     query_result: str
+    query_data: Optional[ColumnarResult]
+    query_summary: str
+    chart_frame: Any
     chart_config: Dict[str, Any]
     explanation: str
 
 import re
 import ast
 
+# SQL flavour named in the generate_sql prompt, by dataset engine / configs.DB
+SQL_DIALECTS = {"duckdb": "DuckDB", "postgresql": "PostgreSQL", "mysql": "MySQL", "sqlite": "SQLite"}
+
+CACHED_FIELDS = ("table_name", "sql_query", "query_result", "chart_config", "explanation")
+RESPONSE_FIELDS = ("chart_config", "explanation", "sql_query", "query_result", "cached")
+
+# Bounded pool for the blocking DB work of the async path (metadata lookup, agent SQL, SQL answer cache)
+# so slow analytical queries cannot exhaust the event loop's default executor.
+_db_executor = ThreadPoolExecutor(max_workers=configs.AGENT_DB_MAX_WORKERS, thread_name_prefix="agent-db")
+
+
+async def run_blocking(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, func, *args)
+
+
+class ExplanationTokenStream:
+    """Incrementally pulls the "explanation" string out of the streamed visualization JSON."""
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._start: Optional[int] = None
+        self._emitted = 0
+        self.done = False
+
+    def feed(self, text: str) -> str:
+        if self.done or not text:
+            return ""
+        self._buffer += text
+        if self._start is None:
+            match = re.search(r'"explanation"\s*:\s*"', self._buffer)
+            if not match:
+                return ""
+            self._start = match.end()
+        decoded = self._decode()
+        delta = decoded[self._emitted:]
+        self._emitted = len(decoded)
+        return delta
+
+    def _decode(self) -> str:
+        chars = []
+        i = self._start
+        buffer = self._buffer
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                break
+            if char != "\\":
+                chars.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break
+            escape = buffer[i + 1]
+            if escape == "u":
+                if i + 6 > len(buffer):
+                    break
+                chars.append(chr(int(buffer[i + 2:i + 6], 16)))
+                i += 6
+            else:
+                chars.append(self._ESCAPES.get(escape, escape))
+                i += 2
+        return "".join(chars)
+
+
+def _node(name: str) -> RunnableLambda:
+    """Graph node that calls the per-request AgentService passed in config["configurable"]["agent"]."""
+
+    def call(state: AgentState, config: RunnableConfig):
+        return getattr(config["configurable"]["agent"], name)(state)
+
+    async def acall(state: AgentState, config: RunnableConfig):
+        return await getattr(config["configurable"]["agent"], f"a{name}")(state)
+
+    return RunnableLambda(call, afunc=acall, name=name)
+
+
+def build_agent_workflow():
+    """Compile the agent graph once; it holds no per-request state, so one instance serves the whole process."""
+    workflow = StateGraph(AgentState)
+    # every node has a sync and an async implementation, picked by invoke / ainvoke
+    for name in ("get_metadata", "generate_sql", "execute_sql", "reduce_result", "generate_visualization"):
+        workflow.add_node(name, _node(name))
+    workflow.set_entry_point("get_metadata")
+    workflow.add_edge("get_metadata", "generate_sql")
+    workflow.add_edge("generate_sql", "execute_sql")
+    workflow.add_edge("execute_sql", "reduce_result")
+    workflow.add_edge("reduce_result", "generate_visualization")
+    workflow.add_edge("generate_visualization", END)
+    return workflow.compile()
+
+
+get_agent_workflow = lru_cache(maxsize=1)(build_agent_workflow)
+
+
 class AgentService:
-    def __init__(self, repository: DatasetRepository, llm=None):
+    def __init__(
+        self,
+        repository: DatasetRepository,
+        llm=None,
+        cache: Optional[AnswerCache] = None,
+        profile_repository: Optional[DatasetProfileRepository] = None,
+        workflow=None,
+        async_repository: Optional[AsyncDatasetRepository] = None,
+        async_profile_repository: Optional[AsyncDatasetProfileRepository] = None,
+    ):
+        # per-request shim: the LLM client and the compiled graph are shared process-wide
         self.repository = repository
-        self.llm = llm or ChatOpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            model="gpt-4o",
-            temperature=0)
-        self.workflow = self._build_workflow()
-
-    def _build_workflow(self):
-        workflow = StateGraph(AgentState)
-        workflow.add_node("get_metadata", self.get_metadata)
-        workflow.add_node("generate_sql", self.generate_sql)
-        workflow.add_node("execute_sql", self.execute_sql)
-        workflow.add_node("generate_visualization", self.generate_visualization)
-        workflow.set_entry_point("get_metadata")
-        workflow.add_edge("get_metadata", "generate_sql")
-        workflow.add_edge("generate_sql", "execute_sql")
-        workflow.add_edge("execute_sql", "generate_visualization")
-        workflow.add_edge("generate_visualization", END)
-        return workflow.compile()
+        self.profile_repository = profile_repository
+        # the async path reads metadata and runs agent SQL on these when given, instead of on _db_executor threads
+        self.async_repository = async_repository
+        self.async_profile_repository = async_profile_repository
+        self.llm = llm if llm is not None else get_chat_model()
+        self.cache = cache if cache is not None else AnswerCache()
+        self.workflow = workflow if workflow is not None else get_agent_workflow()
+        self.run_config = {"configurable": {"agent": self}}
 
     def get_metadata(self, state: AgentState):
+        if state.get("table_name"):
+            return {}
         dataset = self.repository.read_by_id(state["dataset_id"])
-        return {"table_name": dataset.table_name, "columns_metadata": dataset.columns_metadata}
+        return self._dataset_state(dataset, self._column_profiles(dataset.id))
 
-    def generate_sql(self, state: AgentState):
-        prompt = f"""
+    @staticmethod
+    def _dataset_state(dataset, column_profiles: str) -> Dict[str, Any]:
+        return {
+            "table_name": dataset.table_name,
+            "engine": dataset.engine,
+            "columns_metadata": dataset.columns_metadata,
+            "column_profiles": column_profiles,
+        }
+
+    def _column_profiles(self, dataset_id: int) -> str:
+        if self.profile_repository is None:
+            return ""
+        return format_profiles_for_prompt(self.profile_repository.get_by_dataset_id(dataset_id))
+
+    async def aget_metadata(self, state: AgentState):
+        if self.async_repository is None:
+            return await run_blocking(self.get_metadata, state)
+        if state.get("table_name"):
+            return {}
+        dataset = await self.async_repository.read_by_id(state["dataset_id"])
+        return self._dataset_state(dataset, await self._acolumn_profiles(dataset.id))
+
+    async def _acolumn_profiles(self, dataset_id: int) -> str:
+        if self.async_profile_repository is None:
+            return ""
+        return format_profiles_for_prompt(await self.async_profile_repository.get_by_dataset_id(dataset_id))
+
+    def _sql_prompt(self, state: AgentState) -> str:
+        profiles = state.get("column_profiles")
+        profile_block = f"""
+        Column profiles (precomputed, use the listed values verbatim in filters):
+{profiles}
+        """ if profiles else ""
+        engine = state.get("engine") or "sql"
+        dialect = SQL_DIALECTS.get(engine if engine != "sql" else configs.DB, "standard")
+        return f"""
         You are a SQL expert. Given table '{state['table_name']}' with columns {state['columns_metadata']},
-        generate a SQL query to answer: "{state['question']}".
+        generate a {dialect} SQL query to answer: "{state['question']}".
+        {profile_block}
         Return ONLY the SQL query.
         """
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+
+    def _parse_sql(self, response) -> Dict[str, Any]:
         sql = response.content.strip().replace("```sql", "").replace("```", "")
         print(f"DEBUG: SQL: {sql}")
         return {"sql_query": sql}
 
+    def generate_sql(self, state: AgentState):
+        response = self.llm.invoke([HumanMessage(content=self._sql_prompt(state))])
+        return self._parse_sql(response)
+
+    async def agenerate_sql(self, state: AgentState):
+        response = await self.llm.ainvoke([HumanMessage(content=self._sql_prompt(state))])
+        return self._parse_sql(response)
+
     def execute_sql(self, state: AgentState):
         try:
-            with self.repository.session_factory() as session:
-                cursor = session.execute(text(state["sql_query"]))
-                keys = cursor.keys()
-                result = cursor.fetchall()
-                if not result: return {"query_result": "[]"}
-                data = [dict(zip(keys, row)) for row in result]
-                return {"query_result": json.dumps(data, default=str)}
+            if state.get("engine") == "duckdb":
+                data = execute_duckdb(
+                    configs.DATASET_PARQUET_DIR,
+                    state["table_name"],
+                    state["sql_query"],
+                    configs.AGENT_SQL_MAX_ROWS,
+                    configs.DUCKDB_THREADS or None,
+                )
+                return {"query_data": data, "query_result": data.to_json()}
+            # analytical SQL runs on a read replica when there is one, away from the writes on the primary
+            with self.repository.read_session_factory() as session:
+                # server-side cursor: rows arrive in batches and fetching stops at the row cap
+                statement = text(state["sql_query"]).execution_options(
+                    stream_results=True, yield_per=configs.AGENT_SQL_BATCH_SIZE
+                )
+                data = ColumnarResult.from_result(
+                    session.execute(statement), configs.AGENT_SQL_MAX_ROWS, configs.AGENT_SQL_BATCH_SIZE
+                )
+                return {"query_data": data, "query_result": data.to_json()}
         except Exception as e:
-            return {"query_result": f"Error: {str(e)}"}
+            return {"query_data": None, "query_result": f"Error: {str(e)}"}
 
-    def generate_visualization(self, state: AgentState):
-        prompt = f"""
+    async def aexecute_sql(self, state: AgentState):
+        if self.async_repository is None or state.get("engine") == "duckdb":
+            return await run_blocking(self.execute_sql, state)
+        try:
+            async with self.async_repository.read_session_factory() as session:
+                statement = text(state["sql_query"]).execution_options(yield_per=configs.AGENT_SQL_BATCH_SIZE)
+                data = await ColumnarResult.afrom_result(
+                    await session.stream(statement), configs.AGENT_SQL_MAX_ROWS, configs.AGENT_SQL_BATCH_SIZE
+                )
+                return {"query_data": data, "query_result": data.to_json()}
+        except Exception as e:
+            return {"query_data": None, "query_result": f"Error: {str(e)}"}
+
+    def reduce_result(self, state: AgentState):
+        """Shrink the query result to chart size and a token-budgeted summary for the visualization prompt."""
+        query_data = state.get("query_data")
+        if query_data is None:
+            return {"chart_frame": pd.DataFrame(), "query_summary": state.get("query_result") or ""}
+        return reduce_result(
+            query_data.to_frame(),
+            top_k=configs.AGENT_TOP_K_CATEGORIES,
+            max_points=configs.AGENT_CHART_MAX_POINTS,
+            token_budget=configs.AGENT_PROMPT_TOKEN_BUDGET,
+            prompt_rows=configs.AGENT_PROMPT_MAX_ROWS,
+            model=self.model_name,
+        )
+
+    async def areduce_result(self, state: AgentState):
+        return await run_blocking(self.reduce_result, state)
+
+    def _visualization_prompt(self, state: AgentState) -> str:
+        return f"""
         You are a Data Visualization Expert using Plotly.
-        Data: {state['query_result']}
+        Data summary:
+        {state['query_summary']}
         Question: "{state['question']}"
         
         Generate a SINGLE Plotly Visualization configuration.
@@ -80,6 +290,8 @@ class AgentService:
         1. Theme: Dark/Neon ("#22c55e" primary). Transparent Background.
         2. Limit data points to 50 max (aggregate if needed).
         3. Return JSON ONLY: {{ "data": [trace1, ...], "layout": {{ ... }} }}
+        4. Do not copy data values into traces. Reference chart rows by column instead,
+           e.g. "x": "$col:<column name>", "y": "$col:<column name>"; the server fills in the values.
         
         Summary: Provide a short text summary of the insight.
         
@@ -89,7 +301,8 @@ class AgentService:
             "explanation": "..."
         }}
         """
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+
+    def _parse_visualization(self, response) -> Dict[str, Any]:
         print(f"DEBUG: Viz Response: {response.content}")
         try:
             content = response.content.strip()
@@ -116,5 +329,161 @@ class AgentService:
             print(f"Error parsing viz: {e}")
             return {"chart_config": {}, "explanation": f"Failed to generate visualization. Error: {str(e)}"}
 
+    def _fast_chart(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        chart_frame = state.get("chart_frame")
+        if chart_frame is None or chart_frame.empty:
+            return None
+        try:
+            return infer_chart(chart_frame, state["question"])
+        except Exception as e:
+            logger.exception(f"Error inferring chart: {e}")
+            return None
+
+    def _before_llm_visualization(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        if configs.AGENT_CHART_FAST_PATH != "prefer":
+            return None
+        fast = self._fast_chart(state)
+        if fast:
+            chart_stats.record("fast_path")
+        return fast
+
+    def _after_llm_visualization(self, state: AgentState, result: Dict[str, Any]) -> Dict[str, Any]:
+        chart_frame = state.get("chart_frame")
+        if result.get("chart_config") and chart_frame is not None:
+            result["chart_config"] = bind_column_refs(result["chart_config"], chart_frame)
+        if not result.get("chart_config") and configs.AGENT_CHART_FAST_PATH in ("fallback", "prefer"):
+            fast = self._fast_chart(state)
+            if fast:
+                chart_stats.record("fallback_rescues")
+                chart_stats.record("fast_path")
+                return fast
+        chart_stats.record("llm")
+        return result
+
+    def generate_visualization(self, state: AgentState):
+        fast = self._before_llm_visualization(state)
+        if fast:
+            return fast
+        response = self.llm.invoke([HumanMessage(content=self._visualization_prompt(state))])
+        return self._after_llm_visualization(state, self._parse_visualization(response))
+
+    async def agenerate_visualization(self, state: AgentState):
+        fast = self._before_llm_visualization(state)
+        if fast:
+            return fast
+        response = await self.llm.ainvoke([HumanMessage(content=self._visualization_prompt(state))])
+        return self._after_llm_visualization(state, self._parse_visualization(response))
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, "model_name", None) or configs.AGENT_MODEL
+
+    def _lookup(self, question: str, dataset_id: int):
+        """Resolve the dataset and check the answer cache. Returns (initial state, cache entry, cached answer)."""
+        dataset = self.repository.read_by_id(dataset_id)
+        entry = self._cache_entry(question, dataset)
+        cached = self.cache.get(*entry)
+        if cached is not None:
+            return None, None, {"question": question, "dataset_id": dataset_id, **cached, "cached": True}
+        profiles = self._column_profiles(dataset.id)
+        state = {"question": question, "dataset_id": dataset_id, **self._dataset_state(dataset, profiles)}
+        return state, entry, None
+
+    async def _alookup(self, question: str, dataset_id: int):
+        if self.async_repository is None:
+            return await run_blocking(self._lookup, question, dataset_id)
+        dataset = await self.async_repository.read_by_id(dataset_id)
+        entry = self._cache_entry(question, dataset)
+        cached = await run_blocking(self.cache.get, *entry)
+        if cached is not None:
+            return None, None, {"question": question, "dataset_id": dataset_id, **cached, "cached": True}
+        profiles = await self._acolumn_profiles(dataset.id)
+        state = {"question": question, "dataset_id": dataset_id, **self._dataset_state(dataset, profiles)}
+        return state, entry, None
+
+    def _cache_entry(self, question: str, dataset):
+        cache_key = make_cache_key(dataset.id, question, self.model_name, PROMPT_VERSION)
+        return cache_key, f"{dataset.table_name}@{dataset.updated_at}"
+
+    def _store(self, entry, dataset_id: int, result: Dict[str, Any], started: float):
+        if self._is_cacheable(result):
+            cache_key, dataset_version = entry
+            self.cache.set(
+                cache_key,
+                dataset_id,
+                dataset_version,
+                {field: result.get(field) for field in CACHED_FIELDS},
+                time.perf_counter() - started,
+            )
+
     def analyze(self, question: str, dataset_id: int):
-        return self.workflow.invoke({"question": question, "dataset_id": dataset_id})
+        state, entry, cached = self._lookup(question, dataset_id)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        result = self.workflow.invoke(state, config=self.run_config)
+        self._store(entry, dataset_id, result, started)
+        return result
+
+    async def aanalyze(self, question: str, dataset_id: int):
+        state, entry, cached = await self._alookup(question, dataset_id)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        result = await self.workflow.ainvoke(state, config=self.run_config)
+        await run_blocking(self._store, entry, dataset_id, result, started)
+        return result
+
+    async def astream_analyze(self, question: str, dataset_id: int):
+        """Run the pipeline and yield (event, data) pairs as each node finishes.
+
+        Events: sql, rows, token (explanation text), chart, done. A cached answer is replayed as the same events.
+        """
+        state, entry, cached = await self._alookup(question, dataset_id)
+        if cached is not None:
+            yield "sql", {"sql_query": cached.get("sql_query")}
+            yield "rows", self._rows_preview(cached.get("query_result"), ColumnarResult.from_json(cached.get("query_result")))
+            yield "chart", {"chart_config": cached.get("chart_config"), "explanation": cached.get("explanation")}
+            yield "done", {field: cached.get(field) for field in RESPONSE_FIELDS}
+            return
+
+        started = time.perf_counter()
+        result = dict(state)
+        explanation = ExplanationTokenStream()
+        async for mode, chunk in self.workflow.astream(
+            state, config=self.run_config, stream_mode=["updates", "messages"]
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") == "generate_visualization":
+                    delta = explanation.feed(message.content if isinstance(message.content, str) else "")
+                    if delta:
+                        yield "token", {"text": delta}
+                continue
+            for node, update in chunk.items():
+                result.update(update or {})
+                if node == "generate_sql":
+                    yield "sql", {"sql_query": result.get("sql_query")}
+                elif node == "execute_sql":
+                    yield "rows", self._rows_preview(result.get("query_result"), result.get("query_data"))
+                elif node == "generate_visualization":
+                    yield "chart", {"chart_config": result.get("chart_config"), "explanation": result.get("explanation")}
+
+        await run_blocking(self._store, entry, dataset_id, result, started)
+        result["cached"] = False
+        yield "done", {field: result.get(field) for field in RESPONSE_FIELDS}
+
+    @staticmethod
+    def _rows_preview(query_result: Optional[str], query_data: Optional[ColumnarResult]) -> Dict[str, Any]:
+        if query_data is None:
+            return {"rows": [], "row_count": 0, "error": query_result}
+        return {
+            "rows": query_data.head_records(configs.AGENT_STREAM_PREVIEW_ROWS),
+            "row_count": query_data.row_count,
+            "truncated": query_data.truncated,
+        }
+
+    @staticmethod
+    def _is_cacheable(result: Dict[str, Any]) -> bool:
+        query_result = result.get("query_result") or ""
+        return bool(result.get("chart_config")) and not query_result.startswith("Error:")
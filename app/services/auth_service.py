@@ -20,6 +20,7 @@ class AuthService(BaseService):
     def sign_in(self, sign_in_info: SignIn):
         find_user = FindUser()
         find_user.email__eq = sign_in_info.email__eq
+        find_user.count = "none"
         user: List[User] = self.user_repository.read_by_options(find_user)["founds"]
         if len(user) < 1:
             raise AuthError(detail="Incorrect email or password")
@@ -1,4 +1,14 @@
-from typing import Any, Protocol
+from typing import Any, List, Protocol
+
+from app.core.config import configs
+from app.core.exceptions import ValidationError
+
+
+def check_batch_size(items: List[Any]):
+    if not items:
+        raise ValidationError(detail="Batch is empty")
+    if len(items) > configs.BULK_MAX_ITEMS:
+        raise ValidationError(detail=f"Batch has {len(items)} items, the limit is {configs.BULK_MAX_ITEMS}")
 
 
 class RepositoryProtocol(Protocol):
@@ -16,6 +26,12 @@ class RepositoryProtocol(Protocol):
 
     def delete_by_id(self, id: int) -> Any: ...
 
+    def bulk_create(self, schemas: List[Any]) -> Any: ...
+
+    def bulk_update(self, schemas: List[Any]) -> Any: ...
+
+    def bulk_delete(self, ids: List[int]) -> Any: ...
+
 
 class BaseService:
     def __init__(self, repository: RepositoryProtocol) -> None:
@@ -42,5 +58,17 @@ class BaseService:
     def remove_by_id(self, id: int) -> Any:
         return self._repository.delete_by_id(id)
 
+    def bulk_add(self, schemas: List[Any]) -> Any:
+        check_batch_size(schemas)
+        return self._repository.bulk_create(schemas)
+
+    def bulk_patch(self, schemas: List[Any]) -> Any:
+        check_batch_size(schemas)
+        return self._repository.bulk_update(schemas)
+
+    def bulk_remove(self, ids: List[int]) -> Any:
+        check_batch_size(ids)
+        return self._repository.bulk_delete(ids)
+
     def close_scoped_session(self):
         self._repository.close_scoped_session()
@@ -1,45 +1,199 @@
-from app.repository.dataset_repository import DatasetRepository
-from app.services.base_service import BaseService
+from app.repository.dataset_repository import AsyncDatasetRepository, DatasetRepository
+from app.repository.dataset_profile_repository import AsyncDatasetProfileRepository, DatasetProfileRepository
+from app.services.base_service import BaseService, check_batch_size
 from app.schema.dataset_schema import DatasetCreate
+from app.core.config import configs
+from app.util.duckdb_engine import ParquetDatasetWriter, check_engine, has_parquet
+from app.util.ingestion import FileChunkReader, frame_chunks, iter_sheets
+from app.util.parallel_parsing import sheet_names
+from app.util.profiling import DatasetProfiler
+from typing import Any, Callable, Iterable, List, Optional
 import pandas as pd
 import json
-import io
+import os
+import re
 import time
 
 class DatasetService(BaseService):
-    def __init__(self, repository: DatasetRepository):
+    def __init__(
+        self,
+        repository: DatasetRepository,
+        profile_repository: DatasetProfileRepository,
+        async_repository: Optional[AsyncDatasetRepository] = None,
+        async_profile_repository: Optional[AsyncDatasetProfileRepository] = None,
+    ):
+        self.profile_repository = profile_repository
+        # reads served to the API go through the async repositories; ingestion stays on worker threads
+        self.async_repository = async_repository
+        self.async_profile_repository = async_profile_repository
         super().__init__(repository)
 
-    def upload_dataset(self, file_content: bytes, filename: str):
-        # Read file
-        if filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(file_content))
-        elif filename.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(io.BytesIO(file_content))
-        else:
-            raise ValueError("Unsupported file format")
+    def upload_dataset(
+        self,
+        path: str,
+        filename: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+        engine: Optional[str] = None,
+    ):
+        # Read the spooled file chunk by chunk; memory stays bounded by UPLOAD_CHUNK_ROWS / UPLOAD_PARSE_RANGE_BYTES
+        reader = FileChunkReader(
+            path,
+            filename,
+            configs.UPLOAD_CHUNK_ROWS,
+            parse_workers=configs.UPLOAD_PARSE_WORKERS,
+            range_bytes=configs.UPLOAD_PARSE_RANGE_BYTES,
+            parallel_min_bytes=configs.UPLOAD_PARALLEL_MIN_BYTES,
+        )
+
+        def on_rows(rows: int):
+            if progress:
+                progress(rows, reader.bytes_read)
+
+        return self._ingest(reader, filename, self._table_name(filename), on_rows, engine)
+
+    def upload_sheets(
+        self,
+        path: str,
+        filename: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+        engine: Optional[str] = None,
+        done: Optional[List[Any]] = None,
+        on_dataset: Optional[Callable[[Any], None]] = None,
+    ):
+        """Ingest every worksheet of a workbook as its own dataset; the sheets are parsed in parallel.
+
+        `done` are the datasets a previous attempt already created: their sheets are skipped, so a retried job does
+        not duplicate them. `on_dataset` is called as each sheet's dataset is committed."""
+        datasets = list(done or [])
+        finished = {dataset.filename for dataset in datasets}
+        names = sheet_names(path)
+        pending = [name for name in names if self._sheet_filename(filename, name) not in finished]
+        bytes_total = os.path.getsize(path)
+        rows_done, skipped = 0, len(names) - len(pending)
+        for index, (sheet, df) in enumerate(iter_sheets(path, pending, configs.UPLOAD_PARSE_WORKERS), skipped):
+            # byte progress of a workbook can only be counted per finished sheet
+            bytes_done = bytes_total * index // len(names)
+
+            def on_rows(rows: int):
+                if progress:
+                    progress(rows_done + rows, bytes_done)
 
+            table_name = self._table_name(filename, re.sub(r"\W+", "_", sheet).strip("_").lower())
+            chunks = frame_chunks(df, configs.UPLOAD_CHUNK_ROWS)
+            dataset = self._ingest(chunks, self._sheet_filename(filename, sheet), table_name, on_rows, engine)
+            datasets.append(dataset)
+            if on_dataset:
+                on_dataset(dataset)
+            rows_done += len(df)
+        return datasets
+
+    @staticmethod
+    def _sheet_filename(filename: str, sheet: str) -> str:
+        return f"{filename} [{sheet}]"
+
+    @staticmethod
+    def _table_name(filename: str, suffix: str = "") -> str:
         # Sanitize table name
         # Use a timestamp or uuid to avoid collision in real app, but for now simple sanitization
-        
         table_name = f"dataset_{int(time.time())}_{filename.split('.')[0].replace(' ', '_').lower()}"
-        
-        # Extract metadata
-        columns_metadata = df.dtypes.apply(lambda x: x.name).to_dict()
-        
-        # Create table
-        self._repository.create_table_from_df(df, table_name)
+        return f"{table_name}_{suffix}" if suffix else table_name
+
+    def _ingest(
+        self,
+        frames: Iterable[pd.DataFrame],
+        filename: str,
+        table_name: str,
+        on_rows: Callable[[int], None],
+        engine: Optional[str] = None,
+    ):
+        engine = engine or configs.DATASET_ENGINE
+        check_engine(engine)
+        # the SQL table is always written; duckdb datasets also get Parquet files for the agent to query
+        parquet = ParquetDatasetWriter(configs.DATASET_PARQUET_DIR, table_name) if engine == "duckdb" else None
+
+        # Profile and load every chunk as it is parsed
+        profiler = DatasetProfiler()
+
+        def chunks():
+            rows = 0
+            for df in frames:
+                profiler.update(df)
+                if parquet:
+                    parquet.write(df)
+                yield df
+                # the writer asks for the next chunk only once this one is loaded
+                rows += len(df)
+                on_rows(rows)
+
+        try:
+            columns_metadata = self._repository.create_table_from_chunks(chunks(), table_name)
+        except Exception:
+            if parquet:
+                parquet.remove()
+            raise
+        if parquet:
+            parquet.close()
+        profiles = profiler.results()
+        for profile in profiles:
+            profile["dtype"] = columns_metadata[profile["column_name"]]
+            if profile["dtype"] == "object":
+                # numeric bounds from early chunks do not apply once the column was widened to text
+                profile["min_value"] = profile["max_value"] = None
         
         # Save metadata
         dataset_create = DatasetCreate(
             filename=filename,
             table_name=table_name,
-            columns_metadata=json.dumps(columns_metadata)
+            columns_metadata=json.dumps(columns_metadata),
+            engine=engine,
         )
-        return self.add(dataset_create)
+        dataset = self.add(dataset_create)
+        self.profile_repository.replace_for_dataset(dataset.id, profiles)
+        return dataset
 
     def get_preview(self, dataset_id: int):
         dataset = self.get_by_id(dataset_id)
         if not dataset:
             raise ValueError("Dataset not found")
         return self._repository.get_preview(dataset.table_name)
+
+    def set_engine(self, dataset_id: int, engine: str):
+        """Switch where agent SQL runs for one dataset, exporting its table to Parquet on first use of duckdb."""
+        check_engine(engine)
+        dataset = self.get_by_id(dataset_id)
+        if engine == "duckdb" and not has_parquet(configs.DATASET_PARQUET_DIR, dataset.table_name):
+            parquet = ParquetDatasetWriter(configs.DATASET_PARQUET_DIR, dataset.table_name)
+            try:
+                for df in self._repository.iter_table_chunks(dataset.table_name, configs.UPLOAD_CHUNK_ROWS):
+                    parquet.write(df)
+            except Exception:
+                parquet.remove()
+                raise
+            parquet.close()
+        return self.patch_attr(dataset_id, "engine", engine)
+
+    def get_profile(self, dataset_id: int):
+        self.get_by_id(dataset_id)
+        return self.profile_repository.get_by_dataset_id(dataset_id)
+
+    async def aget_list(self, schema):
+        return await self.async_repository.read_by_options(schema)
+
+    async def abulk_patch(self, schemas):
+        check_batch_size(schemas)
+        return await self.async_repository.bulk_update(schemas)
+
+    async def aget_version(self) -> tuple:
+        return await self.async_repository.read_version()
+
+    async def aget_preview_version(self, dataset_id: int) -> tuple:
+        dataset = await self.async_repository.read_by_id(dataset_id)
+        return dataset.id, dataset.table_name, dataset.updated_at
+
+    async def aget_preview(self, dataset_id: int):
+        dataset = await self.async_repository.read_by_id(dataset_id)
+        return await self.async_repository.get_preview(dataset.table_name)
+
+    async def aget_profile(self, dataset_id: int):
+        await self.async_repository.read_by_id(dataset_id)
+        return await self.async_profile_repository.get_by_dataset_id(dataset_id)
@@ -0,0 +1,207 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import configs
+from app.core.database import read_your_writes
+from app.repository.ingestion_job_repository import IngestionJobRepository
+from app.services.base_service import BaseService
+from app.services.dataset_service import DatasetService
+from app.util.duckdb_engine import check_engine
+from app.util.ingestion import SUPPORTED_EXTENSIONS
+
+
+HOST = socket.gethostname()
+# owner of the jobs this process submits or runs; the token tells a restarted process from the one before it
+WORKER_ID = f"{HOST}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobProgress:
+    """Live (rows, bytes) of the jobs running in this process.
+
+    The job row gets them every UPLOAD_HEARTBEAT_SECONDS through the repository's heartbeat session, a connection
+    separate from the thread-scoped session the load runs in, so other processes see them too; except on SQLite, whose
+    single writer is held by the load, where the row is updated per finished sheet/job.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, Tuple[int, int]] = {}
+
+    def update(self, job_id: int, rows: int, bytes_read: int):
+        with self._lock:
+            self._jobs[job_id] = (rows, bytes_read)
+
+    def get(self, job_id: int) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pop(self, job_id: int) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+
+job_progress = JobProgress()
+
+
+class IngestionService(BaseService):
+    """Runs dataset uploads as background jobs and reports their progress."""
+
+    def __init__(self, repository: IngestionJobRepository, dataset_service: DatasetService, executor: Executor):
+        self.dataset_service = dataset_service
+        self.executor = executor
+        super().__init__(repository)
+
+    def submit(
+        self, path: str, filename: str, split_sheets: bool = False, engine: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if not filename.endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError("Unsupported file format")
+        if split_sheets and filename.endswith(".csv"):
+            raise ValueError("split_sheets only applies to Excel workbooks")
+        engine = engine or configs.DATASET_ENGINE
+        check_engine(engine)
+        job = self._repository.create_job(filename, path, os.path.getsize(path), split_sheets, engine, WORKER_ID)
+        self.executor.submit(self.run, job.id)
+        return self.job_status(job)
+
+    def run(self, job_id: int):
+        # a job reads back the dataset it wrote; once it has written, its reads stay off the replicas
+        with read_your_writes():
+            self._run(job_id)
+
+    def _run(self, job_id: int):
+        if not self._repository.claim(job_id, time.time(), WORKER_ID):
+            return
+        job = self._repository.read_by_id(job_id)
+        job_progress.update(job_id, 0, 0)
+        last_beat = time.time()
+
+        def progress(rows: int, bytes_read: int):
+            nonlocal last_beat
+            job_progress.update(job_id, rows, bytes_read)
+            if configs.DB != "sqlite" and time.time() - last_beat >= configs.UPLOAD_HEARTBEAT_SECONDS:
+                last_beat = time.time()
+                try:
+                    self._repository.heartbeat(
+                        job_id, rows_ingested=rows, bytes_processed=bytes_read, heartbeat_at=last_beat
+                    )
+                except Exception as e:
+                    # progress is best effort: a heartbeat that cannot be written must not fail the load
+                    logger.warning(f"ingestion job {job_id}: heartbeat not written: {e}")
+
+        try:
+            if job.split_sheets:
+                # sheets a previous attempt loaded are kept and skipped; each new one is recorded as it commits
+                datasets = [self.dataset_service.get_by_id(id) for id in json.loads(job.dataset_ids or "[]")]
+
+                def on_dataset(dataset):
+                    datasets.append(dataset)
+                    self._repository.update_fields(
+                        job_id, dataset_ids=json.dumps([item.id for item in datasets]), heartbeat_at=time.time()
+                    )
+
+                result = self.dataset_service.upload_sheets(
+                    job.file_path, job.filename, progress, engine=job.engine, done=list(datasets), on_dataset=on_dataset
+                )
+            else:
+                result = [self.dataset_service.upload_dataset(job.file_path, job.filename, progress, engine=job.engine)]
+        except Exception as e:
+            logger.exception(f"ingestion job {job_id} failed")
+            self._finish(job, "failed", error=str(e))
+        else:
+            dataset_ids = [dataset.id for dataset in result]
+            self._finish(
+                job,
+                "completed",
+                dataset_id=dataset_ids[0] if dataset_ids else None,
+                dataset_ids=json.dumps(dataset_ids),
+            )
+
+    def _finish(self, job, status: str, **values):
+        rows, bytes_read = job_progress.pop(job.id) or (job.rows_ingested, job.bytes_processed)
+        self._repository.update_fields(
+            job.id,
+            status=status,
+            finished_at=time.time(),
+            file_path=None,
+            rows_ingested=rows,
+            bytes_processed=bytes_read,
+            **values,
+        )
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+    def recover_jobs(self):
+        """Called at startup: requeue jobs whose owner process is gone, or fail them if they cannot be resumed.
+
+        A load runs in a single transaction, so an interrupted job left no partial table and restarts from the top;
+        a split_sheets job keeps the sheets it finished. Jobs of live processes, here or on other hosts, are left alone.
+        """
+        for job in self._repository.read_unfinished():
+            if not self._owner_gone(job):
+                continue
+            if job.file_path and os.path.exists(job.file_path) and job.attempts < configs.UPLOAD_MAX_ATTEMPTS:
+                if self._repository.requeue(job, WORKER_ID):
+                    logger.info(f"requeueing ingestion job {job.id} ({job.filename}) of {job.worker_id}")
+                    self.executor.submit(self.run, job.id)
+            else:
+                self._finish(job, "failed", error="ingestion stopped before the job finished")
+
+    @staticmethod
+    def _owner_gone(job) -> bool:
+        if job.worker_id is None:
+            return True
+        if job.worker_id == WORKER_ID:
+            return False
+        host, pid, _ = job.worker_id.rsplit(":", 2)
+        if host == HOST and (int(pid) == os.getpid() or not _process_alive(int(pid))):
+            return True
+        # the owner is on another host (or reused a pid here): gone once a running job stops sending heartbeats,
+        # which SQLite does not send while loading
+        if configs.DB == "sqlite" or job.status != "running":
+            return False
+        return time.time() - (job.heartbeat_at or job.started_at or 0.0) > configs.UPLOAD_STALE_SECONDS
+
+    def get_job(self, job_id: int) -> Dict[str, Any]:
+        return self.job_status(self._repository.read_by_id(job_id))
+
+    @staticmethod
+    def job_status(job) -> Dict[str, Any]:
+        status = job.model_dump(exclude={"file_path"})
+        status["dataset_ids"] = json.loads(job.dataset_ids or "[]")
+        live = job_progress.get(job.id) if job.status == "running" else None
+        if live:
+            status["rows_ingested"], status["bytes_processed"] = live
+        rows, bytes_read = status["rows_ingested"], status["bytes_processed"]
+        elapsed = ((job.finished_at or time.time()) - job.started_at) if job.started_at else 0.0
+        bytes_per_second = bytes_read / elapsed if elapsed else 0.0
+        status.update(
+            elapsed_seconds=elapsed,
+            rows_per_second=rows / elapsed if elapsed else 0.0,
+            bytes_per_second=bytes_per_second,
+            progress=1.0 if job.status == "completed" else (bytes_read / job.bytes_total if job.bytes_total else 0.0),
+            eta_seconds=(
+                max(job.bytes_total - bytes_read, 0) / bytes_per_second
+                if job.status == "running" and bytes_per_second
+                else None
+            ),
+        )
+        return status
@@ -13,6 +13,7 @@ class PostService(BaseService):
     def add(self, schema: UpsertPostWithTags):
         find_tag = FindTag()
         find_tag.page_size = "all"
+        find_tag.count = "none"
         tags = None
         if len(schema.tag_ids):
             find_tag.id__in = ",".join(map(str, schema.tag_ids))
@@ -23,6 +24,7 @@ class PostService(BaseService):
     def patch(self, id: int, schema: UpsertPostWithTags):
         find_tag = FindTag()
         find_tag.page_size = "all"
+        find_tag.count = "none"
         tags = None
         if schema.tag_ids:
             find_tag.id__in = ",".join(map(str, schema.tag_ids))
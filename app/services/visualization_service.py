@@ -1,24 +1,76 @@
-from app.repository.visualization_repository import VisualizationRepository
-from app.schema.visualization_schema import VisualizationCreate, VisualizationRead
+from typing import AsyncIterator
+
+from app.repository.visualization_repository import AsyncVisualizationRepository
+from app.schema.visualization_schema import VisualizationCreate, VisualizationPatch, VisualizationRead
 from app.model.visualization import Visualization
+from app.core.config import configs
+from app.core.exceptions import ValidationError
+from app.services.base_service import check_batch_size
+from app.util.projection import projected_columns
 
 class VisualizationService:
-    def __init__(self, repository: VisualizationRepository):
+    def __init__(self, repository: AsyncVisualizationRepository):
         self.repository = repository
 
-    def create_visualization(self, data: VisualizationCreate) -> Visualization:
+    async def create_visualization(self, data: VisualizationCreate) -> Visualization:
         # Always create new
         viz = Visualization(**data.dict())
-        return self.repository.create(viz)
+        return await self.repository.create(viz)
+
+    async def create_visualizations(self, data: list[VisualizationCreate]) -> dict:
+        check_batch_size(data)
+        return await self.repository.bulk_create(data)
+
+    async def update_visualizations(self, data: list[VisualizationPatch]) -> dict:
+        check_batch_size(data)
+        return await self.repository.bulk_update(data)
+
+    async def delete_visualizations(self, ids: list[int]) -> dict:
+        check_batch_size(ids)
+        return await self.repository.bulk_delete(ids)
 
-    def list_visualizations(self, dataset_id: int) -> list[Visualization]:
-        return self.repository.get_all_by_dataset_id(dataset_id)
+    async def list_visualizations(self, dataset_id: int, fields: str | None = None, summary: bool = False) -> list:
+        return await self.repository.get_all_by_dataset_id(dataset_id, self._columns(fields, summary))
 
-    def get_visualization(self, dataset_id: int) -> Visualization | None:
-        return self.repository.get_by_dataset_id(dataset_id)
+    async def get_version(self, dataset_id: int | None = None) -> tuple:
+        if dataset_id is None:
+            return await self.repository.read_version()
+        return await self.repository.read_dataset_version(dataset_id)
+
+    async def get_visualization(self, dataset_id: int) -> Visualization | None:
+        return await self.repository.get_by_dataset_id(dataset_id)
     
-    def get_all_visualizations(self) -> list[Visualization]:
-        return self.repository.read_list()
+    async def get_all_visualizations(
+        self,
+        fields: str | None = None,
+        summary: bool = False,
+        ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> list:
+        columns = self._columns(fields, summary)
+        if ids is not None:
+            return await self.repository.get_by_ids(ids, columns)
+        if filters:
+            return await self.repository.search(filters, columns)
+        return await self.repository.read_list(columns)
+
+    def stream_visualizations(
+        self,
+        fields: str | None = None,
+        summary: bool = False,
+        ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        # fields are checked here, before the response starts, so a bad one is still a 422
+        columns = self._columns(fields, summary)
+        return self.repository.stream(columns, configs.STREAM_BATCH_SIZE, ids, filters)
+
+    @staticmethod
+    def _columns(fields: str | None, summary: bool) -> list[str] | None:
+        try:
+            return projected_columns(Visualization, fields, summary)
+        except ValueError as e:
+            raise ValidationError(detail=str(e))
 
-    def delete_all_visualizations(self):
-        self.repository.delete_all()
+    async def delete_all_visualizations(self):
+        await self.repository.delete_all()
@@ -0,0 +1,194 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PRIMARY_COLOR = "#22c55e"
+PALETTE = ["#22c55e", "#06b6d4", "#a855f7", "#f59e0b", "#ef4444", "#3b82f6"]
+
+MAX_CATEGORIES = 50
+MAX_SERIES = 4
+PIE_WORDS = ("pie", "share", "proportion", "percentage", "composition")
+
+
+class ChartInferenceStats:
+    """Process-wide counters of how visualization configs were produced."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {"fast_path": 0, "llm": 0, "fallback_rescues": 0}
+
+    def record(self, source: str):
+        with self._lock:
+            self._counts[source] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        total = counts["fast_path"] + counts["llm"]
+        counts["fast_path_ratio"] = counts["fast_path"] / total if total else 0.0
+        return counts
+
+
+chart_stats = ChartInferenceStats()
+
+
+def _layout(title: str, x_title: Optional[str] = None, y_title: Optional[str] = None) -> Dict[str, Any]:
+    layout = {
+        "title": {"text": title},
+        "template": "plotly_dark",
+        "paper_bgcolor": "rgba(0,0,0,0)",
+        "plot_bgcolor": "rgba(0,0,0,0)",
+        "font": {"color": "#e5e7eb"},
+        "colorway": PALETTE,
+    }
+    if x_title is not None:
+        layout["xaxis"] = {"title": {"text": x_title}, "gridcolor": "#333333"}
+    if y_title is not None:
+        layout["yaxis"] = {"title": {"text": y_title}, "gridcolor": "#333333"}
+    return layout
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _values(series: pd.Series) -> List[Any]:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    # astype(object) first: a float series would turn None back into NaN, which is not valid JSON
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _as_datetime(series: pd.Series) -> Optional[pd.Series]:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if series.dtype != object:
+        return None
+    parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    if parsed.notna().mean() < 0.9:
+        return None
+    return parsed
+
+
+def classify_columns(df: pd.DataFrame) -> Dict[str, List[str]]:
+    kinds = {"numeric": [], "temporal": [], "categorical": []}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            kinds["categorical"].append(column)
+        elif pd.api.types.is_numeric_dtype(series):
+            kinds["numeric"].append(column)
+        elif _as_datetime(series) is not None:
+            kinds["temporal"].append(column)
+        else:
+            kinds["categorical"].append(column)
+    return kinds
+
+
+def _category_chart(df: pd.DataFrame, category: str, measures: List[str], question: str):
+    labels = df[category].astype(str)
+    if len(measures) == 1 and len(df) <= 8 and any(word in question.lower() for word in PIE_WORDS):
+        measure = measures[0]
+        data = [{"type": "pie", "labels": labels.tolist(), "values": _values(df[measure]), "hole": 0.4,
+                 "marker": {"colors": PALETTE}}]
+        layout = _layout(f"{measure} by {category}")
+    else:
+        data = [
+            {"type": "bar", "name": measure, "x": labels.tolist(), "y": _values(df[measure]),
+             "marker": {"color": PALETTE[i % len(PALETTE)]}}
+            for i, measure in enumerate(measures)
+        ]
+        layout = _layout(f"{', '.join(measures)} by {category}", category, measures[0] if len(measures) == 1 else None)
+        if len(measures) > 1:
+            layout["barmode"] = "group"
+    measure = measures[0]
+    top, bottom = df[measure].idxmax(), df[measure].idxmin()
+    explanation = (
+        f"{labels[top]} has the highest {measure} ({_fmt(df[measure][top])}) and {labels[bottom]} the lowest "
+        f"({_fmt(df[measure][bottom])}) across {len(df)} {category} values."
+    )
+    return {"data": data, "layout": layout}, explanation
+
+
+def _time_series_chart(df: pd.DataFrame, time_column: str, measures: List[str]):
+    df = df.assign(**{time_column: _as_datetime(df[time_column])}).sort_values(time_column)
+    data = [
+        {"type": "scatter", "mode": "lines+markers" if len(df) <= 50 else "lines", "name": measure,
+         "x": _values(df[time_column]), "y": _values(df[measure]),
+         "line": {"color": PALETTE[i % len(PALETTE)], "width": 2}}
+        for i, measure in enumerate(measures)
+    ]
+    layout = _layout(f"{', '.join(measures)} over {time_column}", time_column,
+                     measures[0] if len(measures) == 1 else None)
+    measure = measures[0]
+    first, last = df[measure].iloc[0], df[measure].iloc[-1]
+    peak = df[measure].idxmax()
+    change = f" ({(last - first) / abs(first) * 100:+.1f}%)" if first else ""
+    explanation = (
+        f"{measure} moves from {_fmt(first)} to {_fmt(last)}{change} between {_fmt(df[time_column].iloc[0])} and "
+        f"{_fmt(df[time_column].iloc[-1])}, peaking at {_fmt(df[measure][peak])} on {_fmt(df[time_column][peak])}."
+    )
+    return {"data": data, "layout": layout}, explanation
+
+
+def _distribution_chart(df: pd.DataFrame, measure: str):
+    series = df[measure].dropna()
+    data = [{"type": "histogram", "x": _values(series), "name": measure, "marker": {"color": PRIMARY_COLOR}}]
+    layout = _layout(f"Distribution of {measure}", measure, "count")
+    explanation = (
+        f"{measure} ranges from {_fmt(series.min())} to {_fmt(series.max())} with a median of "
+        f"{_fmt(series.median())} over {len(series)} values."
+    )
+    return {"data": data, "layout": layout}, explanation
+
+
+def _indicator_chart(df: pd.DataFrame, measure: str):
+    value = df[measure].iloc[0]
+    value = value.item() if hasattr(value, "item") else value
+    data = [{"type": "indicator", "mode": "number", "value": value, "title": {"text": measure},
+             "number": {"font": {"color": PRIMARY_COLOR}}}]
+    return {"data": data, "layout": _layout(measure)}, f"{measure} is {_fmt(value)}."
+
+
+def _scatter_chart(df: pd.DataFrame, x: str, y: str):
+    data = [{"type": "scatter", "mode": "markers", "x": _values(df[x]), "y": _values(df[y]), "name": y,
+             "marker": {"color": PRIMARY_COLOR, "opacity": 0.7}}]
+    correlation = df[x].corr(df[y])
+    explanation = f"{y} against {x} over {len(df)} points"
+    explanation += f" (correlation {correlation:.2f})." if pd.notna(correlation) else "."
+    return {"data": data, "layout": _layout(f"{y} vs {x}", x, y)}, explanation
+
+
+def infer_chart(df: pd.DataFrame, question: str = "") -> Optional[Dict[str, Any]]:
+    """Build a themed Plotly config for common result shapes, or None when the shape is ambiguous."""
+    if df is None or df.empty or len(df.columns) > MAX_SERIES + 1:
+        return None
+    kinds = classify_columns(df)
+    numeric, temporal, categorical = kinds["numeric"], kinds["temporal"], kinds["categorical"]
+    built = None
+
+    if len(df.columns) == 1 and numeric:
+        built = _indicator_chart(df, numeric[0]) if len(df) == 1 else _distribution_chart(df, numeric[0])
+    elif len(temporal) == 1 and not categorical and numeric:
+        built = _time_series_chart(df, temporal[0], numeric)
+    elif len(categorical) == 1 and not temporal and numeric:
+        if df[categorical[0]].is_unique and len(df) <= MAX_CATEGORIES:
+            built = _category_chart(df, categorical[0], numeric, question)
+    elif len(df.columns) == 2 and len(numeric) == 2:
+        key, measure = numeric
+        # an integer group-by key such as "pclass" followed by an aggregate reads as categories
+        if pd.api.types.is_integer_dtype(df[key]) and df[key].is_unique and len(df) <= MAX_CATEGORIES:
+            built = _category_chart(df, key, [measure], question)
+        elif len(df) > 2:
+            built = _scatter_chart(df, key, measure)
+
+    if built is None:
+        return None
+    chart_config, explanation = built
+    return {"chart_config": chart_config, "explanation": explanation}
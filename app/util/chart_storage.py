@@ -0,0 +1,216 @@
+"""Storage of Visualization.chart_config.
+
+The column is JSONB on PostgreSQL (JSON elsewhere). In the zstd storage mode the large part of a Plotly config,
+its "data" traces, is stored as a zstd frame compressed with a dictionary shared by all configs, and the rest
+(layout, ...) stays plain JSON. Frames are decompressed by the column type when the column is loaded, which only
+happens when the full config is selected: summary and projected listings never read it.
+
+    python -m app.util.chart_storage train [--samples 5000] [--size 112640]
+    python -m app.util.chart_storage recompress [--batch-size 500]
+"""
+import argparse
+import base64
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import orjson
+import zstandard
+from sqlalchemy import JSON, create_engine, orm, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+STORAGE_MODES = ("json", "zstd")
+# {"data": {"$zstd": "<base64 frame>"}, "layout": {...}}: Plotly data is a list, so a dict with this key is ours
+COMPRESSED_KEY = "$zstd"
+DICTIONARY_SUFFIX = ".zdict"
+
+
+def check_storage_mode(mode: str):
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown chart config storage '{mode}', expected one of {', '.join(STORAGE_MODES)}")
+
+
+def is_compressed(config: Any) -> bool:
+    return isinstance(config, dict) and isinstance(config.get("data"), dict) and COMPRESSED_KEY in config["data"]
+
+
+def train_dictionary(samples: Iterable[Any], dict_size: int) -> zstandard.ZstdCompressionDict:
+    """zstd dictionary trained on the "data" part of existing chart configs."""
+    payloads = [orjson.dumps(sample) for sample in samples if sample]
+    if not payloads:
+        raise ValueError("No chart configs with data to train a dictionary on")
+    try:
+        return zstandard.train_dictionary(dict_size, payloads)
+    except zstandard.ZstdError as e:
+        raise ValueError(f"Could not train a dictionary on {len(payloads)} chart configs: {e}")
+
+
+class ChartConfigCodec:
+    """Compresses and decompresses the "data" part of chart configs.
+
+    Dictionaries live in `dict_dir` as <dict id>.zdict and are loaded on first use; new configs are compressed with
+    the most recently trained one. Every zstd frame records the id of its dictionary, so configs written with older
+    dictionaries, without one, or stored as plain JSON before the mode was switched on all keep decoding.
+    """
+
+    def __init__(self, mode: str = "json", dict_dir: Optional[str] = None, min_bytes: int = 2048, level: int = 3):
+        self._lock = threading.Lock()
+        self.configure(mode, dict_dir, min_bytes, level)
+
+    def configure(self, mode: str, dict_dir: Optional[str], min_bytes: int, level: int):
+        check_storage_mode(mode)
+        with self._lock:
+            self.mode = mode
+            self.dict_dir = dict_dir
+            self.min_bytes = min_bytes
+            self.level = level
+            self._dictionaries: Dict[int, zstandard.ZstdCompressionDict] = {}
+            self._active: Optional[zstandard.ZstdCompressionDict] = None
+            self._active_loaded = False
+
+    def _dictionary_path(self, dict_id: int) -> str:
+        return os.path.join(self.dict_dir, f"{dict_id}{DICTIONARY_SUFFIX}")
+
+    def _load(self, path: str) -> zstandard.ZstdCompressionDict:
+        with open(path, "rb") as handle:
+            dictionary = zstandard.ZstdCompressionDict(handle.read())
+        # compressors are created per call (they are not thread-safe); precomputing makes that cheap
+        dictionary.precompute_compress(level=self.level)
+        self._dictionaries[dictionary.dict_id()] = dictionary
+        return dictionary
+
+    def dictionary(self, dict_id: int) -> zstandard.ZstdCompressionDict:
+        with self._lock:
+            if dict_id not in self._dictionaries:
+                path = self._dictionary_path(dict_id) if self.dict_dir else None
+                if not path or not os.path.exists(path):
+                    raise ValueError(f"zstd dictionary {dict_id} is not in {self.dict_dir}")
+                self._load(path)
+            return self._dictionaries[dict_id]
+
+    def active_dictionary(self) -> Optional[zstandard.ZstdCompressionDict]:
+        """The newest dictionary in dict_dir, None when none has been trained."""
+        with self._lock:
+            if not self._active_loaded:
+                paths = []
+                if self.dict_dir and os.path.isdir(self.dict_dir):
+                    paths = [
+                        os.path.join(self.dict_dir, name)
+                        for name in os.listdir(self.dict_dir)
+                        if name.endswith(DICTIONARY_SUFFIX)
+                    ]
+                self._active = self._load(max(paths, key=os.path.getmtime)) if paths else None
+                self._active_loaded = True
+            return self._active
+
+    def save_dictionary(self, dictionary: zstandard.ZstdCompressionDict) -> int:
+        """Store a trained dictionary in dict_dir and make it the one new configs are compressed with."""
+        if not self.dict_dir:
+            raise ValueError("No dictionary directory configured")
+        os.makedirs(self.dict_dir, exist_ok=True)
+        path = self._dictionary_path(dictionary.dict_id())
+        with open(path + ".tmp", "wb") as handle:
+            handle.write(dictionary.as_bytes())
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            self._active = self._load(path)
+            self._active_loaded = True
+        return dictionary.dict_id()
+
+    def encode(self, config: Any) -> Any:
+        if self.mode != "zstd" or not isinstance(config, dict) or not config.get("data") or is_compressed(config):
+            return config
+        payload = orjson.dumps(config["data"])
+        if len(payload) < self.min_bytes:
+            return config
+        dictionary = self.active_dictionary()
+        compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+        frame = base64.b64encode(compressor.compress(payload)).decode()
+        return {**config, "data": {COMPRESSED_KEY: frame}}
+
+    def decode(self, config: Any) -> Any:
+        if not is_compressed(config):
+            return config
+        frame = base64.b64decode(config["data"][COMPRESSED_KEY])
+        dict_id = zstandard.get_frame_parameters(frame).dict_id
+        decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary(dict_id) if dict_id else None)
+        return {**config, "data": orjson.loads(decompressor.decompress(frame))}
+
+
+chart_codec = ChartConfigCodec()
+
+
+class ChartConfigJSON(TypeDecorator):
+    """JSONB on PostgreSQL, JSON elsewhere; compresses the "data" traces through `codec` on the way in and out."""
+
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, codec: Optional[ChartConfigCodec] = None):
+        super().__init__()
+        self.codec = codec or chart_codec
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        return self.codec.encode(value)
+
+    def process_result_value(self, value, dialect):
+        return self.codec.decode(value)
+
+
+def _chart_data_samples(session, model, limit: int) -> List[Any]:
+    rows = session.execute(select(model.chart_config).order_by(model.id.desc()).limit(limit)).scalars()
+    return [config.get("data") for config in rows if isinstance(config, dict)]
+
+
+def _recompress(session, model, batch_size: int) -> int:
+    """Rewrite every stored config with the current mode and dictionary, one batch of ids at a time."""
+    last_id, rewritten = 0, 0
+    while True:
+        rows = session.execute(
+            select(model.id, model.chart_config).where(model.id > last_id).order_by(model.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return rewritten
+        for id, config in rows:
+            session.execute(update(model).where(model.id == id).values(chart_config=config))
+        session.commit()
+        last_id, rewritten = rows[-1][0], rewritten + len(rows)
+
+
+def main():
+    from app.core.config import configs
+    from app.model.visualization import Visualization
+
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser("train", help="train a dictionary on the most recent chart configs")
+    train.add_argument("--samples", type=int, default=5000)
+    train.add_argument("--size", type=int, default=110 * 1024, help="dictionary size in bytes")
+    recompress = commands.add_parser("recompress", help="rewrite stored configs with the current mode and dictionary")
+    recompress.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    chart_codec.configure(
+        configs.CHART_CONFIG_STORAGE,
+        configs.CHART_CONFIG_DICT_DIR,
+        configs.CHART_CONFIG_COMPRESS_MIN_BYTES,
+        configs.CHART_CONFIG_ZSTD_LEVEL,
+    )
+    engine = create_engine(configs.DATABASE_URI)
+    with orm.Session(engine) as session:
+        if args.command == "train":
+            samples = _chart_data_samples(session, Visualization, args.samples)
+            dict_id = chart_codec.save_dictionary(train_dictionary(samples, args.size))
+            print(f"trained dictionary {dict_id} on {len(samples)} configs, saved in {configs.CHART_CONFIG_DICT_DIR}")
+        else:
+            print(f"rewrote {_recompress(session, Visualization, args.batch_size)} chart configs")
+
+
+if __name__ == "__main__":
+    main()
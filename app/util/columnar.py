@@ -0,0 +1,133 @@
+import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+import pandas as pd
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    """Typed array for one column: int64/float64/bool/datetime64 where possible, object otherwise."""
+    sample = next((value for value in values if value is not None), None)
+    has_null = any(value is None for value in values)
+    if isinstance(sample, bool):
+        return np.array(values, dtype=object if has_null else bool)
+    if isinstance(sample, int) and not has_null:
+        try:
+            return np.array(values, dtype=np.int64)
+        except (OverflowError, TypeError, ValueError):
+            pass
+    if isinstance(sample, (int, float, Decimal)):
+        try:
+            return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    if isinstance(sample, (datetime.datetime, datetime.date)):
+        try:
+            return pd.to_datetime(values, utc=getattr(sample, "tzinfo", None) is not None).tz_localize(None).to_numpy()
+        except (TypeError, ValueError):
+            pass
+    return np.array(values, dtype=object)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _concat(parts: List[np.ndarray]) -> np.ndarray:
+    """One column from its per-batch arrays; batches typed differently (e.g. a later one has nulls) are re-typed."""
+    if not parts:
+        return _to_array([])
+    if all(part.dtype == parts[0].dtype for part in parts):
+        return np.concatenate(parts)
+    # datetime64 tolist() gives integers, a Series gives Timestamps
+    return _to_array([value for part in parts for value in (pd.Series(part) if part.dtype.kind == "M" else part).tolist()])
+
+
+class ColumnarResult:
+    """Query result stored as column name -> typed numpy array."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], truncated: bool = False) -> None:
+        self.columns = columns
+        self.truncated = truncated
+
+    @property
+    def row_count(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def from_result(cls, result, max_rows: int, batch_size: int) -> "ColumnarResult":
+        """Fetch at most `max_rows` rows in batches from a (streaming) SQLAlchemy result and stop early.
+
+        Each batch is turned into typed arrays as soon as it is fetched, so only one batch of Python row tuples is
+        alive at a time: memory is the numpy columns plus one batch, not max_rows tuples."""
+        keys = list(result.keys())
+        parts: List[List[np.ndarray]] = [[] for _ in keys]
+        fetched = 0
+        truncated = False
+        while fetched < max_rows:
+            rows = result.fetchmany(min(batch_size, max_rows - fetched))
+            if not rows:
+                break
+            fetched += len(rows)
+            cls._append_batch(parts, rows)
+        else:
+            truncated = result.fetchone() is not None
+        result.close()
+        return cls._from_parts(keys, parts, truncated)
+
+    @classmethod
+    async def afrom_result(cls, result, max_rows: int, batch_size: int) -> "ColumnarResult":
+        """from_result for an AsyncResult (AsyncSession.stream)."""
+        keys = list(result.keys())
+        parts: List[List[np.ndarray]] = [[] for _ in keys]
+        fetched = 0
+        truncated = False
+        while fetched < max_rows:
+            rows = await result.fetchmany(min(batch_size, max_rows - fetched))
+            if not rows:
+                break
+            fetched += len(rows)
+            cls._append_batch(parts, rows)
+        else:
+            truncated = await result.fetchone() is not None
+        await result.close()
+        return cls._from_parts(keys, parts, truncated)
+
+    @staticmethod
+    def _append_batch(parts: List[List[np.ndarray]], rows: List[tuple]):
+        for column_parts, values in zip(parts, zip(*rows)):
+            column_parts.append(_to_array(list(values)))
+
+    @classmethod
+    def _from_parts(cls, keys: List[str], parts: List[List[np.ndarray]], truncated: bool) -> "ColumnarResult":
+        return cls({key: _concat(column_parts) for key, column_parts in zip(keys, parts)}, truncated)
+
+    @classmethod
+    def from_numpy(cls, columns: Dict[str, np.ndarray], truncated: bool = False) -> "ColumnarResult":
+        return cls({key: np.asarray(values) for key, values in columns.items()}, truncated)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, copy=False)
+
+    def head_records(self, n: int) -> List[Dict[str, Any]]:
+        head = orjson.loads(self._dumps({key: values[:n] for key, values in self.columns.items()}))
+        return [dict(zip(head, row)) for row in zip(*head.values())]
+
+    def to_json(self) -> str:
+        payload = {"columns": self.columns, "row_count": self.row_count, "truncated": self.truncated}
+        return self._dumps(payload).decode("utf-8")
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=_default)
+
+    @classmethod
+    def from_json(cls, payload: Optional[str]) -> Optional["ColumnarResult"]:
+        if not payload or not payload.startswith("{"):
+            return None
+        data = orjson.loads(payload)
+        return cls({key: _to_array(values) for key, values in data["columns"].items()}, data.get("truncated", False))
@@ -0,0 +1,139 @@
+import hashlib
+import importlib.util
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import zstandard
+
+# Content-Encoding tokens, most preferred first when the client weighs them equally
+ENCODINGS = ("zstd", "br", "gzip")
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "image/svg+xml")
+
+
+def brotli_available() -> bool:
+    return importlib.util.find_spec("brotli") is not None
+
+
+def available_encodings(names: List[str]) -> List[str]:
+    unknown = [name for name in names if name not in ENCODINGS]
+    if unknown:
+        raise ValueError(f"Unknown encodings {', '.join(unknown)}, expected some of {', '.join(ENCODINGS)}")
+    return [name for name in names if name != "br" or brotli_available()]
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Levels per encoding from "zstd:3,br:4,gzip:6"."""
+    levels = {}
+    for item in spec.split(","):
+        if item.strip():
+            name, _, level = item.partition(":")
+            levels[name.strip()] = int(level)
+    return levels
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """The encoding to use for a request's Accept-Encoding: highest q-value, `encodings` order breaking ties.
+    None means identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    ranked = [(weights.get(name, wildcard), -index, name) for index, name in enumerate(encodings)]
+    ranked = [entry for entry in ranked if entry[0] > 0]
+    return max(ranked)[2] if ranked else None
+
+
+def compress(encoding: str, data: bytes, level: int) -> bytes:
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(data, quality=level)
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+class StreamCompressor:
+    """Incremental compressor for streamed bodies: every chunk is flushed, so clients get rows/events as they come."""
+
+    def __init__(self, encoding: str, level: int) -> None:
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            import brotli
+
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.flush()
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def body_digest(body: bytes) -> str:
+    """Cache key of an uncompressed body; hashing is far cheaper than compressing at the cached levels."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class CompressedCache:
+    """Compressed bodies keyed by (body digest, encoding), least recently used dropped past `max_bytes`.
+
+    A response with an ETag is usually sent again unchanged, so it is compressed once, at a higher level."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: Tuple[str, str], body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self.size -= len(self._entries.popitem(last=False)[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
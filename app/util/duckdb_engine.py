@@ -0,0 +1,94 @@
+import importlib.util
+import os
+import re
+import shutil
+from typing import Optional
+
+import pandas as pd
+
+from app.util.columnar import ColumnarResult
+
+ENGINES = ("sql", "duckdb")
+
+
+def duckdb_available() -> bool:
+    return importlib.util.find_spec("duckdb") is not None
+
+
+def check_engine(engine: str):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown dataset engine '{engine}', expected one of {', '.join(ENGINES)}")
+    if engine == "duckdb" and not duckdb_available():
+        raise ValueError("The duckdb engine needs the duckdb package (pip install duckdb)")
+
+
+def dataset_dir(root: str, table_name: str) -> str:
+    return os.path.join(root, table_name)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class ParquetDatasetWriter:
+    """Writes a dataset as one Parquet part file per ingested chunk, next to its SQL table."""
+
+    def __init__(self, root: str, table_name: str) -> None:
+        import duckdb
+
+        self.directory = dataset_dir(root, table_name)
+        os.makedirs(self.directory, exist_ok=True)
+        self.connection = duckdb.connect()
+        self.parts = 0
+
+    def write(self, df: pd.DataFrame):
+        chunk = df.copy(deep=False)
+        for name in chunk.columns:
+            if chunk[name].dtype == object:
+                # mixed Python objects in one column: store as text, like the SQL table does
+                chunk[name] = chunk[name].where(chunk[name].isna(), chunk[name].astype(str))
+        self.connection.register("chunk", chunk)
+        path = os.path.join(self.directory, f"part-{self.parts:05d}.parquet")
+        self.connection.execute(f"COPY chunk TO {_quote(path)} (FORMAT parquet)")
+        self.connection.unregister("chunk")
+        self.parts += 1
+
+    def close(self):
+        self.connection.close()
+
+    def remove(self):
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def has_parquet(root: str, table_name: str) -> bool:
+    directory = dataset_dir(root, table_name)
+    return os.path.isdir(directory) and any(name.endswith(".parquet") for name in os.listdir(directory))
+
+
+def execute_duckdb(root: str, table_name: str, sql: str, max_rows: int, threads: Optional[int] = None) -> ColumnarResult:
+    """Run agent SQL with DuckDB over the dataset's Parquet files, exposed under the dataset's table name."""
+    import duckdb
+
+    directory = os.path.abspath(dataset_dir(root, table_name))
+    pattern = os.path.join(directory, "*.parquet")
+    connection = duckdb.connect(config={"autoinstall_known_extensions": False, "autoload_known_extensions": False})
+    try:
+        if threads:
+            connection.execute(f"SET threads = {int(threads)}")
+        # the SQL is written by the LLM: it may read this dataset's files and nothing else on the host, and cannot
+        # turn that back on (allowed_directories must be set while external access is still enabled)
+        connection.execute(f"SET allowed_directories = [{_quote(directory + os.sep)}]")
+        connection.execute("SET enable_external_access = false")
+        connection.execute(
+            f'CREATE VIEW "{table_name}" AS SELECT * FROM read_parquet({_quote(pattern)}, union_by_name = true)'
+        )
+        connection.execute("SET lock_configuration = true")
+        query = re.sub(r";\s*$", "", sql.strip())
+        df = connection.execute(f"SELECT * FROM ({query}) AS agent_query LIMIT {int(max_rows) + 1}").df()
+    finally:
+        connection.close()
+    truncated = len(df) > max_rows
+    if truncated:
+        df = df.head(max_rows)
+    return ColumnarResult.from_numpy({name: df[name].to_numpy() for name in df.columns}, truncated)
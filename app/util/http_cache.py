@@ -0,0 +1,35 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over a change marker of the data and everything else that shapes the body (path, query, Accept).
+
+    Weak, because the same representation is sent gzip/br/zstd-encoded or not."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional(request: Request, response: Response, cache_control: str, *version: Any) -> Optional[Response]:
+    """Set ETag and Cache-Control on `response`; a 304 Not Modified to return instead when the client's copy is current.
+
+    `version` is a cheap change marker of what the endpoint reads (e.g. a table's row count and max(updated_at)).
+    """
+    etag = make_etag(*version, request.url.path, request.url.query, request.headers.get("accept", ""))
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept, Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,297 @@
+import io
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.util.parallel_parsing import (
+    excel_engine,
+    get_parse_pool,
+    ordered_map,
+    parse_csv_range,
+    parse_sheet,
+    split_csv_ranges,
+)
+
+COPY_CHUNK_ROWS = 50_000
+INSERT_BATCH_ROWS = 5_000
+NULL_MARKER = "\\N"
+
+_POSTGRES_TYPES = {
+    "integer": "BIGINT",
+    "float": "DOUBLE PRECISION",
+    "boolean": "BOOLEAN",
+    "datetime": "TIMESTAMP",
+    "datetimetz": "TIMESTAMP WITH TIME ZONE",
+    "text": "TEXT",
+}
+_MYSQL_TYPES = {**_POSTGRES_TYPES, "float": "DOUBLE", "datetime": "DATETIME", "datetimetz": "DATETIME"}
+_SQLITE_TYPES = {**_POSTGRES_TYPES, "float": "REAL", "boolean": "INTEGER"}
+DIALECT_TYPES = {"postgresql": _POSTGRES_TYPES, "mysql": _MYSQL_TYPES, "sqlite": _SQLITE_TYPES}
+# pandas dtype name reported in columns_metadata for each column kind
+KIND_DTYPE_NAMES = {
+    "integer": "int64",
+    "float": "float64",
+    "boolean": "bool",
+    "datetime": "datetime64[ns]",
+    "datetimetz": "datetime64[ns, UTC]",
+    "text": "object",
+}
+SPOOL_BLOCK_BYTES = 1024 * 1024
+SUPPORTED_EXTENSIONS = (".csv", ".xls", ".xlsx")
+
+
+def column_kind(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "integer"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return "datetimetz"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "text"
+
+
+def quote_identifier(name: str, dialect: str) -> str:
+    quote = "`" if dialect == "mysql" else '"'
+    return quote + str(name).replace(quote, quote * 2) + quote
+
+
+def create_table_ddl(table_name: str, dtypes: Dict[str, object], dialect: str) -> str:
+    """CREATE TABLE statement derived from the inferred pandas dtypes."""
+    types = DIALECT_TYPES.get(dialect, _POSTGRES_TYPES)
+    columns = ", ".join(f"{quote_identifier(name, dialect)} {types[column_kind(dtype)]}" for name, dtype in dtypes.items())
+    return f"CREATE TABLE {quote_identifier(table_name, dialect)} ({columns})"
+
+
+def _csv_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterable[str]:
+    for start in range(0, len(df), chunk_rows):
+        buffer = io.StringIO()
+        df.iloc[start : start + chunk_rows].to_csv(buffer, index=False, header=False, na_rep=NULL_MARKER)
+        yield buffer.getvalue()
+
+
+def _python_values(series: pd.Series) -> list:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # plain datetime objects: DBAPI drivers do not all accept pandas Timestamps
+        return [None if value is pd.NaT else value.to_pydatetime() for value in series]
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _records(df: pd.DataFrame, params: List[str]) -> List[dict]:
+    columns = [_python_values(df.iloc[:, i]) for i in range(len(df.columns))]
+    return [dict(zip(params, row)) for row in zip(*columns)]
+
+
+def copy_dataframe(connection: Connection, df: pd.DataFrame, table_name: str, chunk_rows: int = COPY_CHUNK_ROWS):
+    """Stream rows into PostgreSQL with COPY FROM STDIN through psycopg 3's copy API."""
+    columns = ", ".join(quote_identifier(name, "postgresql") for name in df.columns)
+    statement = (
+        f"COPY {quote_identifier(table_name, 'postgresql')} ({columns}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')"
+    )
+    raw = connection.connection.driver_connection
+    with raw.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for chunk in _csv_chunks(df, chunk_rows):
+                copy.write(chunk)
+
+
+def insert_dataframe(connection: Connection, df: pd.DataFrame, table_name: str, batch_rows: int = INSERT_BATCH_ROWS):
+    """Batched executemany INSERT for drivers without a COPY API (MySQL, SQLite)."""
+    dialect = connection.dialect.name
+    params = [f"p{i}" for i in range(len(df.columns))]
+    statement = text(
+        f"INSERT INTO {quote_identifier(table_name, dialect)} "
+        f"({', '.join(quote_identifier(name, dialect) for name in df.columns)}) "
+        f"VALUES ({', '.join(':' + param for param in params)})"
+    )
+    for start in range(0, len(df), batch_rows):
+        connection.execute(statement, _records(df.iloc[start : start + batch_rows], params))
+
+
+def supports_copy(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg"
+
+
+def ingest_dataframe(connection: Connection, df: pd.DataFrame, table_name: str, create: bool = True) -> int:
+    """Create `table_name` from the dtypes of `df` and bulk load its rows. Returns the number of rows loaded."""
+    if create:
+        connection.execute(text(create_table_ddl(table_name, dict(df.dtypes), connection.dialect.name)))
+    if df.empty:
+        return 0
+    if supports_copy(connection):
+        copy_dataframe(connection, df, table_name)
+    else:
+        insert_dataframe(connection, df, table_name)
+    return len(df)
+
+
+def widen_kind(current: str, incoming: str) -> str:
+    """Smallest column kind that holds values of both kinds."""
+    if current == incoming:
+        return current
+    if {current, incoming} <= {"integer", "float"}:
+        return "float"
+    return "text"
+
+
+def alter_column_ddl(table_name: str, column: str, kind: str, dialect: str) -> Optional[str]:
+    column_type = DIALECT_TYPES.get(dialect, _POSTGRES_TYPES)[kind]
+    table, name = quote_identifier(table_name, dialect), quote_identifier(column, dialect)
+    if dialect == "postgresql":
+        return f"ALTER TABLE {table} ALTER COLUMN {name} TYPE {column_type} USING {name}::{column_type}"
+    if dialect == "mysql":
+        return f"ALTER TABLE {table} MODIFY COLUMN {name} {column_type}"
+    # SQLite columns are dynamically typed, nothing to widen
+    return None
+
+
+class ChunkedTableWriter:
+    """Creates the table from the first chunk and appends later ones, widening column types a chunk does not fit."""
+
+    def __init__(self, connection: Connection, table_name: str) -> None:
+        self.connection = connection
+        self.table_name = table_name
+        self.dialect = connection.dialect.name
+        self.kinds: Dict[str, str] = {}
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> int:
+        if not self.kinds:
+            self.kinds = {name: column_kind(dtype) for name, dtype in df.dtypes.items()}
+            self.connection.execute(text(create_table_ddl(self.table_name, dict(df.dtypes), self.dialect)))
+        else:
+            self._reconcile(df)
+        loaded = ingest_dataframe(self.connection, df, self.table_name, create=False)
+        self.rows += loaded
+        return loaded
+
+    def _reconcile(self, df: pd.DataFrame):
+        for name, dtype in df.dtypes.items():
+            if df[name].isna().all():
+                # an all-null chunk says nothing about the column type
+                continue
+            current = self.kinds[name]
+            widened = widen_kind(current, column_kind(dtype))
+            if widened == current:
+                continue
+            self.kinds[name] = widened
+            statement = alter_column_ddl(self.table_name, name, widened, self.dialect)
+            if statement:
+                self.connection.execute(text(statement))
+
+    def dtype_names(self) -> Dict[str, str]:
+        return {name: KIND_DTYPE_NAMES[kind] for name, kind in self.kinds.items()}
+
+
+def spool_upload(source: BinaryIO, suffix: str = "", directory: Optional[str] = None) -> str:
+    """Copy an upload stream to a temporary file block by block and return its path."""
+    handle, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    with os.fdopen(handle, "wb") as target:
+        shutil.copyfileobj(source, target, SPOOL_BLOCK_BYTES)
+    return path
+
+
+def frame_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start : start + chunk_rows].reset_index(drop=True)
+
+
+def _excel_chunks(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    if excel_engine() or not path.endswith(".xlsx"):
+        # calamine parses a whole sheet several times faster than openpyxl streams it; legacy .xls has no
+        # streaming reader at all
+        yield from frame_chunks(parse_sheet(path, 0), chunk_rows)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value) if value is not None else f"Unnamed: {i}" for i, value in enumerate(next(rows, ()))]
+        batch, emitted = [], False
+        for row in rows:
+            batch.append(row[: len(header)])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header).infer_objects()
+                batch, emitted = [], True
+        if batch or not emitted:
+            yield pd.DataFrame(batch, columns=header).infer_objects()
+    finally:
+        workbook.close()
+
+
+class FileChunkReader:
+    """DataFrames read from a spooled upload, tracking how far into the file it got.
+
+    Small CSVs are read sequentially in `chunk_rows` chunks. With `parse_workers` > 1, CSVs of at least
+    `parallel_min_bytes` are split into `range_bytes` byte ranges on record boundaries and parsed in a process pool;
+    ranges come back in file order and only a few are in flight at a time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        filename: str,
+        chunk_rows: int,
+        parse_workers: int = 1,
+        range_bytes: int = 32 * 1024 * 1024,
+        parallel_min_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        if not filename.endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError("Unsupported file format")
+        self.path = path
+        self.filename = filename
+        self.chunk_rows = chunk_rows
+        self.parse_workers = parse_workers
+        self.range_bytes = range_bytes
+        self.parallel_min_bytes = parallel_min_bytes
+        self.bytes_total = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        if self.filename.endswith(".csv") and self.parse_workers > 1 and self.bytes_total >= self.parallel_min_bytes:
+            yield from self._parallel_csv_chunks()
+        elif self.filename.endswith(".csv"):
+            with open(self.path, "rb") as handle, pd.read_csv(handle, chunksize=self.chunk_rows) as reader:
+                for df in reader:
+                    # the parser reads ahead in blocks, so this is accurate to one block
+                    self.bytes_read = min(handle.tell(), self.bytes_total)
+                    yield df
+        else:
+            # openpyxl does not expose a byte position; progress jumps to the end when the sheet is done
+            yield from _excel_chunks(self.path, self.chunk_rows)
+        self.bytes_read = self.bytes_total
+
+    def _parallel_csv_chunks(self) -> Iterator[pd.DataFrame]:
+        header, ranges = split_csv_ranges(self.path, self.range_bytes)
+        if not ranges:
+            yield pd.read_csv(io.BytesIO(header))
+            return
+        pool = get_parse_pool(self.parse_workers)
+        arguments = [(self.path, header, start, end) for start, end in ranges]
+        for (_, end), df in zip(ranges, ordered_map(pool, parse_csv_range, arguments, prefetch=self.parse_workers * 2)):
+            self.bytes_read = end
+            yield df
+
+
+def iter_sheets(path: str, names: List[str], parse_workers: int = 1) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """(sheet name, DataFrame) for the given worksheets in order, parsed in parallel when there are several."""
+    if parse_workers > 1 and len(names) > 1:
+        frames = ordered_map(get_parse_pool(parse_workers), parse_sheet, [(path, name) for name in names], parse_workers)
+    else:
+        frames = (parse_sheet(path, name) for name in names)
+    yield from zip(names, frames)
+
+
+def iter_file_chunks(path: str, filename: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    return iter(FileChunkReader(path, filename, chunk_rows))
@@ -0,0 +1,20 @@
+from typing import AsyncIterator, List, Optional
+
+import orjson
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+async def ndjson_stream(partitions: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """One JSON object per line, one chunk per fetched batch. The status line is already sent when a batch fails,
+    so the error goes out as a last {"error": ...} line."""
+    try:
+        async for rows in partitions:
+            # OPT_UTC_Z: UTC datetimes end in "Z", as in the JSON responses
+            yield b"".join(orjson.dumps(row, option=orjson.OPT_UTC_Z) + b"\n" for row in rows)
+    except Exception as e:
+        yield orjson.dumps({"error": str(e)}) + b"\n"
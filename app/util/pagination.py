@@ -0,0 +1,177 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+COUNT_MODES = ("exact", "estimate", "cached", "none")
+
+
+def encode_cursor(ordering: str, value: Any, id: int) -> str:
+    """Opaque keyset cursor: the ordering and the (ordering value, id) of the last row of a page."""
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    payload = json.dumps([ordering, value, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: str, column) -> Tuple[Any, int]:
+    """Return the (ordering value, id) stored in `cursor`; ValueError if it is malformed or from another ordering."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_ordering, value, id = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Malformed cursor")
+    if cursor_ordering != ordering:
+        raise ValueError(f"Cursor was issued for ordering '{cursor_ordering}', not '{ordering}'")
+    if value is not None:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = None
+        if python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif python_type is date:
+            value = date.fromisoformat(value)
+    return value, int(id)
+
+
+class CountCache:
+    """Per-process cache of filtered row counts, keyed by the compiled count query."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, key: str, count: int, ttl_seconds: float):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl_seconds, count)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def order_by_clauses(model, ordering: str) -> Tuple[Any, bool, List[Any]]:
+    """Ordering column, direction and ORDER BY clauses; id breaks ties so keyset pages never skip or repeat rows."""
+    descending = ordering.startswith("-")
+    column = getattr(model, ordering[1:] if descending else ordering)
+    clauses = [column.desc() if descending else column.asc()]
+    if column is not model.id:
+        clauses.append(model.id.desc() if descending else model.id.asc())
+    return column, descending, clauses
+
+
+# dialects that sort NULLs as larger than any value (last ascending, first descending); the others as smaller
+NULLS_SORT_HIGH = ("postgresql", "oracle")
+
+
+def seek_condition(model, column, descending: bool, ordering: str, cursor: str, dialect: str = "postgresql"):
+    """WHERE clause that starts a keyset page right after the row `cursor` points at.
+
+    A row comparison with NULL is NULL, so on a nullable ordering column the NULL rows get their own branch, placed
+    where `dialect` sorts them."""
+    value, last_id = decode_cursor(cursor, ordering, column)
+    after_id = model.id < last_id if descending else model.id > last_id
+    if column is model.id:
+        return after_id
+    keys, last = tuple_(column, model.id), tuple_(value, last_id)
+    after = keys < last if descending else keys > last
+    if not column.nullable:
+        return after
+    nulls_after = (dialect in NULLS_SORT_HIGH) != descending
+    if value is None:
+        null_rows = and_(column.is_(None), after_id)
+        return null_rows if nulls_after else or_(null_rows, column.is_not(None))
+    return or_(after, column.is_(None)) if nulls_after else after
+
+
+def split_page(rows: List[Any], page_size: int, ordering: str, column) -> Tuple[List[Any], Optional[str]]:
+    """Rows were fetched with LIMIT page_size + 1: trim the probe row and return the cursor of the next page."""
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(ordering, getattr(rows[-1], column.key), rows[-1].id)
+
+
+def count_key(statement: Select) -> str:
+    compiled = statement.compile(compile_kwargs={"render_postcompile": True})
+    return f"{compiled}|{sorted(compiled.params.items())}"
+
+
+def _count_statement(statement: Select) -> Select:
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def _explain(statement: Select, dialect) -> Optional[Tuple[str, dict]]:
+    """EXPLAIN of `statement` for a planner row estimate (PostgreSQL only); None where there is no cheap estimate."""
+    if dialect.name != "postgresql":
+        return None
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    return f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+
+
+def _plan_rows(plan: Any) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(session: Session, statement: Select, mode: str, ttl_seconds: float) -> Optional[int]:
+    """total_count of `statement` in the requested mode: exact | estimate | cached | none."""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        explain = _explain(statement, session.get_bind().dialect)
+        if explain is not None:
+            return _plan_rows(session.connection().exec_driver_sql(*explain).scalar())
+        mode = "cached"
+    if mode == "cached":
+        key = count_key(statement)
+        count = count_cache.get(key)
+        if count is None:
+            count = session.execute(_count_statement(statement)).scalar_one()
+            count_cache.set(key, count, ttl_seconds)
+        return count
+    return session.execute(_count_statement(statement)).scalar_one()
+
+
+async def acount_rows(session: AsyncSession, statement: Select, mode: str, ttl_seconds: float) -> Optional[int]:
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        explain = _explain(statement, session.get_bind().dialect)
+        if explain is not None:
+            connection = await session.connection()
+            return _plan_rows((await connection.exec_driver_sql(*explain)).scalar())
+        mode = "cached"
+    if mode == "cached":
+        key = count_key(statement)
+        count = count_cache.get(key)
+        if count is None:
+            count = (await session.execute(_count_statement(statement))).scalar_one()
+            count_cache.set(key, count, ttl_seconds)
+        return count
+    return (await session.execute(_count_statement(statement))).scalar_one()
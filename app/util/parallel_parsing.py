@@ -0,0 +1,104 @@
+import importlib.util
+import io
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+SCAN_BLOCK_BYTES = 4 * 1024 * 1024
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_parse_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process-wide parsing pool of `max_workers` processes, created on first use."""
+    with _pools_lock:
+        if max_workers not in _pools:
+            # spawn: the API process runs threads, forking it is not safe
+            _pools[max_workers] = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pools[max_workers]
+
+
+def excel_engine() -> Optional[str]:
+    """calamine (Rust) when python-calamine is installed, otherwise pandas' default engine."""
+    return "calamine" if importlib.util.find_spec("python_calamine") else None
+
+
+def split_csv_ranges(path: str, range_bytes: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Header line and (start, end) byte ranges of roughly `range_bytes` that each end on a record boundary.
+
+    A newline only ends a record when the number of quotes before it is even, so quoted newlines are never split.
+    """
+    ranges = []
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        start = position = handle.tell()
+        target = start + range_bytes
+        in_quotes = False
+        while True:
+            block = handle.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            offset = 0
+            while position + len(block) > target:
+                search_from = max(target - position, offset)
+                in_quotes ^= block.count(b'"', offset, search_from) % 2 == 1
+                newline = block.find(b"\n", search_from)
+                while newline != -1:
+                    in_quotes ^= block.count(b'"', search_from, newline) % 2 == 1
+                    if not in_quotes:
+                        break
+                    search_from = newline + 1
+                    newline = block.find(b"\n", search_from)
+                if newline == -1:
+                    in_quotes ^= block.count(b'"', search_from) % 2 == 1
+                    offset = len(block)
+                    break
+                end = position + newline + 1
+                ranges.append((start, end))
+                start, target, offset = end, end + range_bytes, newline + 1
+            else:
+                in_quotes ^= block.count(b'"', offset) % 2 == 1
+            position += len(block)
+        if position > start:
+            ranges.append((start, position))
+    return header, ranges
+
+
+def parse_csv_range(path: str, header: bytes, start: int, end: int) -> pd.DataFrame:
+    """Runs in a pool process: parse one byte range with the file's header line."""
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        return pd.read_csv(io.BytesIO(header + handle.read(end - start)))
+
+
+def parse_sheet(path: str, sheet_name: Union[str, int]) -> pd.DataFrame:
+    """Runs in a pool process: parse one worksheet."""
+    return pd.read_excel(path, sheet_name=sheet_name, engine=excel_engine())
+
+
+def sheet_names(path: str) -> List[str]:
+    with pd.ExcelFile(path, engine=excel_engine()) as workbook:
+        return [str(name) for name in workbook.sheet_names]
+
+
+def ordered_map(pool: ProcessPoolExecutor, func, argument_lists: List[tuple], prefetch: int) -> Iterator:
+    """Like pool.map, but keeps at most `prefetch` results in flight so memory stays bounded."""
+    pending = deque()
+    arguments = iter(argument_lists)
+    for args in arguments:
+        pending.append(pool.submit(func, *args))
+        if len(pending) >= prefetch:
+            break
+    while pending:
+        result = pending.popleft().result()
+        next_args = next(arguments, None)
+        if next_args is not None:
+            pending.append(pool.submit(func, *next_args))
+        yield result
@@ -0,0 +1,172 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TOP_K = 10
+SAMPLE_SIZE = 5
+# exact value counts are kept until a column has this many distinct values, then HyperLogLog takes over
+EXACT_DISTINCT_LIMIT = 10_000
+HEAVY_HITTER_CAPACITY = 1_000
+
+
+class HyperLogLog:
+    """Vectorized HyperLogLog over the uint64 hashes produced by pandas."""
+
+    def __init__(self, precision: int = 14) -> None:
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        bit_length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (width - np.minimum(bit_length, width) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (int, float, bool, str)):
+        return value
+    return str(value)
+
+
+class ColumnProfiler:
+    """Profile of one column, updated chunk by chunk with vectorized pandas operations."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.dtype: Optional[str] = None
+        self.count = 0
+        self.null_count = 0
+        self.minimum = None
+        self.maximum = None
+        self.samples: List[Any] = []
+        self.counts: Optional[pd.Series] = pd.Series(dtype="int64")
+        self.exact = True
+        self.hll = HyperLogLog()
+
+    def update(self, series: pd.Series):
+        self.dtype = series.dtype.name
+        self.count += len(series)
+        values = series.dropna()
+        self.null_count += len(series) - len(values)
+        if values.empty:
+            return
+
+        self.hll.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        if self.exact and self.hll.estimate() > EXACT_DISTINCT_LIMIT:
+            self.exact = False
+        numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        if numeric or pd.api.types.is_datetime64_any_dtype(values):
+            low, high = values.min(), values.max()
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+        if len(self.samples) < SAMPLE_SIZE:
+            for value in values.head(1000).drop_duplicates().head(SAMPLE_SIZE).tolist():
+                if value not in self.samples and len(self.samples) < SAMPLE_SIZE:
+                    self.samples.append(value)
+
+        if not self.exact and numeric:
+            # top values of a high-cardinality numeric column carry no information for SQL generation
+            return
+        chunk_counts = values.value_counts()
+        merged = self.counts.add(chunk_counts, fill_value=0) if len(self.counts) else chunk_counts
+        if self.exact and len(merged) > EXACT_DISTINCT_LIMIT:
+            self.exact = False
+        if not self.exact:
+            # keep only heavy-hitter candidates once the column is high-cardinality
+            merged = merged.nlargest(HEAVY_HITTER_CAPACITY)
+        self.counts = merged
+
+    def result(self) -> Dict[str, Any]:
+        top = self.counts.nlargest(TOP_K) if len(self.counts) else self.counts
+        return {
+            "column_name": self.name,
+            "dtype": self.dtype or "object",
+            "null_ratio": self.null_count / self.count if self.count else 0.0,
+            "distinct_count": len(self.counts) if self.exact else self.hll.estimate(),
+            "distinct_is_estimate": not self.exact,
+            "min_value": None if self.minimum is None else str(_jsonable(self.minimum)),
+            "max_value": None if self.maximum is None else str(_jsonable(self.maximum)),
+            "top_values": json.dumps([[_jsonable(value), int(count)] for value, count in top.items()]),
+            "sample_values": json.dumps([_jsonable(value) for value in self.samples]),
+        }
+
+
+class DatasetProfiler:
+    def __init__(self) -> None:
+        self.columns: Dict[str, ColumnProfiler] = {}
+
+    def update(self, df: pd.DataFrame):
+        for name in df.columns:
+            self.columns.setdefault(name, ColumnProfiler(name)).update(df[name])
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [profiler.result() for profiler in self.columns.values()]
+
+
+def profile_dataframe(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    profiler = DatasetProfiler()
+    profiler.update(df)
+    return profiler.results()
+
+
+def format_profiles_for_prompt(profiles: List[Any], max_value_chars: int = 40) -> str:
+    """One compact line per column for the generate_sql prompt."""
+
+    def short(value: Any, numeric: bool = False) -> str:
+        text = str(value)
+        if numeric:
+            # only numbers are shortened; category strings like "1.10" or "5e3" are kept as they are
+            try:
+                text = f"{float(text):.6g}"
+            except ValueError:
+                pass
+        return text if len(text) <= max_value_chars else text[: max_value_chars - 3] + "..."
+
+    lines = []
+    for profile in profiles:
+        get = profile.get if isinstance(profile, dict) else lambda key: getattr(profile, key)
+        distinct = get("distinct_count")
+        numeric = pd.api.types.is_numeric_dtype(get("dtype")) and not pd.api.types.is_bool_dtype(get("dtype"))
+        parts = [f"{get('column_name')} {get('dtype')}", f"distinct={'~' if get('distinct_is_estimate') else ''}{distinct}"]
+        if get("null_ratio"):
+            parts.append(f"nulls={get('null_ratio'):.0%}")
+        if get("min_value") is not None:
+            parts.append(f"range=[{short(get('min_value'), numeric)}, {short(get('max_value'), numeric)}]")
+        top_values = json.loads(get("top_values") or "[]")
+        if top_values and (distinct or 0) <= 50:
+            parts.append("values=" + ", ".join(short(value, numeric) for value, _ in top_values))
+        else:
+            samples = top_values or json.loads(get("sample_values") or "[]")
+            if samples:
+                parts.append("e.g. " + ", ".join(short(value[0] if isinstance(value, list) else value, numeric) for value in samples[:3]))
+        lines.append("- " + "; ".join(parts))
+    return "\n".join(lines)
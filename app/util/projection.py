@@ -0,0 +1,33 @@
+from typing import Any, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+
+def projected_columns(model, fields: Optional[str], summary: bool = False) -> Optional[List[str]]:
+    """Columns a listing loads: the comma-separated `fields` (id is always included), or with `summary` every column
+    but the model's `summary_excludes`. None means whole rows. ValueError on an unknown field."""
+    columns = [column.key for column in model.__table__.columns]
+    if fields:
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}; expected some of {', '.join(columns)}")
+        return ["id"] + [name for name in names if name != "id"]
+    if summary:
+        excludes = getattr(model, "summary_excludes", ())
+        return [name for name in columns if name not in excludes]
+    return None
+
+
+def load_only_option(model, columns: List[str], *extra):
+    """Loader option for a projected ORM query; `extra` are attributes the query itself needs (e.g. the ordering)."""
+    return load_only(*[getattr(model, name) for name in columns], *extra)
+
+
+def select_columns(model, columns: List[str]):
+    return select(*[getattr(model, name) for name in columns])
+
+
+def project(rows: List[Any], columns: List[str]) -> List[dict]:
+    return [{name: getattr(row, name) for name in columns} for row in rows]
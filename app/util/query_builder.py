@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from sqlalchemy.sql.expression import and_
 
 SQLALCHEMY_QUERY_MAPPER = {
@@ -40,5 +41,11 @@ def dict_to_sqlalchemy_filter_options(model_class, search_option_dict):
         elif command == "isnull":
             bool_command = "__eq__" if option_from_dict else "__ne__"
             sql_alchemy_filter_options.append(getattr(attr, bool_command)(None))
+        # case-insensitive substring / prefix match on lower(column), which the indexes from app.util.search serve
+        # on PostgreSQL; other databases run them as LIKE scans. % and _ in the value match literally.
+        elif command == "search":
+            sql_alchemy_filter_options.append(func.lower(attr).contains(option_from_dict.lower(), autoescape=True))
+        elif command == "prefix":
+            sql_alchemy_filter_options.append(func.lower(attr).startswith(option_from_dict.lower(), autoescape=True))
 
     return and_(True, *sql_alchemy_filter_options)
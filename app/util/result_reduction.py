@@ -0,0 +1,223 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from app.util.chart_inference import classify_columns
+
+COLUMN_REF = re.compile(r"^\$col:(.+)$")
+MEAN_LIKE = re.compile(r"avg|mean|rate|ratio|pct|percent|median", re.IGNORECASE)
+OTHER_LABEL = "Other"
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+            return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the visual shape of y(x)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    bucket_edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+        next_start, next_end = end, bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def min_max_downsample(values: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of the min and max of each bucket, for several series sharing one x axis."""
+    n = len(values)
+    if buckets * 2 >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    keep = set()
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        window = values[start:end]
+        empty = np.isnan(window).all(axis=0)
+        if empty.any():
+            # a series with only nulls in this bucket (a gap) has no extremes here: keep the bucket's endpoints
+            keep.update((start, end - 1))
+            window = window[:, ~empty]
+        if window.shape[1]:
+            keep.update((start + np.nanargmin(window, axis=0)).tolist())
+            keep.update((start + np.nanargmax(window, axis=0)).tolist())
+    return np.array(sorted(keep), dtype=np.int64)
+
+
+def _top_k_categories(df: pd.DataFrame, category: str, measures: List[str], top_k: int) -> pd.DataFrame:
+    aggregations = {measure: "mean" if MEAN_LIKE.search(measure) else "sum" for measure in measures}
+    grouped = df.groupby(category, dropna=False, sort=False).agg(aggregations)
+    grouped = grouped.sort_values(measures[0], ascending=False)
+    top, rest = grouped.iloc[:top_k], grouped.iloc[top_k:]
+    other = rest.agg(aggregations).to_frame().T
+    other.index = [OTHER_LABEL]
+    return pd.concat([top, other]).rename_axis(category).reset_index()
+
+
+def reduce_for_chart(df: pd.DataFrame, top_k: int, max_points: int) -> Tuple[pd.DataFrame, List[str]]:
+    """Shrink a query result to something a chart can show: top-K + Other for categories, LTTB/min-max for series."""
+    notes = []
+    if df.empty:
+        return df, notes
+    kinds = classify_columns(df)
+    numeric, temporal, categorical = kinds["numeric"], kinds["temporal"], kinds["categorical"]
+
+    if len(temporal) == 1 and numeric and not categorical and len(df) > max_points:
+        time_column = temporal[0]
+        times = pd.to_datetime(df[time_column], errors="coerce", format="ISO8601")
+        df = df.assign(**{time_column: times}).sort_values(time_column).reset_index(drop=True)
+        x = df[time_column].astype("int64").to_numpy()
+        if len(numeric) == 1:
+            keep = lttb(x, df[numeric[0]].to_numpy(), max_points)
+            method = "LTTB"
+        else:
+            # each bucket keeps up to two rows per measure
+            buckets = max(1, max_points // (2 * len(numeric)))
+            keep = min_max_downsample(df[numeric].to_numpy(dtype=np.float64), buckets)
+            method = "min-max"
+        notes.append(f"time series downsampled from {len(df)} to {len(keep)} points ({method})")
+        df = df.iloc[keep].reset_index(drop=True)
+    elif len(categorical) == 1 and numeric and not temporal and df[categorical[0]].nunique(dropna=False) > top_k:
+        category = categorical[0]
+        distinct = df[category].nunique(dropna=False)
+        df = _top_k_categories(df, category, numeric, top_k)
+        notes.append(f"{distinct} {category} values aggregated into top {top_k} + '{OTHER_LABEL}'")
+
+    if len(df) > max_points:
+        notes.append(f"truncated to the first {max_points} rows")
+        df = df.head(max_points)
+    return df, notes
+
+
+def _numeric_stats(df: pd.DataFrame) -> List[str]:
+    lines = []
+    for column in df.select_dtypes(include="number").columns:
+        series = df[column]
+        lines.append(
+            f"{column}: min={series.min():.4g}, max={series.max():.4g}, mean={series.mean():.4g}, nulls={series.isna().sum()}"
+        )
+    return lines
+
+
+def _elided(items: List[str], keep: int, what: str) -> List[str]:
+    if keep >= len(items):
+        return items
+    return items[:keep] + [f"... {len(items) - keep} more {what}"]
+
+
+def _truncate_to_budget(text: str, token_budget: int, model: str) -> str:
+    """Longest prefix of `text` (cut at a line end when possible) that fits into `token_budget` tokens."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text.rfind("\n", 0, low)
+    return text[: cut if cut > 0 else low]
+
+
+def summarize_for_prompt(
+    full: pd.DataFrame, reduced: pd.DataFrame, notes: List[str], token_budget: int, max_rows: int, model: str = "gpt-4o"
+) -> str:
+    """Compact text description of the result that fits into `token_budget` tokens.
+
+    Over budget, the sample rows are halved first (down to 5), then the numeric stats and the column list are elided,
+    then the sample goes; whatever is still over is cut at the budget."""
+    columns = [f"{column} ({dtype})" for column, dtype in full.dtypes.astype(str).items()]
+    stats = _numeric_stats(full)
+
+    def render(column_count: int, stats_count: int, rows: int) -> str:
+        header = [f"Rows: {len(full)}", "Columns: " + ", ".join(_elided(columns, column_count, "columns"))]
+        header += [f"Note: {note}" for note in notes]
+        if stats and stats_count:
+            header.append("Numeric stats (full result):")
+            header += [f"  {line}" for line in _elided(stats, stats_count, "numeric columns")]
+        if not rows:
+            return "\n".join(header)
+        shown = reduced[reduced.columns[:column_count]]
+        if rows < len(shown):
+            sample = shown.iloc[np.linspace(0, len(shown) - 1, rows).astype(int)]
+            label = f"Sample ({rows} of {len(shown)} chart rows, CSV):"
+        else:
+            sample, label = shown, f"Data ({len(shown)} chart rows, CSV):"
+        return "\n".join(header + [label, sample.to_csv(index=False, float_format="%.6g").strip()])
+
+    column_count, stats_count, rows = len(columns), len(stats), min(max_rows, len(reduced))
+    while True:
+        summary = render(column_count, stats_count, rows)
+        if count_tokens(summary, model) <= token_budget:
+            return summary
+        if rows > 5:
+            rows //= 2
+        elif stats_count:
+            stats_count //= 2
+        elif column_count > 1:
+            column_count //= 2
+        elif rows:
+            rows = 0
+        else:
+            return _truncate_to_budget(summary, token_budget, model)
+
+
+def bind_column_refs(node: Any, df: pd.DataFrame) -> Any:
+    """Replace "$col:<name>" strings in a chart config with the column values of `df`."""
+    if isinstance(node, dict):
+        return {key: bind_column_refs(value, df) for key, value in node.items()}
+    if isinstance(node, list):
+        return [bind_column_refs(value, df) for value in node]
+    if isinstance(node, str):
+        match = COLUMN_REF.match(node)
+        if match and match.group(1) in df.columns:
+            series = df[match.group(1)]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return series.dt.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+            return series.astype(object).where(series.notna(), None).tolist()
+    return node
+
+
+def reduce_result(
+    df: pd.DataFrame, top_k: int, max_points: int, token_budget: int, prompt_rows: int, model: str = "gpt-4o"
+) -> Dict[str, Any]:
+    reduced, notes = reduce_for_chart(df, top_k, max_points)
+    return {
+        "chart_frame": reduced,
+        "query_summary": summarize_for_prompt(df, reduced, notes, token_budget, prompt_rows, model),
+    }
@@ -0,0 +1,49 @@
+from typing import Iterable, List, Tuple
+
+from loguru import logger
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+# (table, column) pairs the __search and __prefix filters are meant for. Keep in sync with the add_search_indexes
+# migration; tables the app creates at startup (visualization) get their indexes from Database.create_database.
+SEARCH_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("dataset", "filename"),
+    ("visualization", "prompt"),
+    ("post", "title"),
+    ("tag", "name"),
+)
+
+
+def search_index_statements(table: str, column: str, trigram: bool) -> List[str]:
+    """PostgreSQL indexes on lower(column): a text_pattern_ops btree for `__prefix` (LIKE 'value%') and, when the
+    pg_trgm extension is available, a trigram GIN index for `__search` (LIKE '%value%')."""
+    statements = [
+        f'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_prefix ON "{table}" (lower("{column}") text_pattern_ops)'
+    ]
+    if trigram:
+        statements.append(
+            f'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm ON "{table}" USING gin (lower("{column}") gin_trgm_ops)'
+        )
+    return statements
+
+
+def enable_trigram(connection: Connection) -> bool:
+    """Install pg_trgm if the server ships it; False when it does not (contrib not installed)."""
+    available = connection.exec_driver_sql("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'").scalar()
+    if not available:
+        logger.warning("pg_trgm is not available on this server: __search filters will scan instead of using an index")
+        return False
+    connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    return True
+
+
+def create_search_indexes(connection: Connection, columns: Iterable[Tuple[str, str]] = SEARCH_COLUMNS):
+    """Create the search indexes of the tables that exist; a no-op on databases other than PostgreSQL."""
+    if connection.dialect.name != "postgresql":
+        return
+    trigram = enable_trigram(connection)
+    tables = set(inspect(connection).get_table_names())
+    for table, column in columns:
+        if table in tables:
+            for statement in search_index_statements(table, column, trigram):
+                connection.exec_driver_sql(statement)
@@ -0,0 +1,15 @@
+import json
+from typing import Any, AsyncIterator, Tuple
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def sse_stream(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception as e:
+        yield format_sse("error", {"detail": str(e)})
@@ -0,0 +1,36 @@
+"""Per-request setup cost of AgentService: a fresh LLM client + graph compile vs. the shared singletons.
+
+    python -m benchmarks.agent_setup [iterations]
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_openai import ChatOpenAI  # noqa: E402
+
+from app.core.config import configs  # noqa: E402
+from app.core.llm import create_chat_model  # noqa: E402
+from app.services.agent_service import AgentService, build_agent_workflow  # noqa: E402
+
+
+def per_request_setup():
+    """What every request paid before: a new ChatOpenAI (own connection pool) and a recompiled graph."""
+    llm = ChatOpenAI(base_url=configs.AGENT_LLM_BASE_URL, model=configs.AGENT_MODEL, temperature=0)
+    return AgentService(repository=None, llm=llm, workflow=build_agent_workflow())
+
+
+def main(iterations: int = 200):
+    llm, workflow = create_chat_model(), build_agent_workflow()
+
+    def shared_setup():
+        return AgentService(repository=None, llm=llm, workflow=workflow)
+
+    for label, func in (("per-request client + compile", per_request_setup), ("shared singletons", shared_setup)):
+        seconds = min(timeit.repeat(func, number=iterations, repeat=3)) / iterations
+        print(f"{label:<30} {seconds * 1000:8.3f} ms / request")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,88 @@
+"""Inserting N rows one repository.create call at a time vs. one BaseRepository.bulk_create call.
+
+    python -m benchmarks.bulk_create [--url postgresql+psycopg://...] [--rows 10000]
+
+Defaults to the configured DATABASE_URI. Uses a throwaway bench_bulk table, which the benchmark creates and drops.
+"""
+import argparse
+import time
+from contextlib import contextmanager
+
+from pydantic import BaseModel as Schema
+from sqlalchemy import create_engine, func, orm, select
+from sqlmodel import Field, SQLModel
+
+from app.core.config import configs
+from app.model.base_model import BaseModel
+from app.repository.base_repository import BaseRepository
+
+
+class BenchBulkRow(BaseModel, table=True):
+    __tablename__ = "bench_bulk"
+
+    name: str = Field(unique=True)
+    value: int = Field()
+
+
+class UpsertBenchBulkRow(Schema):
+    name: str
+    value: int
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=configs.DATABASE_URI)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory():
+        with sessionmaker() as session:
+            yield session
+
+    repository = BaseRepository(session_factory, BenchBulkRow)
+
+    def reset():
+        BenchBulkRow.__table__.drop(engine, checkfirst=True)
+        SQLModel.metadata.create_all(engine, tables=[BenchBulkRow.__table__])
+
+    def rows(prefix):
+        return [UpsertBenchBulkRow(name=f"{prefix} {i}", value=i) for i in range(args.rows)]
+
+    try:
+        print(f"{args.rows} rows, {engine.dialect.name}")
+        reset()
+        schemas = rows("single")
+        started = time.perf_counter()
+        for schema in schemas:
+            repository.create(schema)
+        single_s = time.perf_counter() - started
+        print(f"repository.create per row  {single_s:8.2f} s  {args.rows / single_s:10.0f} rows/s")
+
+        reset()
+        schemas = rows("bulk")
+        started = time.perf_counter()
+        result = repository.bulk_create(schemas)
+        bulk_s = time.perf_counter() - started
+        print(f"repository.bulk_create     {bulk_s:8.2f} s  {args.rows / bulk_s:10.0f} rows/s  ({single_s / bulk_s:.0f}x)")
+        assert len(result["founds"]) == args.rows and not result["errors"]
+
+        # one duplicate in the batch: the other rows are still written and the duplicate is reported by index
+        reset()
+        schemas = rows("dup")
+        schemas[args.rows // 2] = schemas[0]
+        started = time.perf_counter()
+        result = repository.bulk_create(schemas)
+        dup_s = time.perf_counter() - started
+        with session_factory() as session:
+            written = session.scalar(select(func.count()).select_from(BenchBulkRow))
+        print(f"bulk_create, 1 duplicate   {dup_s:8.2f} s  {written} written, errors at {[e['index'] for e in result['errors']]}")
+    finally:
+        BenchBulkRow.__table__.drop(engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    main()
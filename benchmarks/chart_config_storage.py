@@ -0,0 +1,147 @@
+"""Storage size and list/detail latency of chart_config: JSON (before), JSONB, and JSONB with zstd-compressed data.
+
+    python -m benchmarks.chart_config_storage [--url postgresql+psycopg://...] [--rows 100000] [--points 200]
+
+Defaults to the configured DATABASE_URI. Fills one throwaway table per storage with the same generated Plotly
+configs, trains the zstd dictionary on the first --train of them, and reads through BaseRepository: a summary
+listing page (chart_config not selected), a full listing page and single-row detail reads.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+from sqlalchemy import JSON, Column, create_engine, insert, orm, text
+from sqlmodel import Field, SQLModel
+
+from app.core.config import configs
+from app.model.base_model import BaseModel
+from app.repository.base_repository import BaseRepository
+from app.schema.base_schema import FindBase
+from app.util.chart_storage import ChartConfigCodec, ChartConfigJSON, train_dictionary
+
+plain_codec = ChartConfigCodec("json")
+zstd_codec = ChartConfigCodec("zstd")
+
+
+class BenchChartJSON(BaseModel, table=True):
+    __tablename__ = "bench_chart_json"
+    summary_excludes: ClassVar[Tuple[str, ...]] = ("chart_config",)
+
+    prompt: str = Field()
+    chart_config: Dict[str, Any] = Field(sa_column=Column(JSON), default={})
+
+
+class BenchChartJSONB(BaseModel, table=True):
+    __tablename__ = "bench_chart_jsonb"
+    summary_excludes: ClassVar[Tuple[str, ...]] = ("chart_config",)
+
+    prompt: str = Field()
+    chart_config: Dict[str, Any] = Field(sa_column=Column(ChartConfigJSON(plain_codec)), default={})
+
+
+class BenchChartZstd(BaseModel, table=True):
+    __tablename__ = "bench_chart_zstd"
+    summary_excludes: ClassVar[Tuple[str, ...]] = ("chart_config",)
+
+    prompt: str = Field()
+    chart_config: Dict[str, Any] = Field(sa_column=Column(ChartConfigJSON(zstd_codec)), default={})
+
+
+STORAGES = (("json", BenchChartJSON), ("jsonb", BenchChartJSONB), ("jsonb+zstd", BenchChartZstd))
+CATEGORIES = [f"{region} {product}" for region in ("North", "South", "East", "West") for product in "ABCDEFGH"]
+
+
+def chart_config(rng: random.Random, points: int) -> dict:
+    """A bar/line config like the agent produces: category labels and 2-decimal values for one or two traces."""
+    kind = rng.choice(("bar", "scatter"))
+    x = [CATEGORIES[j % len(CATEGORIES)] + f" {2000 + j // len(CATEGORIES)}" for j in range(points)]
+    traces = [
+        {"type": kind, "name": name, "x": x, "y": [round(rng.uniform(0, 10_000), 2) for _ in range(points)]}
+        for name in ("revenue", "cost")[: rng.randint(1, 2)]
+    ]
+    return {"data": traces, "layout": {"title": {"text": f"Chart {rng.randint(0, 10**6)}"}, "xaxis": {"title": "period"}}}
+
+
+def fill(engine, model, rows: int, points: int, batch: int = 1000):
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch):
+            values = [
+                {"prompt": f"prompt {start + i}", "chart_config": chart_config(rng, points)}
+                for i in range(min(batch, rows - start))
+            ]
+            connection.execute(insert(model), values)
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"ANALYZE {model.__tablename__}"))
+
+
+def table_bytes(engine, model) -> Optional[int]:
+    if engine.dialect.name != "postgresql":
+        return None
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT pg_total_relation_size('{model.__tablename__}')")).scalar()
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=configs.DATABASE_URI)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--train", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    tables = [model.__table__ for _, model in STORAGES]
+    SQLModel.metadata.drop_all(engine, tables=tables)
+    SQLModel.metadata.create_all(engine, tables=tables)
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory():
+        with sessionmaker() as session:
+            yield session
+
+    with tempfile.TemporaryDirectory() as dict_dir:
+        zstd_codec.configure("zstd", dict_dir, configs.CHART_CONFIG_COMPRESS_MIN_BYTES, configs.CHART_CONFIG_ZSTD_LEVEL)
+        rng = random.Random(42)
+        zstd_codec.save_dictionary(
+            train_dictionary([chart_config(rng, args.points)["data"] for _ in range(args.train)], 110 * 1024)
+        )
+        try:
+            print(f"{args.rows} visualizations, {args.points} points per trace, {engine.dialect.name}, median of {args.repeat}")
+            ids = random.Random(7).sample(range(1, args.rows + 1), args.repeat)
+            for name, model in STORAGES:
+                started = time.perf_counter()
+                fill(engine, model, args.rows, args.points)
+                fill_s = time.perf_counter() - started
+                repository = BaseRepository(session_factory, model)
+                size = table_bytes(engine, model)
+                summary_ms = timed(lambda: repository.read_by_options(FindBase(summary=True, page_size=args.page_size, count="none")), args.repeat)
+                full_ms = timed(lambda: repository.read_by_options(FindBase(page_size=args.page_size, count="none")), args.repeat)
+                detail = iter(ids)
+                detail_ms = timed(lambda: repository.read_by_id(next(detail)), args.repeat)
+                print(
+                    f"{name:<11} size {size / 2**20 if size else 0:8.1f} MiB   fill {fill_s:6.1f} s   "
+                    f"summary page {summary_ms:6.2f} ms   full page {full_ms:7.2f} ms   detail {detail_ms:6.2f} ms"
+                )
+        finally:
+            SQLModel.metadata.drop_all(engine, tables=tables)
+
+
+if __name__ == "__main__":
+    main()
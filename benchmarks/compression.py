@@ -0,0 +1,78 @@
+"""CPU cost against bytes saved of each response encoding and level, on the payloads of one dashboard load.
+
+    python -m benchmarks.compression [--charts 12] [--points 200] [--repeat 5]
+
+A dashboard load is what gradio_final.py fetches: the dataset dropdown, the visualization summaries, the chart
+configs of the charts it renders, and a dataset preview. Payloads are generated like benchmarks.chart_config_storage
+and serialized with orjson, as the API sends them; no database is needed.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+import orjson
+
+from app.util.compression import available_encodings, compress
+from benchmarks.chart_config_storage import chart_config
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 9, 11), "zstd": (1, 3, 6, 12, 19)}
+
+
+def dashboard_payloads(charts: int, points: int, summaries: int) -> dict:
+    rng = random.Random(42)
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc).isoformat()
+    row = lambda i: {"id": i, "created_at": now, "updated_at": now, "dataset_id": 1 + i % 7}
+    summaries_body = [{**row(i), "prompt": f"Show monthly revenue by region for product line {i}"} for i in range(summaries)]
+    details = [
+        {"id": i, "chart_config": chart_config(rng, points), "explanation": "Revenue rises in the North and East."}
+        for i in range(charts)
+    ]
+    preview = [
+        {"order_id": 100000 + i, "region": rng.choice(("North", "South", "East", "West")), "amount": round(rng.uniform(5, 900), 2),
+         "quantity": rng.randint(1, 40), "ordered_at": now}
+        for i in range(20)
+    ]
+    datasets = {"founds": [{"id": i, "filename": f"sales_{2000 + i}.csv"} for i in range(30)], "search_options": {}}
+    return {
+        "datasets": orjson.dumps(datasets),
+        "summaries": orjson.dumps(summaries_body),
+        "chart configs": orjson.dumps(details),
+        "preview": orjson.dumps(preview),
+    }
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--charts", type=int, default=12)
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--summaries", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = dashboard_payloads(args.charts, args.points, args.summaries)
+    identity = sum(len(body) for body in payloads.values())
+    print(", ".join(f"{name} {len(body) / 1024:.1f} KiB" for name, body in payloads.items()))
+    print(f"identity: {identity / 1024:8.1f} KiB per dashboard load")
+    for encoding in available_encodings(list(LEVELS)):
+        for level in LEVELS[encoding]:
+            wire = sum(len(compress(encoding, body, level)) for body in payloads.values())
+            cpu_ms = sum(timed(lambda: compress(encoding, body, level), args.repeat) for body in payloads.values())
+            print(
+                f"{encoding:<4} level {level:>2}: {wire / 1024:8.1f} KiB ({wire / identity:6.1%})   "
+                f"{cpu_ms:7.2f} ms CPU   {(identity - wire) / 1024 / max(cpu_ms, 1e-6):8.1f} KiB saved per ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Rows/sec of dataset ingestion: DataFrame.to_sql (previous path) vs. COPY / batched executemany.
+
+    python -m benchmarks.ingestion [--url postgresql+psycopg://...] [--rows 10000 100000 1000000]
+
+Defaults to the configured DATABASE_URI. The benchmark creates and drops its own tables.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.core.config import configs
+from app.util.ingestion import ingest_dataframe, quote_identifier
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "category": rng.choice(["north", "south", "east", "west", "central"], rows),
+            "amount": rng.normal(100, 25, rows).round(2),
+            "quantity": rng.integers(1, 50, rows),
+            "shipped": rng.random(rows) > 0.3,
+            "ordered_at": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365 * 24, rows), unit="h"),
+            "note": np.where(rng.random(rows) > 0.9, None, "standard order"),
+        }
+    )
+
+
+def to_sql_path(engine, df, table_name):
+    with engine.begin() as connection:
+        df.to_sql(table_name, con=connection, if_exists="fail", index=False)
+
+
+def ingestion_path(engine, df, table_name):
+    with engine.begin() as connection:
+        ingest_dataframe(connection, df, table_name)
+
+
+def drop(engine, table_name):
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {quote_identifier(table_name, engine.dialect.name)}"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=configs.DATABASE_URI)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    print(f"{engine.dialect.name}+{engine.dialect.driver}")
+    print(f"{'rows':>10} {'path':<12} {'seconds':>9} {'rows/sec':>12}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        for label, load in (("to_sql", to_sql_path), ("ingestion", ingestion_path)):
+            table_name = f"bench_ingest_{label}_{rows}"
+            drop(engine, table_name)
+            started = time.perf_counter()
+            load(engine, df, table_name)
+            seconds = time.perf_counter() - started
+            drop(engine, table_name)
+            print(f"{rows:>10} {label:<12} {seconds:>9.2f} {rows / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
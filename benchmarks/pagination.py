@@ -0,0 +1,107 @@
+"""Latency of deep list pages: LIMIT/OFFSET vs. keyset cursors, and of each total_count mode.
+
+    python -m benchmarks.pagination [--url postgresql+psycopg://...] [--rows 1000000] [--page 1000]
+
+Defaults to the configured DATABASE_URI. Goes through BaseRepository.read_by_options on a throwaway
+bench_pagination table, which the benchmark creates and drops.
+"""
+import argparse
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import Index, create_engine, orm, text
+from sqlmodel import Field, SQLModel
+
+from app.core.config import configs
+from app.model.base_model import BaseModel
+from app.repository.base_repository import BaseRepository
+from app.schema.base_schema import FindBase
+from app.util.pagination import count_cache
+
+
+class BenchRow(BaseModel, table=True):
+    __tablename__ = "bench_pagination"
+    __table_args__ = (Index("ix_bench_pagination_created_at_id", "created_at", "id"),)
+
+    category: str = Field(index=True)
+    name: str = Field()
+
+
+class FindBenchRow(FindBase):
+    category: Optional[str] = None
+
+
+FILL = {
+    "postgresql": """
+        INSERT INTO bench_pagination (category, name, created_at, updated_at)
+        SELECT 'c' || (i % 50), 'row ' || i, now() - i * interval '1 second', now()
+        FROM generate_series(1, :rows) AS i
+    """,
+    "sqlite": """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :rows)
+        INSERT INTO bench_pagination (category, name, created_at, updated_at)
+        SELECT 'c' || (i % 50), 'row ' || i, datetime('now', '-' || i || ' seconds'), datetime('now') FROM seq
+    """,
+}
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=configs.DATABASE_URI)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    BenchRow.__table__.drop(engine, checkfirst=True)
+    SQLModel.metadata.create_all(engine, tables=[BenchRow.__table__])
+    with engine.begin() as connection:
+        connection.execute(text(FILL[engine.dialect.name]), {"rows": args.rows})
+        if engine.dialect.name == "postgresql":
+            connection.execute(text("ANALYZE bench_pagination"))
+
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory():
+        with sessionmaker() as session:
+            yield session
+
+    repository = BaseRepository(session_factory, BenchRow)
+
+    def read(**options):
+        return repository.read_by_options(FindBenchRow(page_size=args.page_size, **options))
+
+    try:
+        print(f"{args.rows} rows, {engine.dialect.name}, page {args.page} of {args.page_size}, median of {args.repeat}")
+        for ordering in ("-id", "-created_at"):
+            # the cursor a client holds after walking to the page before the measured one
+            cursor = read(ordering=ordering, page=args.page - 1, count="none")["search_options"]["next_cursor"]
+            offset_ms = timed(lambda: read(ordering=ordering, page=args.page, count="none"), args.repeat)
+            keyset_ms = timed(lambda: read(ordering=ordering, cursor=cursor, count="none"), args.repeat)
+            print(f"ordering {ordering:<12} offset {offset_ms:8.1f} ms   cursor {keyset_ms:8.1f} ms")
+
+        print("page 1 filtered on category, by total_count mode:")
+        for mode in ("exact", "estimate", "cached", "none"):
+            count_cache.clear()
+            ms = timed(lambda: read(category="c7", count=mode), args.repeat)
+            print(f"count={mode:<9} {ms:8.1f} ms   total_count={read(category='c7', count=mode)['search_options']['total_count']}")
+    finally:
+        BenchRow.__table__.drop(engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    main()
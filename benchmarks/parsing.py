@@ -0,0 +1,62 @@
+"""CSV parse throughput: one read_csv vs. byte ranges parsed on a process pool.
+
+    python -m benchmarks.parsing [--rows 2000000] [--workers 1 2 4 8] [--range-mb 32]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.util.ingestion import FileChunkReader
+from app.util.parallel_parsing import get_parse_pool
+
+
+def write_csv(path: str, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "category": rng.choice(["north", "south", "east", "west", "central"], rows),
+            "amount": rng.normal(100, 25, rows).round(2),
+            "quantity": rng.integers(1, 50, rows),
+            "comment": np.where(rng.random(rows) > 0.95, 'said "hi",\nthen left', "standard order"),
+        }
+    ).to_csv(path, index=False)
+
+
+def parse(path: str, workers: int, range_bytes: int) -> int:
+    reader = FileChunkReader(
+        path, "bench.csv", chunk_rows=100_000, parse_workers=workers, range_bytes=range_bytes, parallel_min_bytes=0
+    )
+    return sum(len(df) for df in reader)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--range-mb", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.csv")
+        write_csv(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{args.rows:,} rows, {size_mb:.0f} MB, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'MB/s':>8} {'rows/s':>12}")
+        for workers in args.workers:
+            if workers > 1:
+                # start the pool processes outside the timed run
+                get_parse_pool(workers).submit(int).result()
+            started = time.perf_counter()
+            rows = parse(path, workers, args.range_mb * 1024 * 1024)
+            seconds = time.perf_counter() - started
+            assert rows == args.rows
+            print(f"{workers:>8} {seconds:>9.2f} {size_mb / seconds:>8.1f} {rows / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
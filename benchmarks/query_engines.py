@@ -0,0 +1,85 @@
+"""Latency of typical agent analytics queries on the dataset's SQL table vs. DuckDB over its Parquet files.
+
+    python -m benchmarks.query_engines [--url postgresql+psycopg://...] [--rows 1000000] [--repeat 5]
+
+Defaults to the configured DATABASE_URI. The benchmark creates and drops its own table and Parquet directory.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import configs
+from app.util.columnar import ColumnarResult
+from app.util.duckdb_engine import ParquetDatasetWriter, execute_duckdb
+from app.util.ingestion import frame_chunks, ingest_dataframe, quote_identifier
+from benchmarks.ingestion import drop, make_frame
+
+TABLE_NAME = "bench_query_engines"
+
+QUERIES = {
+    "group by": f"SELECT category, SUM(amount) AS total, AVG(quantity) AS avg_quantity "
+    f"FROM {TABLE_NAME} GROUP BY category ORDER BY total DESC",
+    "filtered count": f"SELECT COUNT(*) AS orders FROM {TABLE_NAME} WHERE shipped AND amount > 120",
+    "top n": f"SELECT id, amount FROM {TABLE_NAME} ORDER BY amount DESC LIMIT 20",
+    "distinct": f"SELECT COUNT(DISTINCT quantity) AS quantities FROM {TABLE_NAME}",
+}
+
+
+def run_sql(engine, sql):
+    with engine.connect() as connection:
+        return ColumnarResult.from_result(
+            connection.execute(text(sql)), configs.AGENT_SQL_MAX_ROWS, configs.AGENT_SQL_BATCH_SIZE
+        )
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=configs.DATABASE_URI)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    df = make_frame(args.rows)
+    drop(engine, TABLE_NAME)
+    with engine.begin() as connection:
+        ingest_dataframe(connection, df, TABLE_NAME)
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"ANALYZE {quote_identifier(TABLE_NAME, 'postgresql')}"))
+
+    with tempfile.TemporaryDirectory() as root:
+        writer = ParquetDatasetWriter(root, TABLE_NAME)
+        for chunk in frame_chunks(df, configs.UPLOAD_CHUNK_ROWS):
+            writer.write(chunk)
+        writer.close()
+
+        print(f"{args.rows} rows, {engine.dialect.name}+{engine.dialect.driver} vs duckdb, median of {args.repeat}")
+        print(f"{'query':<16} {'sql ms':>10} {'duckdb ms':>10} {'speedup':>8}")
+        try:
+            for label, sql in QUERIES.items():
+                sql_seconds = timed(lambda: run_sql(engine, sql), args.repeat)
+                duckdb_seconds = timed(
+                    lambda: execute_duckdb(root, TABLE_NAME, sql, configs.AGENT_SQL_MAX_ROWS), args.repeat
+                )
+                print(
+                    f"{label:<16} {sql_seconds * 1000:>10.1f} {duckdb_seconds * 1000:>10.1f} "
+                    f"{sql_seconds / duckdb_seconds:>7.1f}x"
+                )
+        finally:
+            drop(engine, TABLE_NAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Filtered listing latency at 1M rows: the legacy `column=value` LIKE filter vs. `__prefix` and `__search`,
+before and after the search indexes of app.util.search are built.
+
+    python -m benchmarks.search [--url postgresql+psycopg://...] [--rows 1000000]
+
+Defaults to the configured DATABASE_URI. Goes through BaseRepository.read_by_options on a throwaway bench_search
+table, which the benchmark creates and drops. On servers without pg_trgm only the __prefix index is built.
+"""
+import argparse
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import create_engine, orm, text
+from sqlmodel import Field, SQLModel
+
+from app.core.config import configs
+from app.model.base_model import BaseModel
+from app.repository.base_repository import BaseRepository
+from app.schema.base_schema import FindBase
+from app.util.search import create_search_indexes
+
+
+class BenchSearchRow(BaseModel, table=True):
+    __tablename__ = "bench_search"
+
+    filename: str = Field()
+
+
+class FindBenchSearchRow(FindBase):
+    filename: Optional[str] = None
+    filename__search: Optional[str] = None
+    filename__prefix: Optional[str] = None
+
+
+# filenames like "Sales_Report_2023_000123.csv"; the i-th row's number makes single-row needles
+FILL = {
+    "postgresql": """
+        INSERT INTO bench_search (filename, created_at, updated_at)
+        SELECT (ARRAY['Sales', 'Churn', 'Inventory', 'Payroll', 'Traffic'])[1 + i % 5]
+               || '_Report_' || (2000 + i % 25) || '_' || lpad(i::text, 7, '0') || '.csv', now(), now()
+        FROM generate_series(1, :rows) AS i
+    """,
+    "sqlite": """
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :rows)
+        INSERT INTO bench_search (filename, created_at, updated_at)
+        SELECT CASE i % 5 WHEN 0 THEN 'Sales' WHEN 1 THEN 'Churn' WHEN 2 THEN 'Inventory' WHEN 3 THEN 'Payroll'
+               ELSE 'Traffic' END || '_Report_' || (2000 + i % 25) || '_' || substr('0000000' || i, -7) || '.csv',
+               datetime('now'), datetime('now')
+        FROM seq
+    """,
+}
+
+QUERIES = (
+    ("filename=0654321 (LIKE)", {"filename": "0654321"}),
+    ("filename__search=0654321", {"filename__search": "0654321"}),
+    ("filename__search=report_2013", {"filename__search": "report_2013"}),
+    ("filename__prefix=payroll_report_2003", {"filename__prefix": "payroll_report_2003"}),
+    ("filename__prefix=sales_report_2000_09990", {"filename__prefix": "sales_report_2000_09990"}),
+)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=configs.DATABASE_URI)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    BenchSearchRow.__table__.drop(engine, checkfirst=True)
+    SQLModel.metadata.create_all(engine, tables=[BenchSearchRow.__table__])
+    with engine.begin() as connection:
+        connection.execute(text(FILL[engine.dialect.name]), {"rows": args.rows})
+
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory():
+        with sessionmaker() as session:
+            yield session
+
+    repository = BaseRepository(session_factory, BenchSearchRow)
+
+    def run(label):
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as connection:
+                connection.execute(text("ANALYZE bench_search"))
+        print(label)
+        for name, filters in QUERIES:
+            find = FindBenchSearchRow(page_size=args.page_size, count="none", **filters)
+            found = len(repository.read_by_options(find)["founds"])
+            ms = timed(lambda: repository.read_by_options(find), args.repeat)
+            print(f"  {name:<42} {ms:9.1f} ms   {found} rows")
+
+    try:
+        print(f"{args.rows} rows, {engine.dialect.name}, first page of {args.page_size}, median of {args.repeat}")
+        run("no search indexes")
+        with engine.begin() as connection:
+            create_search_indexes(connection, [("bench_search", "filename")])
+        run("with search indexes")
+    finally:
+        BenchSearchRow.__table__.drop(engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    main()
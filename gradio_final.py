@@ -1,12 +1,14 @@
 import gradio as gr
 import requests
 import json
+import time
 import plotly.graph_objects as go
 import pandas as pd
 from typing import List, Dict, Any
 
 # --- CONFIGURATION ---
 API_BASE_URL = "http://localhost:8000/api/v1"
+DASHBOARD_PAGE_SIZE = 12 # charts per dashboard page; only the page shown fetches its chart configs
 THEME_COLOR = "#22c55e" # Green accent
 
 # --- CSS STYLING ---
@@ -43,12 +45,27 @@ h1, h2, h3 { color: white; margin-bottom: 0.5rem; }
 """
 
 # --- API HELPER FUNCTIONS ---
+# one keep-alive connection pool; GETs below revalidate their last response with If-None-Match
+http = requests.Session()
+_etag_cache: Dict[tuple, tuple] = {}
+
+def get_json(url: str, params: Dict[str, Any] = None):
+    """GET a JSON body, reusing the cached copy when the API answers 304 Not Modified."""
+    key = (url, tuple(sorted((params or {}).items())))
+    cached = _etag_cache.get(key)
+    resp = http.get(url, params=params, headers={"If-None-Match": cached[0]} if cached else {})
+    if resp.status_code == 304 and cached:
+        return cached[1]
+    resp.raise_for_status()
+    data = resp.json()
+    if resp.headers.get("ETag"):
+        _etag_cache[key] = (resp.headers["ETag"], data)
+    return data
+
 def get_datasets() -> List[tuple]:
     """Fetch datasets formatted for Dropdown (label, value)."""
     try:
-        resp = requests.get(f"{API_BASE_URL}/datasets/?page_size=100")
-        resp.raise_for_status()
-        data = resp.json().get("founds", [])
+        data = get_json(f"{API_BASE_URL}/datasets/", {"page_size": 100, "fields": "filename"}).get("founds", [])
         return [(f"{d['id']}: {d['filename']}", d['id']) for d in data]
     except Exception as e:
         print(f"Error fetching datasets: {e}")
@@ -57,22 +74,70 @@ def get_datasets() -> List[tuple]:
 def get_visualizations(dataset_id: int):
     """Fetch list of visualizations for a dataset."""
     try:
-        resp = requests.get(f"{API_BASE_URL}/visualizations/dataset/{dataset_id}")
-        if resp.status_code == 200:
-            return resp.json()
-        return []
+        return get_json(f"{API_BASE_URL}/visualizations/dataset/{dataset_id}")
     except:
         return []
 
 def get_all_visualizations():
-    """Fetch all visualizations for dashboard."""
+    """Fetch visualization summaries (no chart configs) for the dashboard."""
     try:
-        resp = requests.get(f"{API_BASE_URL}/visualizations/")
-        resp.raise_for_status()
-        return resp.json()
+        return get_json(f"{API_BASE_URL}/visualizations/", {"summary": True})
     except:
         return []
 
+def with_chart_configs(viz_list):
+    """Fetch chart configs for the given summaries in one request and merge them in."""
+    if not viz_list:
+        return []
+    try:
+        data = get_json(
+            f"{API_BASE_URL}/visualizations/",
+            {"ids": ",".join(str(viz["id"]) for viz in viz_list), "fields": "chart_config,explanation"},
+        )
+        details = {viz["id"]: viz for viz in data}
+    except Exception as e:
+        print(f"Error fetching chart configs: {e}")
+        details = {}
+    return [{**viz, **details.get(viz["id"], {})} for viz in viz_list]
+
+def dashboard_page(page: int, page_size: int = DASHBOARD_PAGE_SIZE) -> Dict[str, Any]:
+    """One page of the dashboard, newest first, with the chart configs of its charts only."""
+    summaries = sorted(get_all_visualizations(), key=lambda viz: viz["id"], reverse=True)
+    pages = max(1, -(-len(summaries) // page_size))
+    page = min(max(page, 0), pages - 1)
+    start = page * page_size
+    return {
+        "charts": with_chart_configs(summaries[start:start + page_size]),
+        "page": page,
+        "pages": pages,
+        "start": start,
+        "total": len(summaries),
+    }
+
+def iter_sse(resp):
+    """Yield (event, data) pairs from a text/event-stream response."""
+    event, data_lines = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+def rows_to_markdown(rows: List[Dict[str, Any]], limit: int = 5) -> str:
+    if not rows:
+        return "_No rows returned._"
+    headers = list(rows[0].keys())
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for row in rows[:limit]:
+        lines.append("| " + " | ".join(str(row.get(h, "")) for h in headers) + " |")
+    return "\n".join(lines)
+
 def parse_viz_config(viz_data):
     """Convert JSON config to Plotly Figure."""
     if not viz_data or not viz_data.get("chart_config"):
@@ -99,17 +164,43 @@ def parse_viz_config(viz_data):
 # --- UI LOGIC ---
 
 # TAB 1: UPLOAD
-def handle_upload(file_obj):
+UPLOAD_POLL_SECONDS = 1.0
+
+def format_job_progress(job):
+    parts = [f"⏳ Ingesting... {job['progress']:.0%}", f"{job['rows_ingested']:,} rows"]
+    if job.get("rows_per_second"):
+        parts.append(f"{job['rows_per_second']:,.0f} rows/s")
+    if job.get("eta_seconds") is not None:
+        parts.append(f"ETA {job['eta_seconds']:.0f}s")
+    return " · ".join(parts) if job["status"] == "running" else "⏳ Queued..."
+
+def handle_upload(file_obj, split_sheets=False):
     if not file_obj:
-        return "⚠️ No file selected.", gr.update(choices=get_datasets())
+        yield "⚠️ No file selected.", gr.update(choices=get_datasets())
+        return
     try:
         filename = file_obj.name.split('\\')[-1].split('/')[-1]
-        files = {'file': (filename, open(file_obj.name, 'rb'), 'application/octet-stream')}
-        resp = requests.post(f"{API_BASE_URL}/datasets/upload", files=files)
+        with open(file_obj.name, 'rb') as f:
+            files = {'file': (filename, f, 'application/octet-stream')}
+            resp = requests.post(
+                f"{API_BASE_URL}/datasets/upload", files=files, params={"split_sheets": bool(split_sheets)}
+            )
         resp.raise_for_status()
-        return "✅ Upload Successful!", gr.update(choices=get_datasets())
+        # ingestion runs as a background job, poll it until it finishes
+        job = resp.json()
+        while job["status"] in ("queued", "running"):
+            yield format_job_progress(job), gr.update()
+            time.sleep(UPLOAD_POLL_SECONDS)
+            resp = requests.get(f"{API_BASE_URL}/datasets/jobs/{job['id']}")
+            resp.raise_for_status()
+            job = resp.json()
+        if job["status"] == "failed":
+            yield f"❌ Error: {job['error']}", gr.update(choices=get_datasets())
+            return
+        datasets = f" into {len(job['dataset_ids'])} datasets" if len(job["dataset_ids"]) > 1 else ""
+        yield f"✅ Upload Successful! {job['rows_ingested']:,} rows ingested{datasets}.", gr.update(choices=get_datasets())
     except Exception as e:
-        return f"❌ Error: {e}", gr.update(choices=get_datasets())
+        yield f"❌ Error: {e}", gr.update(choices=get_datasets())
 
 # TAB 2: VISUALIZE
 def load_dataset_visualizations(dataset_id):
@@ -132,10 +223,36 @@ def generate_visualization(dataset_id, prompt, current_history):
     
     try:
         payload = {"dataset_id": dataset_id, "prompt": prompt}
-        # 1. Analyze via Agent
-        resp = requests.post(f"{API_BASE_URL}/agent/analyze", json=payload)
-        resp.raise_for_status()
-        data = resp.json()
+        # 1. Analyze via Agent (streamed, the status panel updates as each step finishes)
+        sections = {"status": "⏳ Generating SQL..."}
+        yield current_history, prompt, sections["status"]
+
+        data = None
+        with requests.post(f"{API_BASE_URL}/agent/analyze/stream", json=payload, stream=True) as resp:
+            resp.raise_for_status()
+            for event, event_data in iter_sse(resp):
+                if event == "sql":
+                    sections["status"] = "⏳ Running query..."
+                    sections["sql"] = f"**SQL:**\n```sql\n{event_data.get('sql_query', '')}\n```"
+                elif event == "rows":
+                    sections["status"] = "⏳ Building chart..."
+                    if event_data.get("error"):
+                        sections["rows"] = f"❌ {event_data['error']}"
+                    else:
+                        sections["rows"] = f"**Rows ({event_data.get('row_count', 0)}):**\n" + rows_to_markdown(event_data.get("rows", []))
+                elif event == "token":
+                    sections["insight"] = sections.get("insight", "**Insight:**\n") + event_data.get("text", "")
+                elif event == "chart":
+                    sections["status"] = "⏳ Saving..."
+                    sections["insight"] = f"**Insight:**\n{event_data.get('explanation', '')}"
+                elif event == "error":
+                    raise RuntimeError(event_data.get("detail"))
+                elif event == "done":
+                    data = event_data
+                yield current_history, prompt, "\n\n".join(v for v in sections.values())
+
+        if data is None:
+            raise RuntimeError("Stream ended before the agent finished")
         
         # 2. Extract Data
         chart_config = data.get("chart_config", {})
@@ -162,17 +279,17 @@ def generate_visualization(dataset_id, prompt, current_history):
         
         # 4. Append to History
         updated_history = current_history + [new_viz]
-        return updated_history, "" # Return updated history and clear prompt
+        yield updated_history, "", "" # Return updated history, clear prompt and status
         
     except Exception as e:
         raise gr.Error(f"Error generating visualization: {str(e)}")
 
 # TAB 3: DASHBOARD
-def refresh_dashboard():
-    viz_list = get_all_visualizations()
+def refresh_dashboard(page: int = 0):
+    viz_list = dashboard_page(page, 6)["charts"]
     plots = []
     
-    # We will display up to 6 charts for now
+    # We will display 6 charts per page
     for viz in viz_list:
         fig = parse_viz_config(viz)
         if fig:
@@ -200,6 +317,7 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
                 with gr.Column(scale=1, elem_classes="panel"):
                     gr.Markdown("### Upload New Dataset")
                     file_input = gr.File(label="Drop CSV/Excel Here", file_types=[".csv", ".xlsx"])
+                    split_sheets_input = gr.Checkbox(label="Excel: each sheet as its own dataset", value=False)
                     upload_btn = gr.Button("Upload Dataset", elem_classes="primary-btn")
                     upload_status = gr.Markdown()
                 
@@ -234,6 +352,7 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
                         prompt_input = gr.Textbox(label="New Visualization Prompt", placeholder="e.g., Show me a bar chart of sales by region...", lines=1)
                     with gr.Column(scale=1):
                         generate_btn = gr.Button("✨ Generate", elem_classes="primary-btn")
+                generate_status = gr.Markdown()
             
             # --- BOTTOM: DYNAMIC RENDER ---
             @gr.render(inputs=viz_history)
@@ -276,7 +395,7 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
             generate_btn.click(
                 generate_visualization, 
                 inputs=[ds_dropdown, prompt_input, viz_history], 
-                outputs=[viz_history, prompt_input]
+                outputs=[viz_history, prompt_input, generate_status]
             )
 
         # === TAB 3: DASHBOARD OVERVIEW ===
@@ -284,17 +403,22 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
             with gr.Row(elem_classes="panel"):
                 refresh_dash_btn = gr.Button("🔄 Refresh Dashboard", size="sm")
                 delete_all_btn = gr.Button("🗑️ Clear All", size="sm", variant="stop")
+                prev_page_btn = gr.Button("◀ Newer", size="sm")
+                next_page_btn = gr.Button("Older ▶", size="sm")
             
-            # State for dashboard data
-            dashboard_data = gr.State(value=[])
+            # State for dashboard data: the page shown (see dashboard_page)
+            dashboard_data = gr.State(value={})
 
             # Dynamic Grid Render
             @gr.render(inputs=dashboard_data)
-            def render_dashboard(viz_list):
+            def render_dashboard(data):
+                viz_list = data.get("charts") or []
                 if not viz_list:
                     gr.Markdown("_No visualizations found in the database._")
                 else:
-                    gr.Markdown(f"### Showing {len(viz_list)} Visualizations")
+                    first, last = data["start"] + 1, data["start"] + len(viz_list)
+                    page = f"page {data['page'] + 1} of {data['pages']}"
+                    gr.Markdown(f"### Showing {first}-{last} of {data['total']} Visualizations ({page})")
                     # Create 2-column grid
                     # Iterate in chunks of 2
                     for i in range(0, len(viz_list), 2):
@@ -322,8 +446,11 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
                                         gr.Markdown("❌ Error rendering")
 
             # Wiring: Load data into State, then Render triggers automatically
-            def load_dash_data():
-                return get_all_visualizations()
+            def load_dash_data(data=None):
+                return dashboard_page((data or {}).get("page", 0))
+
+            def turn_dash_page(data, step):
+                return dashboard_page((data or {}).get("page", 0) + step)
 
             def delete_all_dash():
                 try:
@@ -331,9 +458,11 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
                     return load_dash_data()
                 except Exception as e:
                     print(f"Error deleting: {e}")
-                    return []
+                    return {}
 
-            refresh_dash_btn.click(load_dash_data, outputs=dashboard_data)
+            refresh_dash_btn.click(load_dash_data, inputs=dashboard_data, outputs=dashboard_data)
+            prev_page_btn.click(lambda data: turn_dash_page(data, -1), inputs=dashboard_data, outputs=dashboard_data)
+            next_page_btn.click(lambda data: turn_dash_page(data, 1), inputs=dashboard_data, outputs=dashboard_data)
             delete_all_btn.click(delete_all_dash, outputs=dashboard_data)
             
             # Initial Load
@@ -341,7 +470,7 @@ with gr.Blocks(title="◥꧁དℭ℟Åℤ¥༒₭ÏḼḼ℥℟ཌ꧂◤", css=
 
 
     # Upload wiring
-    upload_btn.click(handle_upload, inputs=file_input, outputs=[upload_status, ds_dropdown])
+    upload_btn.click(handle_upload, inputs=[file_input, split_sheets_input], outputs=[upload_status, ds_dropdown])
 
 if __name__ == "__main__":
     demo.launch(server_name="0.0.0.0", server_port=7866)
@@ -96,6 +96,8 @@ def run_migrations_online():
             include_schemas=True,
             dialect_opts={"paramstyle": "named"},
             include_name=include_name,
+            # SQLite cannot ALTER most column properties; batch mode recreates the table instead
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
@@ -0,0 +1,51 @@
+"""add search indexes
+
+Revision ID: 0b6d5e9a2c71
+Revises: e4c1a8f03b27
+Create Date: 2026-10-18 18:40:12.503114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = '0b6d5e9a2c71'
+down_revision = 'e4c1a8f03b27'
+branch_labels = None
+depends_on = None
+
+# indexes on lower(column) behind the __prefix / __search filters; other databases keep LIKE scans
+SEARCH_COLUMNS = (
+    ("dataset", "filename"),
+    ("visualization", "prompt"),
+    ("post", "title"),
+    ("tag", "name"),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    # pg_trgm ships with contrib; without it __search stays a scan and only __prefix gets an index
+    trigram = bind.exec_driver_sql("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'").scalar()
+    if trigram:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # visualization is created by the app at startup, so it may not exist yet; the app adds its indexes then
+    tables = set(sa.inspect(bind).get_table_names())
+    for table, column in SEARCH_COLUMNS:
+        if table not in tables:
+            continue
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_prefix ON "{table}" (lower("{column}") text_pattern_ops)')
+        if trigram:
+            op.execute(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm ON "{table}" USING gin (lower("{column}") gin_trgm_ops)'
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, column in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_prefix")
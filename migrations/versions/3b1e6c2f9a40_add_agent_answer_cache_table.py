@@ -0,0 +1,54 @@
+"""add agent answer cache table
+
+Revision ID: 3b1e6c2f9a40
+Revises: 7f8a1db0c9ba
+Create Date: 2026-10-18 09:12:41.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = '3b1e6c2f9a40'
+down_revision = '7f8a1db0c9ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "agent_answer_cache",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("dataset_id", sa.Integer(), nullable=False),
+        sa.Column("dataset_version", sa.String(length=255), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("compute_seconds", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("expires_at", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("last_accessed_at", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=True,
+        ),
+    )
+    op.create_index(op.f("ix_agent_answer_cache_cache_key"), "agent_answer_cache", ["cache_key"], unique=True)
+    op.create_index(op.f("ix_agent_answer_cache_dataset_id"), "agent_answer_cache", ["dataset_id"], unique=False)
+    op.create_index(
+        op.f("ix_agent_answer_cache_last_accessed_at"), "agent_answer_cache", ["last_accessed_at"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_agent_answer_cache_last_accessed_at"), table_name="agent_answer_cache")
+    op.drop_index(op.f("ix_agent_answer_cache_dataset_id"), table_name="agent_answer_cache")
+    op.drop_index(op.f("ix_agent_answer_cache_cache_key"), table_name="agent_answer_cache")
+    op.drop_table("agent_answer_cache")
@@ -0,0 +1,53 @@
+"""add dataset ingestion job table
+
+Revision ID: 5a2f8c1d7e64
+Revises: 9d4c7e21b5f3
+Create Date: 2026-10-18 13:26:41.208815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = '5a2f8c1d7e64'
+down_revision = '9d4c7e21b5f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dataset_ingestion_job",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("file_path", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("rows_ingested", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("bytes_total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("bytes_processed", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("dataset_id", sa.Integer(), sa.ForeignKey("dataset.id"), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        # Unix timestamps
+        sa.Column("started_at", sa.Float(), nullable=True),
+        sa.Column("finished_at", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=True,
+        ),
+    )
+    op.create_index(op.f("ix_dataset_ingestion_job_status"), "dataset_ingestion_job", ["status"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_dataset_ingestion_job_status"), table_name="dataset_ingestion_job")
+    op.drop_table("dataset_ingestion_job")
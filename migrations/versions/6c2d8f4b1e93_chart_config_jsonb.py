@@ -0,0 +1,34 @@
+"""chart_config jsonb
+
+Revision ID: 6c2d8f4b1e93
+Revises: 0b6d5e9a2c71
+Create Date: 2026-10-18 21:05:37.214508
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = '6c2d8f4b1e93'
+down_revision = '0b6d5e9a2c71'
+branch_labels = None
+depends_on = None
+
+
+def _visualization_exists(bind) -> bool:
+    # visualization is created by the app at startup (already as JSONB), so it may not exist yet
+    return "visualization" in sa.inspect(bind).get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _visualization_exists(bind):
+        return
+    op.execute('ALTER TABLE "visualization" ALTER COLUMN chart_config TYPE JSONB USING chart_config::jsonb')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _visualization_exists(bind):
+        return
+    op.execute('ALTER TABLE "visualization" ALTER COLUMN chart_config TYPE JSON USING chart_config::json')
@@ -0,0 +1,27 @@
+"""add worker heartbeat to ingestion job
+
+Revision ID: 8e1f3a6c9d24
+Revises: 6c2d8f4b1e93
+Create Date: 2026-10-18 21:14:37.902531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = '8e1f3a6c9d24'
+down_revision = '6c2d8f4b1e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # host:pid:token of the process that submitted or runs the job
+    op.add_column("dataset_ingestion_job", sa.Column("worker_id", sa.String(length=255), nullable=True))
+    # Unix timestamp
+    op.add_column("dataset_ingestion_job", sa.Column("heartbeat_at", sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("dataset_ingestion_job", "heartbeat_at")
+    op.drop_column("dataset_ingestion_job", "worker_id")
@@ -0,0 +1,54 @@
+"""add dataset column profile table
+
+Revision ID: 9d4c7e21b5f3
+Revises: 3b1e6c2f9a40
+Create Date: 2026-10-18 11:02:17.530114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = '9d4c7e21b5f3'
+down_revision = '3b1e6c2f9a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dataset_column_profile",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("dataset_id", sa.Integer(), sa.ForeignKey("dataset.id"), nullable=False),
+        sa.Column("column_name", sa.String(length=255), nullable=False),
+        sa.Column("dtype", sa.String(length=64), nullable=False),
+        sa.Column("null_ratio", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("distinct_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("distinct_is_estimate", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("min_value", sa.Text(), nullable=True),
+        sa.Column("max_value", sa.Text(), nullable=True),
+        # JSON strings, same convention as dataset.columns_metadata
+        sa.Column("top_values", sa.Text(), nullable=False, server_default="[]"),
+        sa.Column("sample_values", sa.Text(), nullable=False, server_default="[]"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        op.f("ix_dataset_column_profile_dataset_id"), "dataset_column_profile", ["dataset_id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_dataset_column_profile_dataset_id"), table_name="dataset_column_profile")
+    op.drop_table("dataset_column_profile")
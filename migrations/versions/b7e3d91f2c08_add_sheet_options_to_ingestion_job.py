@@ -0,0 +1,32 @@
+"""add sheet options to ingestion job
+
+Revision ID: b7e3d91f2c08
+Revises: 5a2f8c1d7e64
+Create Date: 2026-10-18 14:48:09.613307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = 'b7e3d91f2c08'
+down_revision = '5a2f8c1d7e64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "dataset_ingestion_job",
+        sa.Column("split_sheets", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    # JSON list, same convention as dataset.columns_metadata
+    op.add_column(
+        "dataset_ingestion_job",
+        sa.Column("dataset_ids", sa.Text(), nullable=False, server_default="[]"),
+    )
+
+
+def downgrade():
+    op.drop_column("dataset_ingestion_job", "dataset_ids")
+    op.drop_column("dataset_ingestion_job", "split_sheets")
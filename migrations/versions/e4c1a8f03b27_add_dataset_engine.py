@@ -0,0 +1,32 @@
+"""add dataset engine
+
+Revision ID: e4c1a8f03b27
+Revises: b7e3d91f2c08
+Create Date: 2026-10-18 16:02:41.218530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+# revision identifiers, used by Alembic.
+revision = 'e4c1a8f03b27'
+down_revision = 'b7e3d91f2c08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing datasets keep answering from their SQL table
+    op.add_column(
+        "dataset",
+        sa.Column("engine", sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default="sql"),
+    )
+    op.add_column(
+        "dataset_ingestion_job",
+        sa.Column("engine", sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default="sql"),
+    )
+
+
+def downgrade():
+    op.drop_column("dataset_ingestion_job", "engine")
+    op.drop_column("dataset", "engine")
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage
+from sqlalchemy import create_engine, orm, text
+
+from app.core.config import configs
+from app.services.agent_service import AgentService
+from app.util.columnar import ColumnarResult
+
+LLM_DELAY = 0.3
+
+
+class SlowLLM:
+    model_name = "slow-fake"
+
+    def _respond(self, messages):
+        if "SQL expert" in messages[0].content:
+            return AIMessage(content="SELECT category, SUM(amount) AS total FROM sales GROUP BY category")
+        return AIMessage(content=json.dumps({"chart_config": {"data": [{"type": "bar"}], "layout": {}}, "explanation": "ok"}))
+
+    def invoke(self, messages, *args, **kwargs):
+        time.sleep(LLM_DELAY)
+        return self._respond(messages)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        await asyncio.sleep(LLM_DELAY)
+        return self._respond(messages)
+
+
+class FakeDatasetRepository:
+    def __init__(self, db_path):
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE sales (category TEXT, amount REAL)"))
+            conn.execute(text("INSERT INTO sales VALUES ('a', 1.0), ('b', 2.0), ('a', 3.0)"))
+        self._sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory(self):
+        with self._sessionmaker() as session:
+            yield session
+
+    # no replica here: agent SQL reads the same database
+    read_session_factory = session_factory
+
+    def read_by_id(self, id):
+        return SimpleNamespace(id=id, table_name="sales", engine="sql", columns_metadata="{}", updated_at=None)
+
+
+def test_concurrent_analyze_finishes_in_about_the_time_of_one(tmp_path, monkeypatch):
+    # keep both LLM round trips in the pipeline
+    monkeypatch.setattr(configs, "AGENT_CHART_FAST_PATH", "off")
+    service = AgentService(FakeDatasetRepository(tmp_path / "agent.db"), llm=SlowLLM())
+
+    async def run(n):
+        started = time.perf_counter()
+        results = await asyncio.gather(*[service.aanalyze(f"total by category {i}", 1) for i in range(n)])
+        return time.perf_counter() - started, results
+
+    single, _ = asyncio.run(run(1))
+    concurrent, results = asyncio.run(run(10))
+
+    assert all(result["explanation"] == "ok" for result in results)
+    for result in results:
+        totals = ColumnarResult.from_json(result["query_result"]).to_frame().sort_values("category")
+        assert totals.to_dict("list") == {"category": ["a", "b"], "total": [4.0, 2.0]}
+    assert concurrent < single * 2
+
+
+def test_services_share_one_compiled_workflow_but_keep_their_own_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(configs, "AGENT_CHART_FAST_PATH", "off")
+    repository = FakeDatasetRepository(tmp_path / "agent.db")
+
+    class OtherLLM(SlowLLM):
+        def _respond(self, messages):
+            if "SQL expert" in messages[0].content:
+                return super()._respond(messages)
+            return AIMessage(content=json.dumps({"chart_config": {"data": [{"type": "pie"}]}, "explanation": "other"}))
+
+    first = AgentService(repository, llm=SlowLLM())
+    second = AgentService(repository, llm=OtherLLM())
+
+    async def run():
+        return await asyncio.gather(first.aanalyze("total", 1), second.aanalyze("total", 1))
+
+    results = asyncio.run(run())
+
+    assert first.workflow is second.workflow
+    assert [result["explanation"] for result in results] == ["ok", "other"]
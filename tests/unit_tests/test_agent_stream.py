@@ -0,0 +1,17 @@
+import json
+
+from app.services.agent_service import ExplanationTokenStream
+from app.util.sse import format_sse
+
+
+def test_explanation_tokens_are_extracted_across_chunks():
+    content = json.dumps({"chart_config": {"data": []}, "explanation": 'First "class" é\nwins'})
+    stream = ExplanationTokenStream()
+    tokens = [stream.feed(content[i : i + 3]) for i in range(0, len(content), 3)]
+
+    assert "".join(tokens) == 'First "class" é\nwins'
+    assert stream.done
+
+
+def test_format_sse():
+    assert format_sse("sql", {"sql_query": "SELECT 1"}) == 'event: sql\ndata: {"sql_query": "SELECT 1"}\n\n'
@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, orm
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.cache import MemoryAnswerCache, SQLAnswerCache, make_cache_key
+from app.model.answer_cache import AnswerCacheEntry
+from app.repository.answer_cache_repository import AnswerCacheRepository
+
+
+def test_cache_key_normalizes_prompt():
+    key = make_cache_key(1, "Show survival   rate by class?", "gpt-4o", "1")
+    assert key == make_cache_key(1, "  show survival rate BY class ", "gpt-4o", "1")
+    assert key != make_cache_key(2, "show survival rate by class", "gpt-4o", "1")
+    assert key != make_cache_key(1, "show survival rate by class", "gpt-4o-mini", "1")
+    assert key != make_cache_key(1, "show survival rate by class", "gpt-4o", "2")
+
+
+def test_memory_cache_hit_miss_and_latency_saved():
+    cache = MemoryAnswerCache(max_entries=8)
+    assert cache.get("key", "v1") is None
+    cache.set("key", 1, "v1", {"explanation": "cached"}, compute_seconds=12.5)
+    assert cache.get("key", "v1") == {"explanation": "cached"}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["latency_saved_seconds"] == 12.5
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryAnswerCache(max_entries=2)
+    cache.set("a", 1, "v1", {"n": "a"}, 1)
+    cache.set("b", 1, "v1", {"n": "b"}, 1)
+    cache.get("a", "v1")
+    cache.set("c", 1, "v1", {"n": "c"}, 1)
+
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == {"n": "a"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cache_ttl_and_dataset_invalidation():
+    cache = MemoryAnswerCache(max_entries=8, ttl_seconds=0.01)
+    cache.set("a", 1, "v1", {"n": "a"}, 1)
+    time.sleep(0.02)
+    assert cache.get("a", "v1") is None
+
+    cache = MemoryAnswerCache(max_entries=8)
+    cache.set("a", 1, "v1", {"n": "a"}, 1)
+    cache.set("b", 2, "v1", {"n": "b"}, 1)
+    assert cache.get("a", "v2") is None
+    assert cache.invalidate_dataset(2) == 1
+    assert cache.get("b", "v1") is None
+
+
+def test_sql_cache_hit_miss_and_invalidation():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[AnswerCacheEntry.__table__])
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory():
+        with sessionmaker() as session:
+            yield session
+
+    cache = SQLAnswerCache(AnswerCacheRepository(session_factory), max_entries=8)
+    assert cache.get("a", "v1") is None
+    cache.set("a", 1, "v1", {"explanation": "cached"}, compute_seconds=3)
+    cache.set("b", 2, "v1", {"explanation": "other"}, compute_seconds=1)
+
+    assert cache.get("a", "v1") == {"explanation": "cached"}
+    assert cache.get("a", "v2") is None  # dataset changed: the entry is dropped
+    assert cache.get("a", "v1") is None
+    assert cache.invalidate_dataset(2) == 1
+    assert cache.get("b", "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["backend"]) == (1, 4, "sql")
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlmodel import SQLModel
+
+from app.core.database import AsyncDatabase, Database
+from app.core.exceptions import NotFoundError
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository import AsyncDatasetRepository, DatasetRepository
+from app.schema.dataset_schema import DatasetCreate, FindDataset
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.sqlite3'}"
+    SQLModel.metadata.create_all(Database(url)._engine, tables=[Dataset.__table__, Visualization.__table__])
+    return url
+
+
+def test_async_repository_matches_sync_repository(db_url):
+    sync_repository = DatasetRepository(Database(db_url).session)
+    for i in range(5):
+        sync_repository.create(DatasetCreate(filename=f"f{i % 2}.csv", table_name=f"t{i}"))
+
+    async def run():
+        database = AsyncDatabase(db_url)
+        repository = AsyncDatasetRepository(database.session)
+        find = FindDataset(ordering="filename", page_size=2)
+        pages = [await repository.read_by_options(find)]
+        while pages[-1]["search_options"]["next_cursor"]:
+            cursor = pages[-1]["search_options"]["next_cursor"]
+            pages.append(await repository.read_by_options(FindDataset(ordering="filename", page_size=2, cursor=cursor)))
+        updated = await repository.update_attr(1, "engine", "duckdb")
+        await repository.delete_by_id(2)
+        with pytest.raises(NotFoundError):
+            await repository.read_by_id(2)
+        await database.dispose()
+        return pages, updated
+
+    expected = sync_repository.read_by_options(FindDataset(ordering="filename", page_size="all"))["founds"]
+    pages, updated = asyncio.run(run())
+
+    assert [dataset.id for page in pages for dataset in page["founds"]] == [dataset.id for dataset in expected]
+    assert pages[0]["search_options"]["total_count"] == 5
+    assert updated.engine == "duckdb"
+    assert sync_repository.read_by_id(1).engine == "duckdb"
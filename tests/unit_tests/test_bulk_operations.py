@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, orm
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.exceptions import ValidationError
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.dataset_repository import DatasetRepository
+from app.schema.dataset_schema import DatasetCreate, DatasetPatch
+from app.services.base_service import BaseService
+
+
+@pytest.fixture
+def repository():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session():
+        with sessionmaker() as session:
+            yield session
+            session.commit()
+
+    return DatasetRepository(session)
+
+
+def datasets(*table_names):
+    return [DatasetCreate(filename=f"{name}.csv", table_name=name) for name in table_names]
+
+
+def test_bulk_create_returns_rows_in_input_order(repository):
+    result = repository.bulk_create(datasets("t3", "t1", "t2"))
+
+    assert [found.table_name for found in result["founds"]] == ["t3", "t1", "t2"]
+    assert all(found.id and found.created_at for found in result["founds"])
+    assert result["errors"] == []
+
+
+def test_bulk_create_reports_failing_items_and_keeps_the_rest(repository):
+    repository.create(datasets("taken")[0])
+
+    result = repository.bulk_create(datasets("a", "taken", "b", "c", "c"))
+
+    assert [found.table_name for found in result["founds"]] == ["a", "b", "c"]
+    assert [error["index"] for error in result["errors"]] == [1, 4]
+    assert "UNIQUE" in result["errors"][0]["detail"]
+    assert sorted(d.table_name for d in repository.read_list()) == ["a", "b", "c", "taken"]
+
+
+def test_bulk_update_patches_set_fields_and_reports_missing_ids(repository):
+    ids = [found.id for found in repository.bulk_create(datasets("t1", "t2"))["founds"]]
+
+    result = repository.bulk_update(
+        [DatasetPatch(id=ids[1], filename="renamed.csv"), DatasetPatch(id=999), DatasetPatch(id=ids[0])]
+    )
+
+    assert [(found.id, found.filename) for found in result["founds"]] == [(ids[1], "renamed.csv"), (ids[0], "t1.csv")]
+    assert result["errors"] == [{"index": 1, "id": 999, "detail": "not found id : 999"}]
+
+
+def test_bulk_delete(repository):
+    ids = [found.id for found in repository.bulk_create(datasets("t1", "t2", "t3"))["founds"]]
+
+    result = repository.bulk_delete([ids[0], 999, ids[2]])
+
+    assert result["founds"] == [ids[0], ids[2]]
+    assert [error["id"] for error in result["errors"]] == [999]
+    assert [d.id for d in repository.read_list()] == [ids[1]]
+
+
+def test_bulk_service_rejects_empty_and_oversized_batches(repository, monkeypatch):
+    service = BaseService(repository)
+    monkeypatch.setattr("app.services.base_service.configs.BULK_MAX_ITEMS", 2)
+
+    with pytest.raises(ValidationError):
+        service.bulk_add([])
+    with pytest.raises(ValidationError):
+        service.bulk_add(datasets("t1", "t2", "t3"))
+    assert len(service.bulk_add(datasets("t1", "t2"))["founds"]) == 2
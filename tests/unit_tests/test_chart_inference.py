@@ -0,0 +1,48 @@
+import json
+
+import pandas as pd
+
+from app.util.chart_inference import infer_chart
+
+
+def test_category_and_measure_builds_bar_chart():
+    df = pd.DataFrame({"region": ["north", "south", "east"], "sales": [120.0, 80.5, 200.0]})
+    result = infer_chart(df, "sales by region")
+
+    trace = result["chart_config"]["data"][0]
+    assert trace["type"] == "bar"
+    assert trace["x"] == ["north", "south", "east"]
+    assert result["chart_config"]["layout"]["paper_bgcolor"] == "rgba(0,0,0,0)"
+    assert result["explanation"].startswith("east has the highest sales")
+
+
+def test_integer_group_key_reads_as_categories():
+    df = pd.DataFrame({"pclass": [1, 2, 3], "survival_rate": [0.63, 0.47, 0.24]})
+    assert infer_chart(df, "survival rate by class")["chart_config"]["data"][0]["type"] == "bar"
+
+
+def test_time_series_builds_sorted_line_chart():
+    df = pd.DataFrame({"day": ["2024-01-03", "2024-01-01", "2024-01-02"], "orders": [5, 3, 4]})
+    trace = infer_chart(df)["chart_config"]["data"][0]
+
+    assert trace["type"] == "scatter"
+    assert trace["y"] == [3, 4, 5]
+
+
+def test_null_measures_are_sent_as_json_null():
+    df = pd.DataFrame({"day": ["2024-01-01", "2024-01-02", "2024-01-03"], "orders": [1.0, None, 3.0]})
+    chart_config = infer_chart(df)["chart_config"]
+
+    assert chart_config["data"][0]["y"] == [1.0, None, 3.0]
+    json.dumps(chart_config, allow_nan=False)
+
+
+def test_single_numeric_column_builds_histogram_or_indicator():
+    assert infer_chart(pd.DataFrame({"age": [22, 38, 26, 35]}))["chart_config"]["data"][0]["type"] == "histogram"
+    assert infer_chart(pd.DataFrame({"total": [891]}))["chart_config"]["data"][0]["type"] == "indicator"
+
+
+def test_ambiguous_shape_is_left_to_the_llm():
+    df = pd.DataFrame({"a": ["x", "y"], "b": ["p", "q"], "c": [1, 2]})
+    assert infer_chart(df) is None
+    assert infer_chart(pd.DataFrame()) is None
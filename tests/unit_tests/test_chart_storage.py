@@ -0,0 +1,86 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, orm, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.visualization_repository import VisualizationRepository
+from app.util.chart_storage import (
+    COMPRESSED_KEY,
+    ChartConfigCodec,
+    chart_codec,
+    is_compressed,
+    train_dictionary,
+)
+
+
+def chart(i: int, points: int = 200) -> dict:
+    return {
+        "data": [{"type": "bar", "x": [f"region {j % 17}" for j in range(points)], "y": [i * j * 0.5 for j in range(points)]}],
+        "layout": {"title": {"text": f"chart {i}"}},
+    }
+
+
+@pytest.fixture
+def codec(tmp_path):
+    codec = ChartConfigCodec("zstd", str(tmp_path), min_bytes=256)
+    codec.save_dictionary(train_dictionary([chart(i)["data"] for i in range(300)], 16 * 1024))
+    return codec
+
+
+def test_codec_round_trip(codec, tmp_path):
+    config = chart(1000)
+    stored = codec.encode(config)
+
+    assert is_compressed(stored) and stored["layout"] == config["layout"]
+    assert len(json.dumps(stored)) < len(json.dumps(config)) / 4
+    assert codec.decode(stored) == config
+    # another process with the same dictionary directory decodes it too
+    assert ChartConfigCodec("json", str(tmp_path)).decode(stored) == config
+
+
+def test_codec_leaves_small_and_plain_configs(codec):
+    small = {"data": [{"x": [1], "y": [2]}], "layout": {}}
+
+    assert codec.encode(small) == small
+    assert codec.encode({}) == {}
+    assert ChartConfigCodec("json").encode(chart(1)) == chart(1)
+    assert codec.decode(chart(1)) == chart(1)
+
+
+def test_codec_without_dictionary(tmp_path):
+    codec = ChartConfigCodec("zstd", str(tmp_path / "empty"), min_bytes=0)
+
+    assert codec.decode(codec.encode(chart(3))) == chart(3)
+    with pytest.raises(ValueError):
+        ChartConfigCodec("lz4")
+
+
+def test_column_compresses_on_write_and_decompresses_on_full_reads(codec, tmp_path):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_factory():
+        with sessionmaker() as session:
+            yield session
+            session.commit()
+
+    chart_codec.configure("zstd", str(tmp_path), 256, 3)
+    try:
+        with session_factory() as session:
+            session.add(Dataset(filename="f.csv", table_name="t", columns_metadata="{}"))
+            session.add(Visualization(dataset_id=1, prompt="p", chart_config=chart(7)))
+        repository = VisualizationRepository(session_factory)
+        raw = engine.connect().execute(text("SELECT chart_config FROM visualization")).scalar()
+
+        assert COMPRESSED_KEY in raw
+        assert repository.read_by_id(1).chart_config == chart(7)
+        assert repository.read_list(["id", "prompt"]) == [{"id": 1, "prompt": "p"}]
+    finally:
+        chart_codec.configure("json", None, 2048, 3)
@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine, text
+
+from app.util.columnar import ColumnarResult
+
+
+def _result(conn, rows):
+    conn.execute(text("CREATE TABLE t (id INTEGER, name TEXT, score REAL)"))
+    values = ",".join(f"({i}, 'n{i}', {i / 2})" for i in range(rows))
+    conn.execute(text(f"INSERT INTO t VALUES {values}"))
+    return conn.execute(text("SELECT * FROM t ORDER BY id").execution_options(stream_results=True, yield_per=7))
+
+
+def test_row_cap_stops_fetching_and_keeps_typed_columns():
+    with create_engine("sqlite://").connect() as conn:
+        data = ColumnarResult.from_result(_result(conn, 50), max_rows=20, batch_size=7)
+
+    assert data.row_count == 20
+    assert data.truncated
+    assert data.columns["id"].dtype == "int64"
+    assert data.columns["score"].dtype == "float64"
+    assert data.head_records(2) == [{"id": 0, "name": "n0", "score": 0.0}, {"id": 1, "name": "n1", "score": 0.5}]
+
+
+def test_json_round_trip():
+    with create_engine("sqlite://").connect() as conn:
+        data = ColumnarResult.from_result(_result(conn, 5), max_rows=100, batch_size=7)
+
+    assert not data.truncated
+    restored = ColumnarResult.from_json(data.to_json())
+    assert restored.to_frame().equals(data.to_frame())
+
+
+def test_batches_with_nulls_are_retyped_when_joined():
+    with create_engine("sqlite://").connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER, name TEXT)"))
+        conn.execute(text("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (NULL, NULL)"))
+        data = ColumnarResult.from_result(conn.execute(text("SELECT * FROM t ORDER BY rowid")), max_rows=10, batch_size=2)
+
+    assert data.columns["id"].dtype == "float64" and data.columns["id"][:2].tolist() == [1.0, 2.0]
+    assert data.columns["name"].tolist() == ["a", "b", None]
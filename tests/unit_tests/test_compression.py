@@ -0,0 +1,141 @@
+import gzip
+import zlib
+
+import pytest
+import zstandard
+
+brotli = pytest.importorskip("brotli")
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.middleware import CompressionMiddleware
+from app.util.compression import CompressedCache, StreamCompressor, available_encodings, negotiate, parse_levels
+from app.util.http_cache import conditional
+
+ROWS = [{"id": i, "region": "North", "values": list(range(20))} for i in range(200)]
+DECODE = {"gzip": gzip.decompress, "br": brotli.decompress, "zstd": lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body)}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.state.data = {"n": 0}
+
+    @app.get("/rows")
+    def rows(request: Request, response: Response):
+        return conditional(request, response, "private, no-cache", "v1") or ROWS
+
+    @app.get("/stale")
+    def stale(request: Request, response: Response):
+        # an ETag that does not follow the data, e.g. a version marker missing a change
+        return conditional(request, response, "private, no-cache", "v1") or [{**row, "n": app.state.data["n"]} for row in ROWS]
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b'{"id":%d}\n' % i for i in range(3)), media_type="application/x-ndjson")
+
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=["zstd", "br", "gzip"],
+        levels=parse_levels("zstd:3,br:4,gzip:6"),
+        cached_levels=parse_levels("zstd:12,br:6,gzip:9"),
+        minimum_size=500,
+    )
+    return TestClient(app), app
+
+
+def test_negotiate():
+    encodings = ["zstd", "br", "gzip"]
+
+    assert negotiate("gzip, deflate, br, zstd", encodings) == "zstd"
+    assert negotiate("gzip, br;q=0.9", encodings) == "gzip"
+    assert negotiate("zstd;q=0, br", encodings) == "br"
+    assert negotiate("*;q=0.5, zstd;q=0", encodings) == "br"
+    assert negotiate("identity", encodings) is None
+    assert negotiate("", encodings) is None
+    with pytest.raises(ValueError):
+        available_encodings(["lz4"])
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br", "gzip"])
+def test_large_json_is_compressed(client, encoding):
+    client, _ = client
+    headers = {"Accept-Encoding": encoding}
+    first = client.get("/rows", headers=headers)
+
+    assert first.headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert first.json() == ROWS  # httpx decodes gzip, br and zstd
+
+
+def test_compressed_bodies_and_cache(client):
+    client, app = client
+    with client.stream("GET", "/rows", headers={"Accept-Encoding": "zstd"}) as response:
+        body = b"".join(response.iter_raw())
+    client.get("/rows", headers={"Accept-Encoding": "zstd"})
+    middleware = app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+
+    assert int(response.headers["content-length"]) == len(body)
+    assert DECODE["zstd"](body).startswith(b'[{"id":0')
+    assert len(middleware.cache._entries) == 1
+    assert client.get("/rows", headers={"Accept-Encoding": "zstd", "If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_cache_never_serves_a_body_the_app_did_not_send(client):
+    client, app = client
+    first = client.get("/stale", headers={"Accept-Encoding": "zstd"})
+    app.state.data["n"] = 1
+    second = client.get("/stale", headers={"Accept-Encoding": "zstd"})
+
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.json()[0]["n"] == 0 and second.json()[0]["n"] == 1
+
+
+def test_small_and_identity_responses_are_left_alone(client):
+    client, _ = client
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/rows", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers and small.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in identity.headers and identity.json() == ROWS
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br", "gzip"])
+def test_streamed_bodies_are_compressed_chunk_by_chunk(client, encoding):
+    client, _ = client
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": encoding}) as response:
+        body = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == encoding and "content-length" not in response.headers
+    assert DECODE[encoding](body) == b'{"id":0}\n{"id":1}\n{"id":2}\n'
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br", "gzip"])
+def test_stream_compressor_flushes_every_chunk(encoding):
+    compressor = StreamCompressor(encoding, 3)
+    decompressor = {
+        "gzip": lambda: zlib.decompressobj(31).decompress,
+        "br": lambda: brotli.Decompressor().process,
+        "zstd": lambda: zstandard.ZstdDecompressor().decompressobj().decompress,
+    }[encoding]()
+
+    assert decompressor(compressor.compress(b"first line\n")) == b"first line\n"
+    assert decompressor(compressor.compress(b"second line\n") + compressor.finish()) == b"second line\n"
+
+
+def test_compressed_cache_evicts_least_recently_used():
+    cache = CompressedCache(max_bytes=10)
+    cache.set(("a", "br"), b"12345")
+    cache.set(("b", "br"), b"12345")
+    cache.get(("a", "br"))
+    cache.set(("c", "br"), b"12345")
+
+    assert cache.get(("b", "br")) is None and cache.get(("a", "br")) == b"12345" and cache.size == 10
@@ -0,0 +1,27 @@
+from sqlalchemy import text
+
+from app.core.config import Configs
+from app.core.database import Database, connect_args
+
+
+def test_connect_args_depend_on_the_driver():
+    assert connect_args("postgresql+psycopg://u:p@db:5432/postgres") == {"prepare_threshold": 0}
+    assert connect_args("mysql+pymysql://u:p@db:3306/fca") == {}
+    assert connect_args("sqlite:///app.db") == {"check_same_thread": False}
+
+
+def test_sqlite_uri_has_no_network_options(tmp_path):
+    path = str(tmp_path / "app.sqlite3")
+
+    assert Configs(DB="sqlite", SQLITE_PATH=path).DATABASE_URI == f"sqlite:///{path}"
+    assert "sslmode" not in Configs(DB="mysql").DATABASE_URI
+    assert Configs(DB="postgresql", DB_SSLMODE="disable").DATABASE_URI.endswith("?sslmode=disable")
+
+
+def test_sqlite_database_is_created_in_wal_mode(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'data' / 'app.sqlite3'}")
+
+    with db.session() as session:
+        assert session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert session.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    assert (tmp_path / "data" / "app.sqlite3").exists()
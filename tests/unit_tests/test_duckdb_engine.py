@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+from app.core.config import configs
+from app.services.agent_service import AgentService
+from app.util.duckdb_engine import ParquetDatasetWriter, check_engine, execute_duckdb, has_parquet
+
+
+def write_parts(root, table_name, *frames):
+    writer = ParquetDatasetWriter(str(root), table_name)
+    for df in frames:
+        writer.write(df)
+    writer.close()
+
+
+def test_query_runs_over_all_parquet_parts_under_the_table_name(tmp_path):
+    write_parts(
+        tmp_path,
+        "sales",
+        pd.DataFrame({"category": ["a", "b"], "amount": [1.0, 2.0]}),
+        pd.DataFrame({"category": ["a", None], "amount": [3.0, 4.0]}),
+    )
+
+    result = execute_duckdb(
+        str(tmp_path), "sales", "SELECT category, SUM(amount) AS total FROM sales GROUP BY 1 ORDER BY 1;", 100
+    )
+
+    assert has_parquet(str(tmp_path), "sales")
+    assert not result.truncated
+    assert result.to_frame().to_dict("list") == {"category": ["a", "b", None], "total": [4.0, 2.0, 4.0]}
+
+
+def test_query_result_is_capped_at_max_rows(tmp_path):
+    write_parts(tmp_path, "numbers", pd.DataFrame({"n": range(50)}))
+
+    result = execute_duckdb(str(tmp_path), "numbers", "SELECT n FROM numbers ORDER BY n", 10)
+
+    assert result.truncated
+    assert result.to_frame()["n"].tolist() == list(range(10))
+
+
+def test_query_cannot_reach_files_outside_the_dataset(tmp_path):
+    write_parts(tmp_path, "sales", pd.DataFrame({"amount": [1.0]}))
+    secret = tmp_path / "secret.csv"
+    secret.write_text("token\nabc\n")
+
+    for sql in [f"SELECT * FROM read_csv('{secret}')", "SELECT * FROM read_text('/etc/hostname')"]:
+        with pytest.raises(duckdb.PermissionException):
+            execute_duckdb(str(tmp_path), "sales", sql, 10)
+    with pytest.raises(duckdb.Error):
+        execute_duckdb(str(tmp_path), "sales", "SET enable_external_access = true", 10)
+
+
+def test_sql_prompt_names_the_dialect_of_the_engine(monkeypatch):
+    monkeypatch.setattr(configs, "DB", "postgresql")
+    service = AgentService(repository=None, llm=object(), cache=object(), workflow=object())
+    state = {"table_name": "sales", "columns_metadata": "{}", "question": "total?"}
+
+    assert "DuckDB SQL" in service._sql_prompt({**state, "engine": "duckdb"})
+    assert "PostgreSQL SQL" in service._sql_prompt({**state, "engine": "sql"})
+    with pytest.raises(ValueError):
+        check_engine("spark")
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+
+from app.core.database import AsyncDatabase, Database
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.visualization_repository import AsyncVisualizationRepository
+from app.util.http_cache import conditional, etag_matches, make_etag
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = make_etag(3, "2026-10-18 10:00:00", "summary=true")
+
+    assert etag.startswith('W/"') and etag == make_etag(3, "2026-10-18 10:00:00", "summary=true")
+    assert etag != make_etag(4, "2026-10-18 10:00:00", "summary=true")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_conditional_answers_304_when_the_version_is_unchanged():
+    version = {"value": 1}
+    app = FastAPI()
+
+    @app.get("/items")
+    def items(request: Request, response: Response):
+        return conditional(request, response, "private, no-cache", version["value"]) or {"items": [version["value"]]}
+
+    client = TestClient(app)
+    first = client.get("/items")
+    cached = client.get("/items", headers={"If-None-Match": first.headers["etag"]})
+    version["value"] = 2
+    changed = client.get("/items", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+    assert cached.status_code == 304 and cached.content == b"" and cached.headers["etag"] == first.headers["etag"]
+    assert changed.status_code == 200 and changed.json() == {"items": [2]}
+
+
+def test_read_version_changes_on_insert_and_delete(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.sqlite3'}"
+    database = Database(url)
+    SQLModel.metadata.create_all(database._engine, tables=[Dataset.__table__, Visualization.__table__])
+    with database.session() as session:
+        session.add(Dataset(filename="f.csv", table_name="t", columns_metadata="{}"))
+
+    async def run():
+        async_database = AsyncDatabase(url)
+        repository = AsyncVisualizationRepository(async_database.session)
+        empty = await repository.read_version()
+        await repository.create(Visualization(dataset_id=1, prompt="p", chart_config={}))
+        one = await repository.read_version()
+        other_dataset = await repository.read_dataset_version(2)
+        await repository.delete_by_id(1)
+        deleted = await repository.read_version()
+        await async_database.dispose()
+        return empty, one, other_dataset, deleted
+
+    empty, one, other_dataset, deleted = asyncio.run(run())
+
+    assert empty == (0, None) and other_dataset == (0, None)
+    assert one[0] == 1 and one[1] is not None
+    assert deleted == (0, None)
@@ -0,0 +1,81 @@
+import datetime
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.util.ingestion import (
+    ChunkedTableWriter,
+    _csv_chunks,
+    alter_column_ddl,
+    create_table_ddl,
+    ingest_dataframe,
+    iter_file_chunks,
+    widen_kind,
+)
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "price": [1.5, None, 3.0],
+            "name": ["a,b", None, 'q"x'],
+            "paid": [True, False, True],
+            "ordered at": pd.to_datetime(["2020-01-01", None, "2021-05-05 10:00"], format="ISO8601"),
+        }
+    )
+
+
+def test_ddl_follows_dtypes_per_dialect():
+    dtypes = dict(_frame().dtypes)
+
+    assert create_table_ddl("t", dtypes, "postgresql") == (
+        'CREATE TABLE "t" ("id" BIGINT, "price" DOUBLE PRECISION, "name" TEXT, "paid" BOOLEAN, "ordered at" TIMESTAMP)'
+    )
+    assert create_table_ddl("t", dtypes, "mysql") == (
+        "CREATE TABLE `t` (`id` BIGINT, `price` DOUBLE, `name` TEXT, `paid` BOOLEAN, `ordered at` DATETIME)"
+    )
+
+
+def test_copy_chunks_mark_nulls_and_quote_text():
+    chunks = list(_csv_chunks(_frame(), chunk_rows=2))
+
+    assert len(chunks) == 2
+    assert chunks[0].splitlines() == ['1,1.5,"a,b",True,2020-01-01', "2,\\N,\\N,False,\\N"]
+    assert chunks[1] == '3,3.0,"q""x",True,2021-05-05 10:00:00\n'
+
+
+def test_executemany_fallback_round_trip():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        assert ingest_dataframe(connection, _frame(), "dataset_1_orders") == 3
+        rows = connection.execute(text('SELECT id, price, name, "ordered at" FROM dataset_1_orders ORDER BY id')).all()
+
+    assert rows[1] == (2, None, None, None)
+    assert rows[2][2] == 'q"x'
+    assert rows[0][3] == str(datetime.datetime(2020, 1, 1))
+
+
+def test_chunked_writer_widens_columns_across_chunks(tmp_path):
+    path = tmp_path / "mixed.csv"
+    path.write_text("a,b,c\n1,x,\n2,y,\n3.5,z,\n4,w,7\n5,v,x\n")
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        writer = ChunkedTableWriter(connection, "dataset_1_mixed")
+        for df in iter_file_chunks(str(path), "mixed.csv", chunk_rows=2):
+            writer.write(df)
+        rows = connection.execute(text("SELECT a, c FROM dataset_1_mixed")).all()
+
+    assert writer.rows == 5
+    assert writer.dtype_names() == {"a": "float64", "b": "object", "c": "object"}
+    assert rows[2] == (3.5, None)
+    assert alter_column_ddl("t", "a", "float", "postgresql") == (
+        'ALTER TABLE "t" ALTER COLUMN "a" TYPE DOUBLE PRECISION USING "a"::DOUBLE PRECISION'
+    )
+
+
+def test_widen_kind():
+    assert widen_kind("integer", "float") == "float"
+    assert widen_kind("float", "integer") == "float"
+    assert widen_kind("integer", "text") == "text"
+    assert widen_kind("boolean", "integer") == "text"
@@ -0,0 +1,179 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, orm
+from sqlmodel import SQLModel
+
+from app.model.dataset import Dataset
+from app.model.dataset_profile import DatasetColumnProfile
+from app.model.ingestion_job import IngestionJob
+from app.repository import DatasetProfileRepository, DatasetRepository, IngestionJobRepository
+from app.services.dataset_service import DatasetService
+from app.core import database
+from app.core.config import configs
+from app.core.database import Database
+from app.services.ingestion_service import HOST, IngestionService, job_progress
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(
+        engine, tables=[Dataset.__table__, DatasetColumnProfile.__table__, IngestionJob.__table__]
+    )
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session():
+        session = sessionmaker()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    return session
+
+
+def _service(session_factory, executor):
+    dataset_service = DatasetService(DatasetRepository(session_factory), DatasetProfileRepository(session_factory))
+    return IngestionService(IngestionJobRepository(session_factory), dataset_service, executor)
+
+
+def _upload(tmp_path, content="a,b\n1,x\n2,y\n3,z\n", name="upload.csv"):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def test_upload_job_reports_progress_and_links_the_dataset(tmp_path, session_factory):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = _service(session_factory, executor)
+        path = _upload(tmp_path)
+        job = service.submit(path, "sales.csv")
+        assert job["status"] == "queued"
+    status = service.get_job(job["id"])
+
+    assert status["status"] == "completed"
+    assert status["rows_ingested"] == 3
+    assert status["bytes_processed"] == status["bytes_total"] > 0
+    assert status["progress"] == 1.0
+    assert status["dataset_id"] is not None
+    assert "file_path" not in status
+    assert not (tmp_path / "upload.csv").exists()
+
+
+def test_failed_job_keeps_the_error(tmp_path, session_factory):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = _service(session_factory, executor)
+        job = service.submit(_upload(tmp_path, content=""), "empty.csv")
+    status = service.get_job(job["id"])
+
+    assert status["status"] == "failed"
+    assert status["error"]
+
+
+def test_recover_requeues_interrupted_jobs_and_fails_lost_ones(tmp_path, session_factory):
+    repository = IngestionJobRepository(session_factory)
+    interrupted = repository.create_job("sales.csv", _upload(tmp_path), 16)
+    repository.update_fields(interrupted.id, status="running", attempts=1)
+    lost = repository.create_job("gone.csv", str(tmp_path / "missing.csv"), 16)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = _service(session_factory, executor)
+        service.recover_jobs()
+
+    assert service.get_job(interrupted.id)["status"] == "completed"
+    assert service.get_job(interrupted.id)["attempts"] == 2
+    assert service.get_job(lost.id)["status"] == "failed"
+
+
+def test_recover_leaves_jobs_of_live_workers_alone(tmp_path, session_factory, monkeypatch):
+    monkeypatch.setattr(configs, "DB", "postgresql")
+    repository = IngestionJobRepository(session_factory)
+    jobs = {}
+    for name, worker_id, seen in [
+        ("live", "other-host:41:ab12cd34", time.time()),
+        ("stale", "other-host:42:ab12cd34", time.time() - configs.UPLOAD_STALE_SECONDS - 1),
+        ("dead", f"{HOST}:999999999:ab12cd34", time.time()),
+    ]:
+        jobs[name] = repository.create_job(f"{name}.csv", _upload(tmp_path, name=f"{name}.csv"), 16)
+        repository.update_fields(jobs[name].id, status="running", attempts=1, worker_id=worker_id, heartbeat_at=seen)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = _service(session_factory, executor)
+        service.recover_jobs()
+
+    assert service.get_job(jobs["live"].id)["status"] == "running"
+    assert service.get_job(jobs["stale"].id)["status"] == "completed"
+    assert service.get_job(jobs["dead"].id)["status"] == "completed"
+
+
+def test_retried_split_sheets_job_skips_finished_sheets(tmp_path, session_factory, monkeypatch):
+    monkeypatch.setattr(configs, "UPLOAD_PARSE_WORKERS", 1)
+    first, workbook = tmp_path / "first.xlsx", tmp_path / "book.xlsx"
+    with pd.ExcelWriter(first) as writer:
+        pd.DataFrame({"a": [1, 2]}).to_excel(writer, sheet_name="north", index=False)
+    with pd.ExcelWriter(workbook) as writer:
+        pd.DataFrame({"a": [1, 2]}).to_excel(writer, sheet_name="north", index=False)
+        pd.DataFrame({"b": [3]}).to_excel(writer, sheet_name="south", index=False)
+    dataset_service = DatasetService(DatasetRepository(session_factory), DatasetProfileRepository(session_factory))
+    (north,) = dataset_service.upload_sheets(str(first), "book.xlsx")
+    repository = IngestionJobRepository(session_factory)
+    job = repository.create_job("book.xlsx", str(workbook), 16, split_sheets=True)
+    repository.update_fields(job.id, status="running", attempts=1, dataset_ids=json.dumps([north.id]))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = _service(session_factory, executor)
+        service.recover_jobs()
+    status = service.get_job(job.id)
+    with session_factory() as session:
+        filenames = sorted(dataset.filename for dataset in session.query(Dataset).all())
+
+    assert status["status"] == "completed" and status["dataset_ids"][0] == north.id and len(status["dataset_ids"]) == 2
+    assert filenames == ["book.xlsx [north]", "book.xlsx [south]"]
+
+
+def test_heartbeats_do_not_commit_the_load_of_the_scoped_session(tmp_path, monkeypatch):
+    # heartbeats on every chunk, through the app's Database: the load runs in the thread's scoped session
+    monkeypatch.setattr(configs, "DB", "postgresql")
+    monkeypatch.setattr(configs, "UPLOAD_HEARTBEAT_SECONDS", 0)
+    monkeypatch.setattr(configs, "UPLOAD_CHUNK_ROWS", 10)
+    # SQLite's single writer is the load, so the heartbeats give up quickly instead of waiting for it
+    monkeypatch.setitem(database.SQLITE_PRAGMAS, "busy_timeout", 50)
+    db = Database(f"sqlite:///{tmp_path / 'app.db'}")
+    SQLModel.metadata.create_all(
+        db._engine, tables=[Dataset.__table__, DatasetColumnProfile.__table__, IngestionJob.__table__]
+    )
+    dataset_service = DatasetService(DatasetRepository(db.session), DatasetProfileRepository(db.session))
+    repository = IngestionJobRepository(db.session, db.separate_session)
+    content = "a,b\n" + "".join(f"{i},x{i}\n" for i in range(50))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = IngestionService(repository, dataset_service, executor)
+        job = service.submit(_upload(tmp_path, content), "sales.csv")
+    status = service.get_job(job["id"])
+
+    assert status["status"] == "completed", status["error"]
+    assert status["rows_ingested"] == 50
+
+
+def test_running_job_reports_live_throughput_and_eta():
+    job = IngestionJob(id=7, filename="big.csv", status="running", bytes_total=1000, started_at=time.time() - 10)
+    job_progress.update(7, rows=400, bytes_read=250)
+    try:
+        status = IngestionService.job_status(job)
+    finally:
+        job_progress.pop(7)
+
+    assert status["rows_ingested"] == 400
+    assert status["progress"] == 0.25
+    assert status["rows_per_second"] == pytest.approx(40, rel=0.05)
+    assert status["eta_seconds"] == pytest.approx(30, rel=0.05)
@@ -0,0 +1,66 @@
+import asyncio
+
+import orjson
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlmodel import SQLModel
+
+from app.core.database import AsyncDatabase, Database
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.visualization_repository import AsyncVisualizationRepository
+from app.util.ndjson import ndjson_stream, wants_ndjson
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.sqlite3'}"
+    database = Database(url)
+    SQLModel.metadata.create_all(database._engine, tables=[Dataset.__table__, Visualization.__table__])
+    with database.session() as session:
+        session.add(Dataset(filename="f.csv", table_name="t", columns_metadata="{}"))
+        session.add_all(Visualization(dataset_id=1, prompt=f"p{i}", chart_config={"data": [i]}) for i in range(7))
+    return url
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+
+    return asyncio.run(run())
+
+
+def test_wants_ndjson():
+    assert wants_ndjson("application/x-ndjson")
+    assert wants_ndjson("application/x-ndjson, application/json;q=0.5")
+    assert not wants_ndjson("application/json")
+    assert not wants_ndjson(None)
+
+
+def test_stream_yields_batches_of_rows(db_url):
+    async def run():
+        database = AsyncDatabase(db_url)
+        repository = AsyncVisualizationRepository(database.session)
+        batches = [batch async for batch in repository.stream(["id", "prompt"], batch_size=3)]
+        full = [row async for batch in repository.stream(ids=[2, 5]) for row in batch]
+        await database.dispose()
+        return batches, full
+
+    batches, full = asyncio.run(run())
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert batches[0] == [{"id": 1, "prompt": "p0"}, {"id": 2, "prompt": "p1"}, {"id": 3, "prompt": "p2"}]
+    assert [row["chart_config"] for row in full] == [{"data": [1]}, {"data": [4]}]
+
+
+def test_ndjson_stream_writes_one_object_per_line_and_reports_errors():
+    async def partitions():
+        yield [{"id": 1}, {"id": 2}]
+        raise RuntimeError("connection lost")
+
+    chunks = collect(ndjson_stream(partitions()))
+
+    assert chunks[0] == b'{"id":1}\n{"id":2}\n'
+    assert orjson.loads(chunks[1]) == {"error": "connection lost"}
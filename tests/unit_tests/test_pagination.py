@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, orm
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.exceptions import ValidationError
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.dataset_repository import DatasetRepository
+from app.repository.visualization_repository import VisualizationRepository
+from app.schema.base_schema import FindBase
+from app.schema.dataset_schema import FindDataset
+from app.util.pagination import count_cache
+
+
+@pytest.fixture
+def repository():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session():
+        with sessionmaker() as session:
+            yield session
+            session.commit()
+
+    repository = DatasetRepository(session)
+    with session() as s:
+        # duplicated filenames exercise the id tie-breaker
+        s.add_all(Dataset(filename=f"f{i % 4}.csv", table_name=f"t{i:02d}") for i in range(23))
+    count_cache.clear()
+    return repository
+
+
+def page_ids(repository, **options):
+    result = repository.read_by_options(FindDataset(**options))
+    return [dataset.id for dataset in result["founds"]], result["search_options"]
+
+
+def total_count(repository, mode):
+    return repository.read_by_options(FindDataset(count=mode, filename="f1.csv"))["search_options"]["total_count"]
+
+
+def test_cursor_pages_match_offset_pages(repository):
+    offset_ids = []
+    for page in range(1, 5):
+        offset_ids += page_ids(repository, ordering="filename", page=page, page_size=7)[0]
+    cursor_ids, cursor = [], None
+    while True:
+        ids, options = page_ids(repository, ordering="filename", page_size=7, cursor=cursor)
+        cursor_ids += ids
+        cursor = options["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(cursor_ids) == 23
+    assert cursor_ids == offset_ids
+
+
+def test_descending_id_cursor_and_bad_cursors(repository):
+    _, first = page_ids(repository, page_size=10)
+
+    assert page_ids(repository, page_size=10, cursor=first["next_cursor"])[0] == list(range(13, 3, -1))
+    with pytest.raises(ValidationError):
+        page_ids(repository, page_size=10, cursor="not-a-cursor")
+    with pytest.raises(ValidationError):
+        page_ids(repository, ordering="table_name", page_size=10, cursor=first["next_cursor"])
+
+
+def test_count_modes(repository):
+    assert page_ids(repository, count="none")[1]["total_count"] is None
+    assert total_count(repository, "exact") == 6
+    assert total_count(repository, "cached") == 6
+    with repository.session_factory() as session:
+        session.add(Dataset(filename="f1.csv", table_name="late"))
+    # served from the cache until the TTL expires; sqlite has no planner estimate, so estimate uses the cache too
+    assert total_count(repository, "cached") == 6
+    assert total_count(repository, "estimate") == 6
+    assert total_count(repository, "exact") == 7
+
+
+@pytest.mark.parametrize("ordering", ["explanation", "-explanation"])
+def test_cursor_pages_keep_rows_with_a_null_ordering_value(repository, ordering):
+    session_factory = repository.session_factory
+    with session_factory() as s:
+        s.add_all(
+            Visualization(dataset_id=1, prompt=f"p{i}", chart_config={}, explanation=None if i % 3 else f"e{i % 2}")
+            for i in range(10)
+        )
+    visualizations = VisualizationRepository(session_factory)
+    expected = [viz.id for viz in visualizations.read_by_options(FindBase(ordering=ordering, page_size="all"))["founds"]]
+    cursor_ids, cursor = [], None
+    while True:
+        result = visualizations.read_by_options(FindBase(ordering=ordering, page_size=3, cursor=cursor))
+        cursor_ids += [viz.id for viz in result["founds"]]
+        cursor = result["search_options"]["next_cursor"]
+        if cursor is None:
+            break
+
+    assert cursor_ids == expected and len(expected) == 10
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from app.util import parallel_parsing
+from app.util.ingestion import FileChunkReader, iter_sheets
+from app.util.parallel_parsing import parse_csv_range, split_csv_ranges
+
+CSV = 'id,text\n1,plain\n2,"two\nlines"\n3,"say ""hi""\nagain"\n4,last\n'
+
+
+def test_ranges_end_on_record_boundaries_outside_quotes(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel_parsing, "SCAN_BLOCK_BYTES", 5)
+    path = tmp_path / "quoted.csv"
+    path.write_text(CSV)
+
+    header, ranges = split_csv_ranges(str(path), range_bytes=3)
+    parts = pd.concat([parse_csv_range(str(path), header, start, end) for start, end in ranges], ignore_index=True)
+
+    assert header == b"id,text\n"
+    assert len(ranges) == 4
+    assert parts.equals(pd.read_csv(path))
+
+
+def test_parallel_reader_matches_sequential_read(tmp_path):
+    path = tmp_path / "big.csv"
+    pd.DataFrame({"id": range(3000), "text": ["a,\nb" if i % 7 else "c" for i in range(3000)]}).to_csv(path, index=False)
+
+    reader = FileChunkReader(str(path), "big.csv", chunk_rows=500, parse_workers=2, range_bytes=4096, parallel_min_bytes=0)
+    chunks = list(reader)
+
+    assert len(chunks) > 1
+    assert reader.bytes_read == reader.bytes_total
+    assert pd.concat(chunks, ignore_index=True).equals(pd.read_csv(path))
+
+
+def test_iter_sheets_keeps_workbook_order(tmp_path):
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"x": [1, 2]}).to_excel(writer, sheet_name="Jan", index=False)
+        pd.DataFrame({"y": ["a"]}).to_excel(writer, sheet_name="Feb", index=False)
+
+    sheets = list(iter_sheets(str(path), ["Jan", "Feb"]))
+
+    assert [name for name, _ in sheets] == ["Jan", "Feb"]
+    assert sheets[0][1]["x"].tolist() == [1, 2]
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.util.profiling import DatasetProfiler, HyperLogLog, format_profiles_for_prompt, profile_dataframe
+
+
+def test_hyperloglog_estimate_is_close():
+    hll = HyperLogLog()
+    hll.update(pd.util.hash_pandas_object(pd.Series(np.arange(200_000)), index=False).to_numpy())
+    assert abs(hll.estimate() - 200_000) / 200_000 < 0.03
+
+
+def test_profile_columns():
+    df = pd.DataFrame({"sex": ["male", "female", "male", None], "age": [22.0, 38.0, None, 35.0]})
+    profiles = {profile["column_name"]: profile for profile in profile_dataframe(df)}
+
+    assert profiles["sex"]["null_ratio"] == 0.25
+    assert profiles["sex"]["distinct_count"] == 2
+    assert json.loads(profiles["sex"]["top_values"])[0] == ["male", 2]
+    assert profiles["age"]["min_value"] == "22.0"
+    assert profiles["age"]["max_value"] == "38.0"
+    assert "sex object; distinct=2; nulls=25%; values=male, female" in format_profiles_for_prompt(profiles.values())
+
+
+def test_chunked_profile_matches_single_pass():
+    df = pd.DataFrame({"city": np.random.choice(["a", "b", "c"], 1000), "value": np.arange(1000)})
+    profiler = DatasetProfiler()
+    for start in range(0, len(df), 300):
+        profiler.update(df.iloc[start : start + 300])
+
+    fields = ("column_name", "null_ratio", "distinct_count", "min_value", "max_value")
+    chunked = [{field: profile[field] for field in fields} for profile in profiler.results()]
+    assert chunked == [{field: profile[field] for field in fields} for profile in profile_dataframe(df)]
+
+
+def test_prompt_keeps_category_strings_and_shortens_numbers():
+    df = pd.DataFrame({"version": ["1.10", "1.2", "5e3"], "ratio": [0.1 + 0.2, 2.5, 1e-9]})
+    prompt = format_profiles_for_prompt(profile_dataframe(df))
+
+    assert "version object; distinct=3; values=1.10, 1.2, 5e3" in prompt
+    assert "range=[1e-09, 2.5]; values=0.3, 2.5, 1e-09" in prompt
@@ -0,0 +1,98 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, orm
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.database import AsyncDatabase
+from app.core.exceptions import ValidationError
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.dataset_repository import DatasetRepository
+from app.repository.visualization_repository import AsyncVisualizationRepository, VisualizationRepository
+from app.services.visualization_service import VisualizationService
+from app.schema.dataset_schema import FindDataset
+from app.util.projection import projected_columns
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session():
+        with sessionmaker() as session:
+            yield session
+            session.commit()
+
+    with session() as s:
+        s.add_all(Dataset(filename=f"f{i}.csv", table_name=f"t{i}", columns_metadata='{"a": "int64"}') for i in range(5))
+        s.add_all(Visualization(dataset_id=1, prompt=f"p{i}", chart_config={"data": [i]}) for i in range(3))
+    return session
+
+
+def test_projected_columns():
+    assert projected_columns(Visualization, None) is None
+    assert projected_columns(Visualization, "prompt, id,prompt") == ["id", "prompt"]
+    assert projected_columns(Visualization, None, summary=True) == ["id", "created_at", "updated_at", "dataset_id", "prompt"]
+    with pytest.raises(ValueError):
+        projected_columns(Visualization, "prompt,secret")
+
+
+def test_read_by_options_returns_only_the_requested_fields(session_factory):
+    repository = DatasetRepository(session_factory)
+
+    first = repository.read_by_options(FindDataset(fields="filename", ordering="filename", page_size=2))
+    second = repository.read_by_options(
+        FindDataset(fields="filename", ordering="filename", page_size=2, cursor=first["search_options"]["next_cursor"])
+    )
+    summary = repository.read_by_options(FindDataset(summary=True, page_size=1))["founds"][0]
+
+    assert first["founds"] == [{"id": 1, "filename": "f0.csv"}, {"id": 2, "filename": "f1.csv"}]
+    assert [found["filename"] for found in second["founds"]] == ["f2.csv", "f3.csv"]
+    assert "columns_metadata" not in summary and summary["table_name"] == "t4"
+    with pytest.raises(ValidationError):
+        repository.read_by_options(FindDataset(fields="nope"))
+
+
+def test_column_select_listings(session_factory):
+    repository = VisualizationRepository(session_factory)
+
+    assert repository.read_list(["id", "prompt"]) == [{"id": i + 1, "prompt": f"p{i}"} for i in range(3)]
+    assert repository.get_all_by_dataset_id(1, ["id"]) == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert repository.get_all_by_dataset_id(1)[0].chart_config == {"data": [0]}
+
+
+def test_async_column_select_listings_and_ids(tmp_path):
+    pytest.importorskip("aiosqlite")
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    with orm.Session(engine) as session:
+        session.add(Dataset(filename="f.csv", table_name="t", columns_metadata="{}"))
+        session.add_all(Visualization(dataset_id=1, prompt=f"p{i}", chart_config={"data": [i]}) for i in range(4))
+        session.commit()
+
+    async def run():
+        database = AsyncDatabase(f"sqlite:///{tmp_path / 'app.db'}")
+        service = VisualizationService(AsyncVisualizationRepository(database.session))
+        try:
+            return (
+                await service.get_all_visualizations(summary=True),
+                await service.get_all_visualizations("chart_config", ids=[4, 2]),
+                await service.get_all_visualizations(ids=[3]),
+            )
+        finally:
+            await database.dispose()
+
+    summaries, configs, whole = asyncio.run(run())
+
+    assert [set(summary) for summary in summaries] == [{"id", "created_at", "updated_at", "dataset_id", "prompt"}] * 4
+    assert sorted(configs, key=lambda row: row["id"]) == [
+        {"id": 2, "chart_config": {"data": [1]}},
+        {"id": 4, "chart_config": {"data": [3]}},
+    ]
+    assert len(whole) == 1 and whole[0].prompt == "p2" and whole[0].chart_config == {"data": [2]}
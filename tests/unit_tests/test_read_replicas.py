@@ -0,0 +1,56 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import Database, ReplicaSet, read_your_writes
+from app.core.middleware import ReadYourWritesMiddleware
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.dataset_repository import DatasetRepository
+from app.schema.dataset_schema import DatasetCreate
+
+
+@pytest.fixture
+def repository(tmp_path):
+    # the replica holds a differently named copy of row 1, so every read shows which database served it
+    urls = {}
+    for name in ("primary", "replica"):
+        urls[name] = f"sqlite:///{tmp_path / name}.sqlite3"
+        database = Database(urls[name])
+        SQLModel.metadata.create_all(database._engine, tables=[Dataset.__table__, Visualization.__table__])
+        DatasetRepository(database.session).create(DatasetCreate(filename=f"{name}.csv", table_name="t1"))
+    unreachable = f"sqlite:///{tmp_path / 'missing' / 'replica.sqlite3'}?mode=ro&uri=true"
+    database = Database(urls["primary"], replica_urls=[unreachable, urls["replica"]])
+    return DatasetRepository(database.session, database.read_session)
+
+
+def test_reads_go_to_a_healthy_replica_until_the_scope_writes(repository):
+    assert repository.read_by_id(1).filename == "replica.csv"
+    with read_your_writes():
+        assert repository.read_by_id(1).filename == "replica.csv"
+        repository.update_attr(1, "engine", "duckdb")
+        assert repository.read_by_id(1).filename == "primary.csv"
+    assert repository.read_by_id(1).filename == "replica.csv"
+
+
+def test_replica_set_round_robin_skips_replicas_marked_down():
+    replicas = ReplicaSet(["a", "b", "c"], retry_seconds=60)
+    assert [replicas.candidates()[0][1] for _ in range(3)] == ["a", "b", "c"]
+    replicas.mark_down(1, RuntimeError("down"))
+    assert [engine for _, engine in replicas.candidates()] == ["a", "c"]
+
+
+def test_middleware_keeps_reads_after_a_write_in_the_same_request_on_the_primary(repository):
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/touch")
+    async def touch():
+        before = (await run_in_threadpool(repository.read_by_id, 1)).filename
+        await run_in_threadpool(repository.update_attr, 1, "engine", "duckdb")
+        after = (await run_in_threadpool(repository.read_by_id, 1)).filename
+        return [before, after]
+
+    assert TestClient(app).post("/touch").json() == ["replica.csv", "primary.csv"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from app.util.result_reduction import bind_column_refs, count_tokens, lttb, reduce_for_chart, summarize_for_prompt
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[500] = 100
+    keep = lttb(x, y, 50)
+
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 500 in keep
+
+
+def test_high_cardinality_categories_become_top_k_plus_other():
+    df = pd.DataFrame({"city": [f"c{i}" for i in range(100)], "sales": np.arange(100, dtype=float)})
+    reduced, notes = reduce_for_chart(df, top_k=5, max_points=500)
+
+    assert reduced["city"].tolist() == ["c99", "c98", "c97", "c96", "c95", "Other"]
+    assert reduced["sales"].iloc[-1] == sum(range(95))
+    assert notes
+
+
+def test_time_series_is_downsampled():
+    df = pd.DataFrame({"day": pd.date_range("2024-01-01", periods=5000, freq="h").astype(str), "value": np.arange(5000)})
+    reduced, _ = reduce_for_chart(df, top_k=20, max_points=200)
+    assert len(reduced) == 200
+
+
+def test_series_with_a_run_of_nulls_is_downsampled():
+    # "cost" is NULL for whole buckets: those buckets keep their endpoints, "revenue" still its extremes
+    cost = np.arange(5000, dtype=np.float64)
+    cost[1000:2000] = np.nan
+    days = pd.date_range("2024-01-01", periods=5000, freq="h").astype(str)
+    df = pd.DataFrame({"day": days, "revenue": np.sin(np.arange(5000)), "cost": cost})
+    reduced, notes = reduce_for_chart(df, top_k=20, max_points=200)
+
+    assert "min-max" in notes[0] and len(reduced) <= 200
+    assert reduced["cost"].isna().any() and reduced["cost"].max() == 4999
+    assert reduced["revenue"].max() == df["revenue"].max()
+
+
+def test_summary_respects_token_budget():
+    df = pd.DataFrame({"name": [f"row-{i}" for i in range(500)], "value": np.arange(500)})
+    summary = summarize_for_prompt(df, df, [], token_budget=300, max_rows=500)
+
+    assert "Rows: 500" in summary
+    assert len(summary) < len(df.to_csv())
+    assert count_tokens(summary) <= 300
+
+
+def test_summary_of_a_wide_result_elides_the_header_to_fit():
+    df = pd.DataFrame({f"measure_{i}": np.arange(50) * i for i in range(200)})
+    summary = summarize_for_prompt(df, df, [], token_budget=300, max_rows=50)
+
+    assert count_tokens(summary) <= 300
+    assert summary.startswith("Rows: 50") and "more columns" in summary
+
+
+def test_bind_column_refs():
+    df = pd.DataFrame({"region": ["a", "b"], "sales": [1, 2]})
+    config = {"data": [{"type": "bar", "x": "$col:region", "y": "$col:sales", "name": "$col:missing"}]}
+
+    bound = bind_column_refs(config, df)["data"][0]
+    assert bound["x"] == ["a", "b"]
+    assert bound["y"] == [1, 2]
+    assert bound["name"] == "$col:missing"
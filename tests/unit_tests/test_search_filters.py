@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, orm
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.dataset_repository import DatasetRepository
+from app.schema.dataset_schema import FindDataset
+from app.util.search import search_index_statements
+
+
+@pytest.fixture
+def repository():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session():
+        with sessionmaker() as session:
+            yield session
+            session.commit()
+
+    with session() as s:
+        for i, filename in enumerate(["Sales_2023.csv", "sales_100%.csv", "Churn.xlsx", "presales.csv", "sales2023.csv"]):
+            s.add(Dataset(filename=filename, table_name=f"t{i}"))
+    return DatasetRepository(session)
+
+
+def filenames(repository, **filters):
+    founds = repository.read_by_options(FindDataset(ordering="id", page_size="all", **filters))["founds"]
+    return [found.filename for found in founds]
+
+
+def test_search_is_a_case_insensitive_substring_match(repository):
+    assert filenames(repository, filename__search="SALES") == [
+        "Sales_2023.csv", "sales_100%.csv", "presales.csv", "sales2023.csv"
+    ]
+
+
+def test_prefix_matches_the_start_only(repository):
+    assert filenames(repository, filename__prefix="sales") == ["Sales_2023.csv", "sales_100%.csv", "sales2023.csv"]
+
+
+def test_wildcards_in_the_value_match_literally(repository):
+    assert filenames(repository, filename__search="100%") == ["sales_100%.csv"]
+    assert filenames(repository, filename__prefix="sales_") == ["Sales_2023.csv", "sales_100%.csv"]
+
+
+def test_search_index_statements():
+    assert len(search_index_statements("tag", "name", trigram=False)) == 1
+    assert "gin_trgm_ops" in search_index_statements("tag", "name", trigram=True)[1]
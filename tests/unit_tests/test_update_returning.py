@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event, orm
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.exceptions import NotFoundError
+from app.model.dataset import Dataset
+from app.model.visualization import Visualization
+from app.repository.dataset_repository import DatasetRepository
+from app.schema.dataset_schema import DatasetCreate, DatasetPatch
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[Dataset.__table__, Visualization.__table__])
+    return engine
+
+
+@pytest.fixture
+def repository(engine):
+    sessionmaker = orm.sessionmaker(bind=engine)
+
+    @contextmanager
+    def session():
+        with sessionmaker() as session:
+            yield session
+            session.commit()
+
+    return DatasetRepository(session)
+
+
+def test_update_is_one_statement_and_returns_the_row(engine, repository):
+    dataset = repository.create(DatasetCreate(filename="a.csv", table_name="t_a"))
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    updated = repository.update(dataset.id, DatasetPatch(id=dataset.id, filename="b.csv"))
+    engine_updated = repository.update_attr(dataset.id, "engine", "duckdb")
+
+    assert [statement.split()[0] for statement in statements] == ["UPDATE", "UPDATE"]
+    assert "RETURNING" in statements[0]
+    assert (updated.filename, updated.engine) == ("b.csv", "sql")
+    assert (engine_updated.filename, engine_updated.engine) == ("b.csv", "duckdb")
+
+
+def test_update_of_a_missing_row_raises_not_found(repository):
+    with pytest.raises(NotFoundError):
+        repository.update_attr(999, "filename", "x.csv")